@@ -0,0 +1,115 @@
+import pysnr
+from .common import LENGTHS, FS, make_signal
+
+
+SIGNAL_FUNCTIONS = ["snr_signal", "sinad_signal", "thd_signal", "sfdr_signal", "toi_signal", "analyze"]
+PSD_FUNCTIONS = ["snr_power_spectral_density", "sinad_power_spectral_density", "thd_power_spectral_density",
+                 "sfdr_power_spectral_density", "toi_power_spectral_density", "analyze_power_spectral_density"]
+SPECTRUM_FUNCTIONS = ["snr_power_spectrum", "sinad_power_spectrum", "thd_power_spectrum", "sfdr_power_spectrum",
+                      "toi_power_spectrum"]
+
+
+class SignalMetrics:
+    """The ``*_signal`` functions and analyze, on single captures and batches."""
+    params = (SIGNAL_FUNCTIONS, LENGTHS, [False, True])
+    param_names = ["function", "N", "batched"]
+    timeout = 600
+
+    def setup(self, function, N, batched):
+        self.signal = make_signal(N, batched, two_tone=function.startswith("toi"))
+        self.func = getattr(pysnr, function)
+
+    def time_signal(self, function, N, batched):
+        self.func(self.signal, FS)
+
+    def peakmem_signal(self, function, N, batched):
+        self.func(self.signal, FS)
+
+
+class PowerSpectralDensityMetrics:
+    """The ``*_power_spectral_density`` functions, from a precomputed periodogram."""
+    params = (PSD_FUNCTIONS, LENGTHS)
+    param_names = ["function", "N"]
+    timeout = 600
+
+    def setup(self, function, N):
+        signal = make_signal(N, two_tone=function.startswith("toi"))
+        self.f, self.pxx = pysnr.periodogram(signal, FS, ('kaiser', 38), detrend=True)
+        self.func = getattr(pysnr, function)
+
+    def time_psd(self, function, N):
+        self.func(self.pxx, self.f)
+
+    def peakmem_psd(self, function, N):
+        self.func(self.pxx, self.f)
+
+
+class PowerSpectrumMetrics:
+    """The ``*_power_spectrum`` functions, from a precomputed periodogram."""
+    params = (SPECTRUM_FUNCTIONS, LENGTHS)
+    param_names = ["function", "N"]
+    timeout = 600
+
+    def setup(self, function, N):
+        signal = make_signal(N, two_tone=function.startswith("toi"))
+        self.f, self.sxx = pysnr.periodogram(signal, FS, ('kaiser', 38), scaling="spectrum", detrend=True)
+        rbw = pysnr.get_window(('kaiser', 38), N).enbw * FS / N
+        self.args = () if function.startswith("sfdr") else (rbw,)
+        self.func = getattr(pysnr, function)
+
+    def time_spectrum(self, function, N):
+        self.func(self.sxx, self.f, *self.args)
+
+    def peakmem_spectrum(self, function, N):
+        self.func(self.sxx, self.f, *self.args)
+
+
+class Periodogram:
+    """Both periodogram methods, on single captures and batches."""
+    params = (["welch", "fft"], LENGTHS, [False, True])
+    param_names = ["method", "N", "batched"]
+    timeout = 600
+
+    def setup(self, method, N, batched):
+        self.signal = make_signal(N, batched)
+
+    def time_periodogram(self, method, N, batched):
+        pysnr.periodogram(self.signal, FS, ('kaiser', 38), method=method, detrend=True)
+
+    def peakmem_periodogram(self, method, N, batched):
+        pysnr.periodogram(self.signal, FS, ('kaiser', 38), method=method, detrend=True)
+
+
+class WelchPeriodogram:
+    """Segmented Welch periodograms, whose memory use is bounded by the segment length."""
+    params = (["mean", "median"], LENGTHS)
+    param_names = ["average", "N"]
+    timeout = 600
+
+    def setup(self, average, N):
+        self.signal = make_signal(N)
+        self.nperseg = min(N, 4096)
+
+    def time_welch(self, average, N):
+        pysnr.periodogram(self.signal, FS, ('kaiser', 38), detrend=True, nperseg=self.nperseg, average=average)
+
+    def peakmem_welch(self, average, N):
+        pysnr.periodogram(self.signal, FS, ('kaiser', 38), detrend=True, nperseg=self.nperseg, average=average)
+
+
+class ZoomAnalysis:
+    """The two-stage analysis of long records against analyze, whose full periodogram takes memory in proportion to
+    the length of the capture."""
+    params = (["analyze", "analyze_zoom"], LENGTHS)
+    param_names = ["function", "N"]
+    timeout = 600
+
+    def setup(self, function, N):
+        self.signal = make_signal(N)
+        self.func = getattr(pysnr, function)
+
+    def time_analysis(self, function, N):
+        self.func(self.signal, FS)
+
+    def peakmem_analysis(self, function, N):
+        self.func(self.signal, FS)
@@ -0,0 +1,100 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+import scipy.io
+import pysnr
+from .common import LENGTHS, FS, BATCH_SIZE, make_signal
+
+
+class Streaming:
+    """Chunked Welch periodograms and the sliding-window monitor."""
+    params = [LENGTHS]
+    param_names = ["N"]
+    timeout = 600
+
+    def setup(self, N):
+        self.signal = make_signal(N)
+        self.nperseg = min(N, 65536)
+
+    def chunks(self):
+        return (self.signal[start:start + 65536] for start in range(0, len(self.signal), 65536))
+
+    def time_welch_stream(self, N):
+        pysnr.welch_stream(self.chunks(), FS, nperseg=self.nperseg)
+
+    def peakmem_welch_stream(self, N):
+        pysnr.welch_stream(self.chunks(), FS, nperseg=self.nperseg)
+
+    def time_welch_accumulator(self, N):
+        accumulator = pysnr.WelchAccumulator(FS, nperseg=self.nperseg)
+        for chunk in self.chunks():
+            accumulator.update(chunk)
+        accumulator.result()
+
+    def time_snr_stream(self, N):
+        pysnr.snr_stream(self.chunks(), FS, nperseg=self.nperseg)
+
+
+class StreamingMonitor:
+    """Sliding-window SNR and SINAD of a live signal."""
+    params = [LENGTHS]
+    param_names = ["N"]
+    timeout = 600
+
+    def setup(self, N):
+        if N > 2 ** 20:
+            raise NotImplementedError("The streaming analyzer is benchmarked up to 2^20 samples")
+        self.signal = make_signal(N)
+
+    def time_streaming_analyzer(self, N):
+        analyzer = pysnr.StreamingAnalyzer(FS, window_length=4096)
+        for start in range(0, N, 65536):
+            analyzer.push(self.signal[start:start + 65536])
+
+
+class Captures:
+    """Loading captures from raw binary and MATLAB files."""
+    params = [LENGTHS]
+    param_names = ["N"]
+    timeout = 600
+
+    def setup(self, N):
+        self.folder = tempfile.mkdtemp()
+        signal = make_signal(N)
+        self.raw_path = os.path.join(self.folder, "capture.bin")
+        np.round(signal * 2 ** 15 * 0.9).astype(np.int16).tofile(self.raw_path)
+        self.mat_path = os.path.join(self.folder, "capture.mat")
+        scipy.io.savemat(self.mat_path, {"x": signal})
+
+    def teardown(self, N):
+        shutil.rmtree(self.folder)
+
+    def time_load_raw(self, N):
+        pysnr.snr_signal(pysnr.load_raw(self.raw_path).data, FS)
+
+    def peakmem_load_raw(self, N):
+        pysnr.snr_signal(pysnr.load_raw(self.raw_path).data, FS)
+
+    def time_load_mat(self, N):
+        pysnr.load_mat(self.mat_path, "x")
+
+
+class BatchRunner:
+    """Batches of captures processed in worker processes, and in the calling process."""
+    params = [LENGTHS]
+    param_names = ["N"]
+    timeout = 600
+
+    def setup(self, N):
+        self.captures = make_signal(N, batched=True)
+
+    def time_run_batch(self, N):
+        pysnr.run_batch(self.captures, FS, chunk_size=1)
+
+    def peakmem_run_batch(self, N):
+        pysnr.run_batch(self.captures, FS, chunk_size=1)
+
+    def time_iter_batch(self, N):
+        for chunk in pysnr.iter_batch(self.captures, FS, workers=0, chunk_size=BATCH_SIZE):
+            pass
@@ -0,0 +1,66 @@
+import numpy as np
+import pysnr
+from .common import LENGTHS, FS, make_signal
+
+
+class Utilities:
+    """Band power integration, spectrum index and the signal utilities."""
+    params = [LENGTHS]
+    param_names = ["N"]
+    timeout = 300
+
+    def setup(self, N):
+        self.signal = make_signal(N)
+        self.noise = self.signal - np.sin(2 * np.pi * 2100 * np.arange(N) / FS)
+        self.f, self.pxx = pysnr.periodogram(self.signal, FS, ('kaiser', 38), detrend=True)
+        # Bands of the fundamental and harmonics, as integrated by THD
+        centers = np.searchsorted(self.f, [2100 * h % (FS / 2) for h in range(1, 7)])
+        self.ranges = np.column_stack((np.maximum(centers - 20, 0), np.minimum(centers + 20, len(self.f) - 1)))
+        self.index = pysnr.SpectrumIndex(self.pxx, self.f)
+
+    def time_bandpower(self, N):
+        pysnr.bandpower(self.pxx, self.f)
+
+    def time_bandpower_ranges(self, N):
+        pysnr.bandpower_ranges(self.pxx, self.f, self.ranges)
+
+    def time_spectrum_index(self, N):
+        pysnr.SpectrumIndex(self.pxx, self.f)
+
+    def peakmem_spectrum_index(self, N):
+        pysnr.SpectrumIndex(self.pxx, self.f)
+
+    def time_spectrum_index_queries(self, N):
+        self.index.range_power(self.ranges[:, 0], self.ranges[:, 1])
+        self.index.nearest_bin(self.index.alias(2100 * np.arange(1, 7)))
+
+    def time_snr_signal_noise(self, N):
+        pysnr.snr_signal_noise(self.signal, self.noise)
+
+    def time_rssq(self, N):
+        pysnr.rssq(self.signal)
+
+    def time_mag2db(self, N):
+        pysnr.mag2db(self.pxx)
+
+    def time_enbw(self, N):
+        pysnr.enbw(self.signal)
+
+
+class WindowCache:
+    """Windows served from the cache, and built on a miss."""
+    params = [LENGTHS]
+    param_names = ["N"]
+
+    def setup(self, N):
+        pysnr.get_window(('kaiser', 38), N)
+
+    def time_get_window_cached(self, N):
+        pysnr.get_window(('kaiser', 38), N)
+
+    def time_get_window_uncached(self, N):
+        pysnr.window_cache_clear()
+        pysnr.get_window(('kaiser', 38), N)
+
+    def time_window_cache_info(self, N):
+        pysnr.window_cache_info()
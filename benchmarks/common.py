@@ -0,0 +1,31 @@
+import numpy as np
+
+
+# Capture lengths from 2^10 to 2^24 samples
+LENGTHS = [2 ** k for k in range(10, 25, 2)]
+
+# Number of captures in a batch, and the longest capture benchmarked in batches
+BATCH_SIZE = 8
+MAX_BATCHED_LENGTH = 2 ** 20
+
+FS = 10000.0
+
+
+def make_signal(N, batched=False, two_tone=False, seed=0):
+    """Synthetic capture similar to the test data: a tone with harmonics (or two tones with their third order
+    intermodulation products) and white noise 60 dB below the fundamental."""
+    if batched and N > MAX_BATCHED_LENGTH:
+        # asv skips the parameter combinations raising NotImplementedError from setup()
+        raise NotImplementedError("Batches are benchmarked up to {} samples".format(MAX_BATCHED_LENGTH))
+    rng = np.random.default_rng(seed)
+    t = np.arange(N) / FS
+    if two_tone:
+        signal = 0.1 * np.sin(2 * np.pi * 1000 * t) + 0.1 * np.sin(2 * np.pi * 1200 * t)
+        signal += 1e-5 * np.sin(2 * np.pi * 800 * t) + 1e-5 * np.sin(2 * np.pi * 1400 * t)
+    else:
+        signal = np.sin(2 * np.pi * 2100 * t)
+        for harmonic, amplitude in ((2, 1e-3), (3, 3e-4), (4, 1e-4), (5, 3e-5)):
+            signal += amplitude * np.sin(2 * np.pi * 2100 * harmonic * t)
+    if batched:
+        return signal + 1e-3 * rng.standard_normal((BATCH_SIZE, N))
+    return signal + 1e-3 * rng.standard_normal(N)
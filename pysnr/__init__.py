@@ -3,4 +3,16 @@ from pysnr.thd import thd_signal, thd_power_spectral_density, thd_power_spectrum
 from pysnr.sinad import sinad_signal, sinad_power_spectral_density, sinad_power_spectrum
 from pysnr.toi import toi_signal, toi_power_spectral_density, toi_power_spectrum
 from pysnr.sfdr import sfdr_signal, sfdr_power_spectral_density, sfdr_power_spectrum
-from pysnr.utils import rssq, mag2db, enbw, bandpower, periodogram
+from pysnr.utils import rssq, mag2db, enbw, bandpower, bandpower_ranges, periodogram
+from pysnr.utils import get_window, window_cache_info, window_cache_clear, CachedWindow
+from pysnr.analyze import analyze, analyze_power_spectral_density, AnalysisResult
+from pysnr.stream import WelchAccumulator, welch_stream, snr_stream, StreamingAnalyzer, StreamingResult
+from pysnr.loader import Capture, load_raw, load_mat
+from pysnr.batch import run_batch, iter_batch, RESULT_DTYPE
+from pysnr.spectrum import SpectrumIndex, Spectrum
+from pysnr.profiling import Profile, add_hook, remove_hook
+from pysnr.coherent import coherent_frequency, is_coherent
+from pysnr.multichannel import analyze_channels, deinterleave, MultiChannelResult
+from pysnr.zoom import zoom_periodogram, analyze_zoom, ZoomAnalysisResult
+from pysnr.sweep import harmonic_sweep_signal, harmonic_sweep_power_spectral_density, HarmonicSweep
+from pysnr.characterization import characterize, Characterization, CAPTURE_DTYPE
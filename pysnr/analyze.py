@@ -0,0 +1,126 @@
+import numpy as np
+from collections import namedtuple
+from pysnr.utils import mag2db, periodogram
+from pysnr.utils import _check_type_and_shape, _apply_to_batch
+from pysnr.toi import _toi_from_psd_without_dc
+from pysnr.sfdr import _sfdr_from_psd_without_dc
+from pysnr.spectrum import _as_spectrum
+
+
+AnalysisResult = namedtuple("AnalysisResult", [
+    "snr", "noise_power",
+    "sinad", "noise_distortion_power",
+    "thd", "harmonic_power",
+    "sfdr", "spur_power",
+    "toi", "fund_power", "imod_power",
+])
+AnalysisResult.__doc__ = """Metrics computed by :func:`analyze`.
+
+Each metric is followed by the power magnitude returned alongside it by the corresponding ``*_signal`` function.
+"""
+
+
+def analyze(signal, fs=1.0, n=6, aliased=False, msd=0, axis=-1, nperseg=None, noverlap=None, average="mean",
+            dtype=np.float64, coherent=False):
+    """SNR, SINAD, THD, SFDR and TOI from input signal.
+
+    This function computes all the metrics for an input signal from a single periodogram.
+    It assumes the fundamental frequency to be the desired signal.
+    Uses a Kaiser window with beta set to 38 to compute the periodogram, or a rectangular window in coherent mode.
+
+    Parameters
+    ----------
+    signal : numpy ndarray
+        The true signal, or a 2-D array of signals to be processed as a batch
+    fs : float
+        Sampling Frequency. Defaults to 1.0.
+    n : int
+        Number of harmonics to use (including the fundamental frequency)
+    aliased : bool
+        If True, converts the harmonics that are aliased into the Nyquist frequency
+    msd : int
+        Minimum number of discrete Fourier bins to ignore for the SFDR computation
+    axis : int
+        Axis of `signal` along which the samples lie, used when a 2-D batch of signals is provided
+    nperseg : int
+        If provided, the periodogram is Welch-averaged over segments of `nperseg` samples
+    noverlap : int
+        Number of samples shared by consecutive segments. Defaults to half of `nperseg`.
+    average : str
+        Decides how the periodograms of the segments are averaged. Can be 'mean' or 'median'
+    dtype : numpy dtype
+        Floating point precision of the periodogram: float64 (default) or float32
+    coherent : bool
+        If True, the signal is assumed to be coherently sampled (see :func:`pysnr.coherent_frequency`): a
+        rectangular window is used and each tone is a single bin of the periodogram
+
+    Returns
+    -------
+    AnalysisResult
+        The computed metrics. Each field is a numpy ndarray if a batch of signals is provided.
+    """
+    signalCheck, signal = _check_type_and_shape(signal, batched=True)
+    if not signalCheck:
+        raise TypeError("Signal must be a 1-D or 2-D array")
+    window = "boxcar" if coherent else ('kaiser', 38)
+    f, pxx = periodogram(signal, fs, window=window, axis=axis, detrend=True,
+                         nperseg=nperseg, noverlap=noverlap, average=average, dtype=dtype)
+    if pxx.ndim == 2:
+        return AnalysisResult(*_apply_to_batch(analyze_power_spectral_density, pxx, f, n, aliased, msd, coherent,
+                                               axis=axis))
+    return analyze_power_spectral_density(pxx, f, n, aliased, msd, coherent)
+
+
+def analyze_power_spectral_density(pxx, frequencies=None, n=6, aliased=False, msd=0, coherent=False):
+    """SNR, SINAD, THD, SFDR and TOI from input signal.
+
+    This function computes all the metrics for an input signal from its density-periodogram.
+    The DC component, the fundamental and the harmonics are located once and shared by all the metrics.
+    The function assumes the fundamental frequency to be the desired signal.
+
+    Parameters
+    ----------
+    pxx : numpy ndarray or Spectrum or SpectrumIndex
+        The power spectral density of the signal, or a :class:`pysnr.Spectrum` or :class:`pysnr.SpectrumIndex` built
+        from it. The analysis memoized by a Spectrum is reused across calls.
+    frequencies : numpy ndarray
+        The frequencies corresponding to the power spectral density. Not needed if `pxx` is a Spectrum or a
+        SpectrumIndex.
+    n : int
+        Number of harmonics to use (including the fundamental frequency)
+    aliased : bool
+        If True, converts the harmonics that are aliased into the Nyquist frequency
+    msd : int
+        Minimum number of discrete Fourier bins to ignore for the SFDR computation
+    coherent : bool
+        If True, the periodogram is assumed to be computed with a rectangular window from a coherently sampled
+        signal, so that each tone is a single bin. Ignored if `pxx` is a Spectrum, which has its own mode.
+
+    Returns
+    -------
+    AnalysisResult
+        The computed metrics
+    """
+    spectrum = _as_spectrum(pxx, frequencies, coherent)
+    f = spectrum.frequencies
+    signal_power = spectrum.band_powers(1, False)[0]
+
+    # SNR
+    total_noise = spectrum.noise_power(n, aliased)
+    snr = mag2db(signal_power / total_noise), mag2db(total_noise)
+
+    # SINAD
+    total_noise = spectrum.noise_power(1, False)
+    sinad = mag2db(signal_power / total_noise), mag2db(total_noise)
+
+    # THD
+    harmonic_power = np.sum(spectrum.band_powers(n, aliased)[1:])
+    thd = mag2db(harmonic_power / signal_power), mag2db(harmonic_power)
+
+    # TOI, which restores the working copy of pxx_no_dc, then SFDR which zeroes its fundamental region
+    fundamental = spectrum.fundamental
+    pxx_no_dc = spectrum._working_copy(last=True)
+    toi = _toi_from_psd_without_dc(pxx_no_dc, f, fundamental, spectrum.coherent, spectrum._given_index())
+    sfdr = _sfdr_from_psd_without_dc(pxx_no_dc, f, fundamental, msd, spectrum.coherent)
+
+    return AnalysisResult(*snr, *sinad, *thd, *sfdr, *toi)
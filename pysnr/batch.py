@@ -0,0 +1,198 @@
+import os
+import csv
+import mmap
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from pysnr.analyze import analyze, AnalysisResult
+from pysnr.loader import load_raw, load_mat
+
+
+RESULT_DTYPE = np.dtype([("index", np.int64)] + [
+    (name, np.float64, (2,)) if name in ("fund_power", "imod_power") else (name, np.float64)
+    for name in AnalysisResult._fields
+])
+
+
+def iter_batch(source, fs=1.0, n=6, aliased=False, msd=0, workers=None, chunk_size=64, dtype=np.int16, offset=0,
+               key="x"):
+    """Computes all the metrics for many captures in a pool of processes, yielding results as they complete.
+
+    A 2-D memory-mapped array is re-opened from its file by the workers, and any other 2-D array is copied once
+    into shared memory; in both cases the workers read the captures in place instead of receiving pickled arrays.
+    Files are loaded by the workers with :func:`pysnr.load_raw`, :func:`pysnr.load_mat` or :func:`numpy.load`.
+
+    Parameters
+    ----------
+    source : numpy ndarray or list of str
+        A (captures, samples) array, or the paths of the capture files (raw binary, `.npy` or `.mat`)
+    fs : float
+        Sampling Frequency. Defaults to 1.0.
+    n : int
+        Number of harmonics to use (including the fundamental frequency)
+    aliased : bool
+        If True, converts the harmonics that are aliased into the Nyquist frequency
+    msd : int
+        Minimum number of discrete Fourier bins to ignore for the SFDR computation
+    workers : int
+        Number of worker processes. Defaults to the number of CPUs; 0 runs in the calling process.
+    chunk_size : int
+        Number of captures processed by a worker at a time
+    dtype : numpy dtype
+        Data type of the samples in raw binary files
+    offset : int
+        Number of header bytes to skip in raw binary files
+    key : str
+        Name of the variable holding the signal in `.mat` files
+
+    Yields
+    ------
+    numpy ndarray
+        Structured array of :data:`RESULT_DTYPE` with the results of a chunk of captures
+    """
+    params = (fs, n, aliased, msd)
+    shm = None
+    if isinstance(source, np.ndarray):
+        if source.ndim != 2:
+            raise TypeError("Source array must be 2-D with one capture per row")
+        total = source.shape[0]
+        if isinstance(source, np.memmap) and isinstance(source.base, mmap.mmap) and source.filename is not None:
+            order = "F" if source.flags.f_contiguous and not source.flags.c_contiguous else "C"
+            spec = ("memmap", source.filename, source.offset, source.shape, source.dtype.str, order)
+        else:
+            shm = shared_memory.SharedMemory(create=True, size=max(1, source.nbytes))
+            np.ndarray(source.shape, source.dtype, buffer=shm.buf)[:] = source
+            spec = ("shm", shm.name, source.shape, source.dtype.str)
+    else:
+        source = [os.fspath(path) for path in source]
+        total = len(source)
+        spec = ("files", np.dtype(dtype).str, offset, key)
+
+    chunks = [(start, min(start + chunk_size, total)) for start in range(0, total, chunk_size)]
+    try:
+        if workers == 0:
+            for start, stop in chunks:
+                yield _process_chunk(spec, source if spec[0] == "files" else None, start, stop, params)
+            return
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_process_chunk, spec, source[start:stop] if spec[0] == "files" else None,
+                                       start, stop, params) for start, stop in chunks]
+            for future in as_completed(futures):
+                yield future.result()
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+
+
+def run_batch(source, fs=1.0, n=6, aliased=False, msd=0, workers=None, chunk_size=64, dtype=np.int16, offset=0,
+              key="x", progress=None, csv_path=None):
+    """Computes all the metrics for many captures in a pool of processes.
+
+    Parameters
+    ----------
+    source : numpy ndarray or list of str
+        A (captures, samples) array, or the paths of the capture files (raw binary, `.npy` or `.mat`)
+    fs : float
+        Sampling Frequency. Defaults to 1.0.
+    n : int
+        Number of harmonics to use (including the fundamental frequency)
+    aliased : bool
+        If True, converts the harmonics that are aliased into the Nyquist frequency
+    msd : int
+        Minimum number of discrete Fourier bins to ignore for the SFDR computation
+    workers : int
+        Number of worker processes. Defaults to the number of CPUs; 0 runs in the calling process.
+    chunk_size : int
+        Number of captures processed by a worker at a time
+    dtype : numpy dtype
+        Data type of the samples in raw binary files
+    offset : int
+        Number of header bytes to skip in raw binary files
+    key : str
+        Name of the variable holding the signal in `.mat` files
+    progress : callable
+        If provided, called with the number of captures done and the total number of captures after each chunk
+    csv_path : str
+        If provided, the results are also written to this CSV file as they complete
+
+    Returns
+    -------
+    numpy ndarray
+        Structured array of :data:`RESULT_DTYPE` with one row per capture, in the order of `source`
+    """
+    total = source.shape[0] if isinstance(source, np.ndarray) else len(source)
+    results = np.empty(total, dtype=RESULT_DTYPE)
+    done = 0
+    fh = open(csv_path, "w", newline="") if csv_path is not None else None
+    try:
+        writer = None
+        if fh is not None:
+            writer = csv.writer(fh)
+            writer.writerow(_csv_header())
+        for chunk in iter_batch(source, fs, n, aliased, msd, workers, chunk_size, dtype, offset, key):
+            results[chunk["index"]] = chunk
+            if writer is not None:
+                writer.writerows(_csv_rows(chunk))
+                fh.flush()
+            done += len(chunk)
+            if progress is not None:
+                progress(done, total)
+    finally:
+        if fh is not None:
+            fh.close()
+    return results
+
+
+def _csv_header():
+    header = []
+    for name in RESULT_DTYPE.names:
+        if RESULT_DTYPE[name].shape:
+            header += ["{}_{}".format(name, i) for i in range(RESULT_DTYPE[name].shape[0])]
+        else:
+            header.append(name)
+    return header
+
+
+def _csv_rows(chunk):
+    for row in chunk:
+        yield [value for name in RESULT_DTYPE.names for value in np.atleast_1d(row[name]).tolist()]
+
+
+def _load_capture(path, dtype, offset, key):
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    if path.endswith(".mat"):
+        return load_mat(path, key).data
+    return load_raw(path, dtype, offset).data
+
+
+def _process_chunk(spec, paths, start, stop, params):
+    fs, n, aliased, msd = params
+    chunk = np.empty(stop - start, dtype=RESULT_DTYPE)
+    chunk["index"] = np.arange(start, stop)
+    if spec[0] == "files":
+        kind, dtype, offset, key = spec
+        for row, path in enumerate(paths):
+            output = analyze(_load_capture(path, dtype, offset, key), fs, n, aliased, msd)
+            for name, value in zip(AnalysisResult._fields, output):
+                chunk[name][row] = value
+        return chunk
+
+    shm = None
+    if spec[0] == "memmap":
+        kind, filename, file_offset, shape, dtype, order = spec
+        data = np.memmap(filename, dtype=dtype, mode="r", offset=file_offset, shape=shape, order=order)
+    else:
+        kind, name, shape, dtype = spec
+        shm = shared_memory.SharedMemory(name=name)
+        data = np.ndarray(shape, dtype, buffer=shm.buf)
+    try:
+        output = analyze(data[start:stop], fs, n, aliased, msd)
+        for name, value in zip(AnalysisResult._fields, output):
+            chunk[name] = value
+    finally:
+        del data
+        if shm is not None:
+            shm.close()
+    return chunk
@@ -0,0 +1,184 @@
+import os
+import csv
+import hashlib
+import numpy as np
+from collections import namedtuple
+from pysnr.batch import iter_batch, RESULT_DTYPE
+
+
+CAPTURE_DTYPE = np.dtype([("amplitude", np.float64), ("frequency", np.float64)] + [
+    (name, RESULT_DTYPE[name]) for name in RESULT_DTYPE.names])
+
+Characterization = namedtuple("Characterization", [
+    "captures", "snr_vs_amplitude", "sfdr_vs_frequency", "enob", "dynamic_range"])
+Characterization.__doc__ = """Results of :func:`characterize`.
+
+`captures` is a structured array of :data:`CAPTURE_DTYPE` with the stimulus and the metrics of each capture, in the
+order of the manifest. The other fields are tidy structured arrays, one row per stimulus, sorted by their first two
+fields, the metrics of repeated captures of a stimulus being averaged:
+
+- `snr_vs_amplitude`: frequency, amplitude and snr
+- `sfdr_vs_frequency`: amplitude, frequency and sfdr
+- `enob`: frequency, amplitude, sinad and enob, the effective number of bits referred to full scale
+- `dynamic_range`: frequency and dynamic_range, in dB
+"""
+
+
+def characterize(manifest, fs=1.0, n=6, aliased=False, msd=0, workers=None, chunk_size=64, dtype=np.int16, offset=0,
+                 key="x", cache_dir=None, progress=None):
+    """Characterizes a converter from a sweep of captures at stepped input amplitudes and frequencies.
+
+    The captures are processed by :func:`pysnr.iter_batch`, in a pool of processes, with all the metrics of each
+    capture computed from a single periodogram. If `cache_dir` is provided, the results of each capture are stored
+    as soon as they are computed, under the hash of the content of the capture file and of the analysis parameters:
+    running the same sweep again, e.g. after an interruption, only processes the captures missing from the cache.
+    Captures with identical content are then also processed once. Without a cache, the files are not hashed and every
+    capture is processed.
+
+    The effective number of bits is referred to full scale, ``(SINAD - 1.76 - amplitude) / 6.02`` with the amplitude
+    in dBFS, and the dynamic range of each frequency is the SINAD at its lowest amplitude extrapolated to a 0 dB
+    SINAD, ``SINAD - amplitude``, assuming that the lowest amplitude is limited by noise.
+
+    Parameters
+    ----------
+    manifest : list of dict or str
+        The captures, each a mapping with the `path` of the capture file (raw binary, `.npy` or `.mat`), the
+        `amplitude` of the stimulus in dBFS and its `frequency`; or the path of a CSV file with these columns, whose
+        relative capture paths are taken from the folder of the CSV file
+    fs : float
+        Sampling Frequency. Defaults to 1.0.
+    n : int
+        Number of harmonics to use (including the fundamental frequency)
+    aliased : bool
+        If True, converts the harmonics that are aliased into the Nyquist frequency
+    msd : int
+        Minimum number of discrete Fourier bins to ignore for the SFDR computation
+    workers : int
+        Number of worker processes. Defaults to the number of CPUs; 0 runs in the calling process.
+    chunk_size : int
+        Number of captures processed by a worker at a time
+    dtype : numpy dtype
+        Data type of the samples in raw binary files
+    offset : int
+        Number of header bytes to skip in raw binary files
+    key : str
+        Name of the variable holding the signal in `.mat` files
+    cache_dir : str
+        If provided, folder where the results of each capture are cached
+    progress : callable
+        If provided, called with the number of captures processed and the number of captures to process (those
+        missing from the cache) after each chunk
+
+    Returns
+    -------
+    Characterization
+        The metrics of every capture, the curves and the derived figures
+    """
+    entries = _read_manifest(manifest)
+    params = repr((fs, n, aliased, msd, np.dtype(dtype).str, offset, key))
+    captures = np.zeros(len(entries), dtype=CAPTURE_DTYPE)
+    captures["index"] = np.arange(len(entries))
+    captures["amplitude"] = [float(entry["amplitude"]) for entry in entries]
+    captures["frequency"] = [float(entry["frequency"]) for entry in entries]
+
+    # With a cache, captures sharing a content hash are processed once; without one, every row is processed
+    rows = {}
+    for row, entry in enumerate(entries):
+        digest = _content_hash(entry["path"], params) if cache_dir is not None else str(row)
+        rows.setdefault(digest, []).append(row)
+    pending = []
+    for digest, indices in rows.items():
+        cached = _load_cached(cache_dir, digest)
+        if cached is None:
+            pending.append(digest)
+        else:
+            _store(captures, indices, cached)
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+
+    done = 0
+    paths = [entries[rows[digest][0]]["path"] for digest in pending]
+    for chunk in iter_batch(paths, fs, n, aliased, msd, workers, chunk_size, dtype, offset, key):
+        for result in chunk:
+            digest = pending[result["index"]]
+            _store(captures, rows[digest], result)
+            if cache_dir is not None:
+                _save_cached(cache_dir, digest, result)
+        done += len(chunk)
+        if progress is not None:
+            progress(done, len(pending))
+
+    enob = _curve(captures, ("frequency", "amplitude"), ("sinad",))
+    enob = _add_field(enob, "enob", (enob["sinad"] - 1.76 - enob["amplitude"]) / 6.02)
+    frequencies, first = np.unique(enob["frequency"], return_index=True)
+    dynamic_range = np.zeros(len(frequencies), dtype=[("frequency", np.float64), ("dynamic_range", np.float64)])
+    dynamic_range["frequency"] = frequencies
+    dynamic_range["dynamic_range"] = enob["sinad"][first] - enob["amplitude"][first]
+    return Characterization(captures, _curve(captures, ("frequency", "amplitude"), ("snr",)),
+                            _curve(captures, ("amplitude", "frequency"), ("sfdr",)), enob, dynamic_range)
+
+
+def _read_manifest(manifest):
+    if not isinstance(manifest, (str, os.PathLike)):
+        entries = [dict(entry) for entry in manifest]
+        for entry in entries:
+            entry["path"] = os.fspath(entry["path"])
+        return entries
+    folder = os.path.dirname(os.fspath(manifest))
+    with open(manifest, newline="") as fh:
+        entries = list(csv.DictReader(fh))
+    for entry in entries:
+        entry["path"] = os.path.join(folder, entry["path"])
+    return entries
+
+
+def _content_hash(path, params):
+    digest = hashlib.sha256(params.encode())
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _load_cached(cache_dir, digest):
+    if cache_dir is None:
+        return None
+    path = os.path.join(cache_dir, digest + ".npy")
+    if not os.path.exists(path):
+        return None
+    return np.load(path)
+
+
+def _save_cached(cache_dir, digest, result):
+    # Written under a temporary name and renamed, so that an interrupted write leaves no partial entry
+    path = os.path.join(cache_dir, digest + ".npy")
+    with open(path + ".tmp", "wb") as fh:
+        np.save(fh, np.asarray(result, dtype=RESULT_DTYPE))
+    os.replace(path + ".tmp", path)
+
+
+def _store(captures, indices, result):
+    for name in RESULT_DTYPE.names:
+        if name != "index":
+            captures[name][indices] = result[name]
+
+
+def _curve(captures, keys, metrics):
+    # Mean of the metrics over the captures of each stimulus, sorted by the keys
+    stimuli, inverse = np.unique(np.stack([captures[name] for name in keys], axis=-1), axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    counts = np.bincount(inverse, minlength=len(stimuli))
+    curve = np.zeros(len(stimuli), dtype=[(name, np.float64) for name in keys + metrics])
+    for column, name in enumerate(keys):
+        curve[name] = stimuli[:, column]
+    for name in metrics:
+        curve[name] = np.bincount(inverse, weights=captures[name], minlength=len(stimuli)) / counts
+    return curve
+
+
+def _add_field(array, name, values):
+    output = np.zeros(len(array), dtype=array.dtype.descr + [(name, np.float64)])
+    for field in array.dtype.names:
+        output[field] = array[field]
+    output[name] = values
+    return output
@@ -0,0 +1,60 @@
+import numpy as np
+
+
+def coherent_frequency(freq, N, fs=1.0):
+    """Returns the coherent test frequency closest to a target frequency.
+
+    A tone is coherently sampled when the record of `N` samples holds an integer number of its periods, so that
+    its energy falls in a single bin of the periodogram computed with a rectangular window. The number of periods
+    is also chosen coprime with `N`, so that every sample of the record falls on a different phase of the tone.
+
+    Parameters
+    ----------
+    freq : float
+        The target frequency, between 0 and `fs`/2
+    N : int
+        Number of samples in the record
+    fs : float
+        Sampling Frequency. Defaults to 1.0.
+
+    Returns
+    -------
+    float
+        The coherent frequency, ``cycles * fs / N``
+    int
+        The number of periods of the tone in the record
+    """
+    if N < 4:
+        raise ValueError("At least 4 samples are needed for a coherent tone")
+    if not 0 < freq < fs / 2:
+        raise ValueError("Frequency must lie between 0 and the Nyquist frequency")
+    target = freq * N / fs
+    candidates = np.arange(1, (N - 1) // 2 + 1)
+    candidates = candidates[np.gcd(candidates, N) == 1]
+    cycles = int(candidates[np.argmin(np.abs(candidates - target))])
+    return cycles * fs / N, cycles
+
+
+def is_coherent(freq, N, fs=1.0, tol=1e-6):
+    """Checks whether a tone is coherently sampled.
+
+    Parameters
+    ----------
+    freq : float
+        The frequency of the tone
+    N : int
+        Number of samples in the record
+    fs : float
+        Sampling Frequency. Defaults to 1.0.
+    tol : float
+        Largest distance, in periods, between the number of periods in the record and an integer
+
+    Returns
+    -------
+    bool
+        True if the record holds an integer number of periods of the tone, below the Nyquist frequency. The
+        number of periods need not be coprime with `N`.
+    """
+    cycles = freq * N / fs
+    nearest = round(cycles)
+    return bool(abs(cycles - nearest) <= tol and 0 < nearest < N / 2)
@@ -0,0 +1,166 @@
+import os
+import threading
+import contextlib
+import numpy as np
+import scipy.fft
+from collections import OrderedDict
+
+
+_backends = {}
+_releasing_gil = set()
+_state = {"name": "numpy", "options": {}}
+
+
+def register_backend(name, factory, releases_gil=False):
+    """Registers an FFT backend.
+
+    Parameters
+    ----------
+    name : str
+        Name used to select the backend
+    factory : callable
+        Called with the options given to :func:`set_backend`; must return a function ``rfft(x, axis=-1,
+        overwrite_x=False)`` computing the real-input FFT of `x` along `axis`
+    releases_gil : bool
+        If True, the FFTs of several threads may run concurrently, and :func:`pysnr.analyze_channels` computes
+        groups of channels in a thread pool
+    """
+    _backends[name] = factory
+    if releases_gil:
+        _releasing_gil.add(name)
+    else:
+        _releasing_gil.discard(name)
+    if name == _state["name"]:
+        _state["rfft"] = factory(**_state["options"])
+
+
+def available_backends():
+    """Returns the names of the registered FFT backends.
+
+    Returns
+    -------
+    list of str
+        The names of the backends
+    """
+    return list(_backends.keys())
+
+
+def set_backend(name, **options):
+    """Selects the FFT backend used by all the metric functions.
+
+    Parameters
+    ----------
+    name : str
+        Name of the backend: 'numpy', 'scipy' (or 'pocketfft'), 'pyfftw', or any registered backend
+    **options
+        Backend options, e.g. `workers` for 'scipy' or `threads` and `planner_effort` for 'pyfftw'
+    """
+    if name not in _backends:
+        raise ValueError("Unknown FFT backend '{}'. Available backends are {}".format(name, available_backends()))
+    rfft_func = _backends[name](**options)
+    _state.update(name=name, options=options, rfft=rfft_func)
+
+
+def get_backend():
+    """Returns the name and options of the selected FFT backend.
+
+    Returns
+    -------
+    str
+        The name of the backend
+    dict
+        The options of the backend
+    """
+    return _state["name"], dict(_state["options"])
+
+
+@contextlib.contextmanager
+def backend(name, **options):
+    """Context manager selecting an FFT backend temporarily.
+
+    Parameters
+    ----------
+    name : str
+        Name of the backend
+    **options
+        Backend options
+    """
+    previous = dict(_state)
+    set_backend(name, **options)
+    try:
+        yield
+    finally:
+        _state.clear()
+        _state.update(previous)
+
+
+def rfft(x, axis=-1, overwrite_x=False):
+    """Computes the real-input FFT with the selected backend.
+
+    Parameters
+    ----------
+    x : numpy ndarray
+        The input signal(s)
+    axis : int
+        Axis along which the FFT is computed
+    overwrite_x : bool
+        If True, the backend may use `x` as a workspace
+
+    Returns
+    -------
+    numpy ndarray
+        The FFT of `x`
+    """
+    return _state["rfft"](x, axis=axis, overwrite_x=overwrite_x)
+
+
+def _releases_gil():
+    return _state["name"] in _releasing_gil
+
+
+def _numpy_backend():
+    def _rfft(x, axis=-1, overwrite_x=False):
+        if np.result_type(x) == np.float32:
+            # np.fft upcasts to complex128 before numpy 2.0, while scipy.fft keeps single precision
+            return scipy.fft.rfft(x, axis=axis, overwrite_x=overwrite_x)
+        return np.fft.rfft(x, axis=axis)
+    return _rfft
+
+
+def _scipy_backend(workers=-1):
+    def _rfft(x, axis=-1, overwrite_x=False):
+        return scipy.fft.rfft(x, axis=axis, overwrite_x=overwrite_x, workers=workers)
+    return _rfft
+
+
+def _pyfftw_backend(threads=None, planner_effort="FFTW_MEASURE", max_plans=8):
+    try:
+        import pyfftw
+    except ImportError:
+        raise ImportError("pyfftw is required to use the 'pyfftw' FFT backend")
+    if threads is None:
+        threads = os.cpu_count() or 1
+    plans = OrderedDict()
+    lock = threading.Lock()
+
+    def _rfft(x, axis=-1, overwrite_x=False):
+        x = np.asarray(x)
+        key = (x.shape, x.dtype.str, axis)
+        with lock:
+            if key in plans:
+                plans.move_to_end(key)
+            else:
+                plans[key] = pyfftw.builders.rfft(pyfftw.empty_aligned(x.shape, dtype=x.dtype), axis=axis,
+                                                  threads=threads, planner_effort=planner_effort)
+                while len(plans) > max_plans:
+                    plans.popitem(last=False)
+            # The output array of a plan is reused by its next execution
+            return plans[key](x).copy()
+    return _rfft
+
+
+register_backend("numpy", _numpy_backend, releases_gil=True)
+register_backend("scipy", _scipy_backend, releases_gil=True)
+register_backend("pocketfft", _scipy_backend, releases_gil=True)
+# The plans are executed under a lock, FFTW threading the transforms itself
+register_backend("pyfftw", _pyfftw_backend)
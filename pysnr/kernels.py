@@ -0,0 +1,131 @@
+import os
+import contextlib
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+_state = {"name": "numpy"}
+
+
+def available_kernels():
+    """Returns the names of the available computation kernels.
+
+    Returns
+    -------
+    list of str
+        'numpy', and 'numba' if Numba is installed (``pip install pysnr[fast]``)
+    """
+    return ["numpy"] + (["numba"] if numba is not None else [])
+
+
+def set_kernels(name):
+    """Selects the kernels used for the peak border walks and the band power integration of short bands.
+
+    The Numba kernels are selected by default when Numba is installed, unless the environment variable
+    ``PYSNR_KERNELS`` is set to 'numpy'. Both kernels give the same indices and metrics.
+
+    Parameters
+    ----------
+    name : str
+        'numpy' or 'numba'
+    """
+    if name not in available_kernels():
+        raise ValueError("Unknown kernels '{}'. Available kernels are {}".format(name, available_kernels()))
+    _state["name"] = name
+
+
+def get_kernels():
+    """Returns the name of the selected kernels.
+
+    Returns
+    -------
+    str
+        'numpy' or 'numba'
+    """
+    return _state["name"]
+
+
+@contextlib.contextmanager
+def kernels(name):
+    """Context manager selecting the kernels temporarily.
+
+    Parameters
+    ----------
+    name : str
+        'numpy' or 'numba'
+    """
+    previous = _state["name"]
+    set_kernels(name)
+    try:
+        yield
+    finally:
+        _state["name"] = previous
+
+
+def _use_numba():
+    return _state["name"] == "numba"
+
+
+def _tone_borders(pxx, tone_indices):
+    # Walks left from each tone while the previous bin is not higher, and right while the next bin is not higher
+    N = len(pxx)
+    left = np.empty(len(tone_indices), dtype=np.int64)
+    right = np.empty(len(tone_indices), dtype=np.int64)
+    for k in range(len(tone_indices)):
+        t = tone_indices[k]
+        left[k] = 0
+        for j in range(max(0, t - 1) - 1, -1, -1):
+            if not pxx[j] <= pxx[j + 1]:
+                left[k] = j + 1
+                break
+        right[k] = N - 1
+        for j in range(min(t + 1, N - 1), N - 1):
+            if not pxx[j] >= pxx[j + 1]:
+                right[k] = j
+                break
+    return left, right
+
+
+def _peak_border(sxx, fund_bin):
+    # Last bin before the peak followed by a lower bin, and the bin before the first rise after the peak
+    N = len(sxx)
+    left = 0
+    for j in range(fund_bin - 1, -1, -1):
+        if sxx[j + 1] < sxx[j]:
+            left = j
+            break
+    right = N - 1
+    for j in range(fund_bin, N - 1):
+        if sxx[j + 1] > sxx[j]:
+            right = j - 1
+            break
+    return left, right
+
+
+def _bandpower(pxx, f):
+    # Integration with the width to the next bin, or to the previous one if the band starts at 0 Hz; the missing
+    # width is the mean width of the band
+    N = len(pxx)
+    missing_width = (f[N - 1] - f[0]) / (N - 1)
+    total = 0.0
+    if f[0] == 0:
+        total += pxx[0] * missing_width
+        for i in range(1, N):
+            total += pxx[i] * (f[i] - f[i - 1])
+    else:
+        for i in range(N - 1):
+            total += pxx[i] * (f[i + 1] - f[i])
+        total += pxx[N - 1] * missing_width
+    return total
+
+
+if numba is not None:
+    _tone_borders = numba.njit(cache=True, error_model="numpy")(_tone_borders)
+    _peak_border = numba.njit(cache=True, error_model="numpy")(_peak_border)
+    _bandpower = numba.njit(cache=True, error_model="numpy")(_bandpower)
+    if os.environ.get("PYSNR_KERNELS", "numba") != "numpy":
+        _state["name"] = "numba"
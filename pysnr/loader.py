@@ -0,0 +1,93 @@
+import numpy as np
+import scipy.io
+from collections import namedtuple
+
+
+Capture = namedtuple("Capture", ["data", "scale"])
+Capture.__doc__ = """Samples of a capture along with the factor converting them to volts.
+
+The samples are kept in their stored data type and can be passed directly to :func:`pysnr.periodogram` and the
+``*_signal`` functions. The ratios computed by the metric functions do not depend on the scale; to get the
+power magnitudes in volts, pass `scale` to :func:`pysnr.periodogram` or add ``mag2db(scale ** 2)`` to them.
+"""
+
+
+def load_raw(path, dtype=np.int16, offset=0, channels=1, channel=None, scale=1.0):
+    """Memory-maps a raw binary capture.
+
+    The file is not read into memory; the returned samples are a read-only view of the file.
+
+    Parameters
+    ----------
+    path : str
+        Path of the binary file
+    dtype : numpy dtype
+        Data type of the stored samples. Defaults to int16.
+    offset : int
+        Number of bytes to skip at the start of the file, e.g. for a header
+    channels : int
+        Number of interleaved channels in the file
+    channel : int
+        If provided, only the samples of this channel are returned
+    scale : float
+        Factor converting the stored samples to volts
+
+    Returns
+    -------
+    Capture
+        The samples as a 1-D array, or as a (channels, samples) strided view if `channels` is greater than 1
+        and `channel` is not provided
+    """
+    data = np.memmap(path, dtype=dtype, mode="r", offset=offset)
+    if channels > 1:
+        samples = len(data) // channels
+        data = data[:samples * channels].reshape(samples, channels).T
+        if channel is not None:
+            data = data[channel]
+    elif channel not in (None, 0):
+        raise ValueError("channel must be less than the number of channels")
+    return Capture(data, scale)
+
+
+def load_mat(path, key, scale=1.0):
+    """Loads a signal stored in a MATLAB file.
+
+    MATLAB v7.3 files are memory-mapped when the variable is stored contiguously; this requires `h5py`.
+    Older MATLAB files can not be memory-mapped and are read into memory.
+
+    Parameters
+    ----------
+    path : str
+        Path of the `.mat` file
+    key : str
+        Name of the variable holding the signal
+    scale : float
+        Factor converting the stored samples to volts
+
+    Returns
+    -------
+    Capture
+        The samples, flattened to 1-D if the variable is a vector
+    """
+    try:
+        data = scipy.io.loadmat(path, variable_names=[key])[key]
+    except NotImplementedError:
+        data = _memmap_hdf5_dataset(path, key)
+    if min(data.shape) == 1:
+        data = data.reshape(-1)
+    return Capture(data, scale)
+
+
+def _memmap_hdf5_dataset(path, key):
+    try:
+        import h5py
+    except ImportError:
+        raise ImportError("h5py is required to load MATLAB v7.3 files")
+    with h5py.File(path, "r") as fh:
+        dataset = fh[key]
+        offset = dataset.id.get_offset()
+        if offset is None:
+            # Chunked or compressed datasets can not be memory-mapped
+            return dataset[()]
+        dtype, shape = dataset.dtype, dataset.shape
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
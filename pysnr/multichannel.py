@@ -0,0 +1,134 @@
+import os
+import contextvars
+import numpy as np
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pysnr.analyze import analyze, AnalysisResult
+from pysnr.fft import _releases_gil
+
+
+# Metrics summarised across the channels, and whether their worst value is the highest one
+_SUMMARISED = (("snr", False), ("sinad", False), ("thd", True), ("sfdr", False), ("toi", False))
+
+MultiChannelResult = namedtuple("MultiChannelResult", ["channels", "worst_channel", "worst", "spread"])
+MultiChannelResult.__doc__ = """Metrics computed by :func:`analyze_channels`.
+
+`channels` is an :class:`AnalysisResult` holding one value per channel in each field. `worst_channel`, `worst` and
+`spread` map the names of the metrics (snr, sinad, thd, sfdr and toi) to the index of the worst channel (-1 if the
+metric is undefined on all channels), its value, and the difference between the best and worst values.
+"""
+
+
+def deinterleave(buffer, channels, stride=None, offset=0):
+    """Returns a (channels, samples) view of an interleaved capture buffer.
+
+    No data is copied: the view reads the samples of each channel in place, through strides.
+
+    Parameters
+    ----------
+    buffer : numpy ndarray
+        The 1-D interleaved buffer, e.g. a memory-mapped capture file
+    channels : int
+        Number of channels
+    stride : int
+        Number of samples between the starts of two consecutive frames. Defaults to `channels`; larger strides skip
+        the extra samples (e.g. status words) of each frame.
+    offset : int
+        Index of the first sample of the first channel in `buffer`
+
+    Returns
+    -------
+    numpy ndarray
+        A view of shape (channels, frames); an incomplete frame at the end of the buffer is ignored
+    """
+    buffer = np.asarray(buffer)
+    if buffer.ndim != 1:
+        raise TypeError("Interleaved buffer must be a 1-D array")
+    if stride is None:
+        stride = channels
+    if not 0 < channels <= stride:
+        raise ValueError("channels must be positive and at most stride")
+    frames = (len(buffer) - offset) // stride
+    return buffer[offset:offset + frames * stride].reshape(frames, stride)[:, :channels].T
+
+
+def analyze_channels(data, fs=1.0, n=6, aliased=False, msd=0, channels=None, stride=None, offset=0, workers=None,
+                     nperseg=None, noverlap=None, average="mean", dtype=np.float64, coherent=False):
+    """SNR, SINAD, THD, SFDR and TOI of every channel of a multi-channel capture.
+
+    The spectra of the channels are computed in a single batched FFT. When the selected FFT backend releases the GIL,
+    the channels are split into groups processed by a pool of threads, each group in a batched FFT.
+
+    Parameters
+    ----------
+    data : numpy ndarray
+        A (channels, samples) array, or a 1-D interleaved buffer if `channels` is provided
+    fs : float
+        Sampling Frequency. Defaults to 1.0.
+    n : int
+        Number of harmonics to use (including the fundamental frequency)
+    aliased : bool
+        If True, converts the harmonics that are aliased into the Nyquist frequency
+    msd : int
+        Minimum number of discrete Fourier bins to ignore for the SFDR computation
+    channels : int
+        Number of channels interleaved in `data`, which is de-interleaved with :func:`deinterleave`
+    stride : int
+        Number of samples between the starts of two consecutive frames of the interleaved buffer. Defaults to
+        `channels`.
+    offset : int
+        Index of the first sample of the first channel in the interleaved buffer
+    workers : int
+        Number of threads. Defaults to the number of CPUs if the FFT backend releases the GIL, and 1 otherwise.
+    nperseg : int
+        If provided, the periodograms are Welch-averaged over segments of `nperseg` samples
+    noverlap : int
+        Number of samples shared by consecutive segments. Defaults to half of `nperseg`.
+    average : str
+        Decides how the periodograms of the segments are averaged. Can be 'mean' or 'median'
+    dtype : numpy dtype
+        Floating point precision of the periodograms: float64 (default) or float32
+    coherent : bool
+        If True, the channels are assumed to be coherently sampled (see :func:`pysnr.coherent_frequency`)
+
+    Returns
+    -------
+    MultiChannelResult
+        The metrics of every channel, and their worst value and spread across the channels
+    """
+    if channels is not None:
+        data = deinterleave(data, channels, stride, offset)
+    elif not isinstance(data, np.ndarray) or data.ndim != 2:
+        raise TypeError("Data must be a 2-D (channels, samples) array, or a 1-D buffer with the number of channels")
+
+    count = data.shape[0]
+    if workers is None:
+        workers = (os.cpu_count() or 1) if _releases_gil() else 1
+    workers = max(1, min(workers, count))
+    groups = np.array_split(np.arange(count), workers)
+
+    def process(rows):
+        return analyze(data[rows[0]:rows[-1] + 1], fs, n, aliased, msd, axis=-1, nperseg=nperseg,
+                       noverlap=noverlap, average=average, dtype=dtype, coherent=coherent)
+
+    if workers == 1:
+        outputs = [process(groups[0])]
+    else:
+        # Each group runs in a copy of the context, so that the active profiles record its stages
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(contextvars.copy_context().run, process, rows) for rows in groups]
+            outputs = [future.result() for future in futures]
+    result = AnalysisResult(*(np.concatenate(values) for values in zip(*outputs)))
+
+    worst_channel, worst, spread = {}, {}, {}
+    for name, highest in _SUMMARISED:
+        values = getattr(result, name)
+        valid = ~np.isnan(values)
+        if not valid.any():
+            worst_channel[name], worst[name], spread[name] = -1, np.nan, np.nan
+            continue
+        masked = np.where(valid, values, -np.inf if highest else np.inf)
+        worst_channel[name] = int(np.argmax(masked) if highest else np.argmin(masked))
+        worst[name] = values[worst_channel[name]]
+        spread[name] = np.max(values[valid]) - np.min(values[valid])
+    return MultiChannelResult(result, worst_channel, worst, spread)
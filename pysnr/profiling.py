@@ -0,0 +1,229 @@
+import time
+import threading
+import functools
+import contextlib
+import contextvars
+import tracemalloc
+
+
+_hooks = ()
+_hooks_lock = threading.Lock()
+# Profiles active in the current context: each thread (and asyncio task) has its own
+_profiles = contextvars.ContextVar("pysnr_profiles", default=())
+_local = threading.local()
+_disabled = contextlib.nullcontext()
+# Peak allocations need tracemalloc.reset_peak (Python 3.9+)
+_can_trace_peaks = hasattr(tracemalloc, "reset_peak")
+
+
+def add_hook(callback):
+    """Registers a callback receiving the timings of the processing stages.
+
+    While at least one callback is registered, the stages of the metric functions (window, fft, dc_removal,
+    harmonic_search, tone_search, noise_estimate, bandpower, spur_search, imod_search) are timed.
+    Stages may be nested, e.g. tone_search runs within dc_removal; their times are inclusive.
+
+    Parameters
+    ----------
+    callback : callable
+        Called with the name of the stage, its wall time in seconds, and the peak number of bytes it allocated
+        (None unless :mod:`tracemalloc` is tracing, on Python 3.9+) at the end of every stage
+    """
+    global _hooks
+    with _hooks_lock:
+        _hooks = _hooks + (callback,)
+
+
+def remove_hook(callback):
+    """Unregisters a callback added with :func:`add_hook`.
+
+    Parameters
+    ----------
+    callback : callable
+        The callback to remove
+    """
+    global _hooks
+    with _hooks_lock:
+        hooks = list(_hooks)
+        hooks.remove(callback)
+        _hooks = tuple(hooks)
+
+
+class Profile:
+    """Context manager recording the time and memory spent in each processing stage.
+
+    The stages run within the context are recorded: those of the thread that entered it, and those of the thread
+    pool of :func:`pysnr.analyze_channels`, which runs in a copy of the context. Profiles entered concurrently by
+    other threads record their own stages only. Profiling is disabled outside of the context, where the
+    instrumentation reduces to a check of the registered callbacks and of the active profiles.
+
+    Parameters
+    ----------
+    memory : bool
+        If True, :mod:`tracemalloc` is started for the duration of the context (if it is not tracing already)
+        and the peak allocation of each stage is recorded, along with the number of memory blocks it allocated and
+        still held at its end, from a diff of tracemalloc snapshots (Python 3.9+). Temporaries freed within a stage
+        only show in its peak allocation. This slows the computation down noticeably.
+    """
+
+    def __init__(self, memory=False):
+        self.memory = memory
+        self.stages = {}
+        self._lock = threading.Lock()
+        self._started_tracing = False
+        self._tokens = []
+
+    def __enter__(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._tokens.append(_profiles.set(_profiles.get() + (self,)))
+        return self
+
+    def __exit__(self, *exc):
+        _profiles.reset(self._tokens.pop())
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def _record(self, stage, seconds, allocated, allocations):
+        with self._lock:
+            entry = self.stages.setdefault(stage, {"calls": 0, "seconds": 0.0, "allocated_bytes": None,
+                                                   "allocations": None})
+            entry["calls"] += 1
+            entry["seconds"] += seconds
+            if allocated is not None:
+                entry["allocated_bytes"] = max(entry["allocated_bytes"] or 0, allocated)
+            if allocations is not None:
+                entry["allocations"] = (entry["allocations"] or 0) + allocations
+
+    def reset(self):
+        """Clears the recorded stages."""
+        with self._lock:
+            self.stages = {}
+
+    def as_dict(self):
+        """Returns the recorded stages.
+
+        Returns
+        -------
+        dict
+            For each stage, the number of calls, the total wall time in seconds, the largest peak allocation
+            in bytes and the total number of memory blocks allocated and held at the end of the stage (both None
+            if memory was not traced)
+        """
+        with self._lock:
+            return {stage: dict(entry) for stage, entry in self.stages.items()}
+
+    def to_prometheus(self, prefix="pysnr"):
+        """Returns the recorded stages in the Prometheus text exposition format.
+
+        Parameters
+        ----------
+        prefix : str
+            Prefix of the metric names
+
+        Returns
+        -------
+        str
+            The ``<prefix>_stage_calls_total`` and ``<prefix>_stage_seconds_total`` counters, and the
+            ``<prefix>_stage_allocated_bytes`` gauge and ``<prefix>_stage_allocations_total`` counter if memory was
+            traced, labelled by stage
+        """
+        stages = self.as_dict()
+        metrics = [
+            ("stage_calls_total", "counter", "Number of executions of each processing stage", "calls"),
+            ("stage_seconds_total", "counter", "Wall time spent in each processing stage", "seconds"),
+            ("stage_allocated_bytes", "gauge", "Largest peak allocation of each processing stage", "allocated_bytes"),
+            ("stage_allocations_total", "counter", "Memory blocks allocated and held by each processing stage",
+             "allocations"),
+        ]
+        lines = []
+        for name, kind, description, key in metrics:
+            values = [(stage, entry[key]) for stage, entry in sorted(stages.items()) if entry[key] is not None]
+            if not values:
+                continue
+            lines.append("# HELP {}_{} {}".format(prefix, name, description))
+            lines.append("# TYPE {}_{} {}".format(prefix, name, kind))
+            for stage, value in values:
+                lines.append('{}_{}{{stage="{}"}} {}'.format(prefix, name, stage, repr(value)))
+        return "\n".join(lines) + "\n"
+
+
+class _StageTimer:
+    # Peak allocations of nested stages are tracked by resetting the tracemalloc peak on entry and exit of each
+    # stage, and carrying the peaks seen so far in the stack of the active stages. The snapshot taken on entry
+    # when counting the allocations is left out of the peaks of the enclosing stages.
+    __slots__ = ("name", "profiles", "start", "memory_start", "memory_peak", "snapshot", "overhead")
+
+    def __init__(self, name):
+        self.name = name
+        self.profiles = _profiles.get()
+
+    def __enter__(self):
+        self.memory_start = self.snapshot = None
+        if _can_trace_peaks and tracemalloc.is_tracing():
+            stack = _get_stack()
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1].memory_peak = max(stack[-1].memory_peak, peak)
+            self.overhead = 0
+            if any(profile.memory for profile in self.profiles):
+                self.snapshot = _take_snapshot()
+                self.overhead = tracemalloc.get_traced_memory()[0] - current
+                current += self.overhead
+            tracemalloc.reset_peak()
+            self.memory_start = self.memory_peak = current
+            stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        allocated = allocations = None
+        if self.memory_start is not None:
+            stack = _get_stack()
+            self.memory_peak = max(self.memory_peak, tracemalloc.get_traced_memory()[1])
+            allocated = self.memory_peak - self.memory_start
+            stack.pop()
+            if stack:
+                stack[-1].memory_peak = max(stack[-1].memory_peak, self.memory_peak - self.overhead)
+            if self.snapshot is not None:
+                differences = _take_snapshot().compare_to(self.snapshot, "traceback")
+                allocations = sum(max(difference.count_diff, 0) for difference in differences)
+                self.snapshot = None
+            tracemalloc.reset_peak()
+        for hook in _hooks:
+            hook(self.name, elapsed, allocated)
+        for profile in self.profiles:
+            profile._record(self.name, elapsed, allocated, allocations)
+
+
+def _take_snapshot():
+    # The allocations of tracemalloc and of the profiler are left out
+    return tracemalloc.take_snapshot().filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),
+                                                      tracemalloc.Filter(False, __file__)))
+
+
+def _get_stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def _stage(name):
+    # Context manager timing a stage, or a shared no-op context when no callback or profile is active
+    return _StageTimer(name) if _hooks or _profiles.get() else _disabled
+
+
+def _profiled(name):
+    # Decorator timing every call of a function as a stage
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _hooks and not _profiles.get():
+                return func(*args, **kwargs)
+            with _StageTimer(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,9 +1,13 @@
 import numpy as np
-from pysnr.utils import mag2db, bandpower, periodogram
-from pysnr.utils import _check_type_and_shape, _remove_dc_component, _get_tone_indices_from_psd, _get_peak_border
+from pysnr.utils import mag2db, periodogram, _get_band_powers
+from pysnr.utils import _check_type_and_shape, _get_tone_indices_from_psd, _get_peak_border
+from pysnr.utils import _apply_to_batch, _float_dtype
+from pysnr.spectrum import _as_spectrum
+from pysnr.profiling import _profiled
 
 
-def sfdr_signal(signal, fs=1.0, msd=0):
+def sfdr_signal(signal, fs=1.0, msd=0, axis=-1, nperseg=None, noverlap=None, average="mean",
+                dtype=np.float64, coherent=False):
     """SFDR from input signal.
 
     This function computes the SFDR for an input signal.
@@ -12,28 +16,44 @@ def sfdr_signal(signal, fs=1.0, msd=0):
     Parameters
     ----------
     signal : numpy ndarray
-        The true signal
+        The true signal, or a 2-D array of signals to be processed as a batch
     fs : float
         Sampling Frequency. Defaults to 1.0.
     msd : int
         Minimum number of discrete Fourier bins to ignore for the SFDR computation
+    axis : int
+        Axis of `signal` along which the samples lie, used when a 2-D batch of signals is provided
+    nperseg : int
+        If provided, the periodogram is Welch-averaged over segments of `nperseg` samples
+    noverlap : int
+        Number of samples shared by consecutive segments. Defaults to half of `nperseg`.
+    average : str
+        Decides how the periodograms of the segments are averaged. Can be 'mean' or 'median'
+    dtype : numpy dtype
+        Floating point precision of the periodogram: float64 (default) or float32
+    coherent : bool
+        If True, the signal is assumed to be coherently sampled (see :func:`pysnr.coherent_frequency`): a
+        rectangular window is used and each tone is a single bin of the periodogram
 
     Returns
     -------
-    float
+    float or numpy ndarray
         The computed SFDR
-    float
+    float or numpy ndarray
         The spurious power magnitude
     """
-    signalCheck, signal = _check_type_and_shape(signal)
+    signalCheck, signal = _check_type_and_shape(signal, batched=True)
     if not signalCheck:
-        raise TypeError("Signal must be a 1-D array")
-    signal_no_dc = _remove_dc_component(signal)
-    f, pxx = periodogram(signal_no_dc, fs, window=('kaiser', 38))
-    return sfdr_power_spectral_density(pxx, f, msd)
+        raise TypeError("Signal must be a 1-D or 2-D array")
+    window = "boxcar" if coherent else ('kaiser', 38)
+    f, pxx = periodogram(signal, fs, window=window, axis=axis, detrend=True,
+                         nperseg=nperseg, noverlap=noverlap, average=average, dtype=dtype)
+    if pxx.ndim == 2:
+        return _apply_to_batch(sfdr_power_spectral_density, pxx, f, msd, coherent, axis=axis)
+    return sfdr_power_spectral_density(pxx, f, msd, coherent)
 
 
-def sfdr_power_spectral_density(pxx, frequencies, msd=0):
+def sfdr_power_spectral_density(pxx, frequencies=None, msd=0, coherent=False):
     """SFDR from input signal.
 
     This function computes the SFDR for an input signal from its density-periodogram.
@@ -41,12 +61,17 @@ def sfdr_power_spectral_density(pxx, frequencies, msd=0):
 
     Parameters
     ----------
-    pxx : numpy ndarray
-        The power spectral density of the signal
+    pxx : numpy ndarray or Spectrum or SpectrumIndex
+        The power spectral density of the signal, or a :class:`pysnr.Spectrum` or :class:`pysnr.SpectrumIndex` built
+        from it. The analysis memoized by a Spectrum is reused across calls.
     frequencies : numpy ndarray
-        The frequencies corresponding to the power spectral density
+        The frequencies corresponding to the power spectral density. Not needed if `pxx` is a Spectrum or a
+        SpectrumIndex.
     msd : int
         Minimum number of discrete Fourier bins to ignore for the SFDR computation
+    coherent : bool
+        If True, the periodogram is assumed to be computed with a rectangular window from a coherently sampled
+        signal, so that each tone is a single bin. Ignored if `pxx` is a Spectrum, which has its own mode.
 
     Returns
     -------
@@ -55,41 +80,10 @@ def sfdr_power_spectral_density(pxx, frequencies, msd=0):
     float
         The spurious power magnitude
     """
-    pxx_dataCheck, pxx = _check_type_and_shape(pxx)
-    frequenciesCheck, f = _check_type_and_shape(frequencies)
-    if not pxx_dataCheck or not frequenciesCheck:
-        raise TypeError("Power Spectral Density data and Frequency List must be 1-D arrays")
-    if len(f) != len(pxx):
-        raise AssertionError("Power Spectral Density data and Frequency List must be of same length")
-
-    origPxx = np.copy(pxx)
-
-    # Remove DC component
-    pxx[0] = 2 * pxx[0]
-    iHarm, iLeft, iRight = _get_tone_indices_from_psd(pxx, frequencies, 0)
-    pxx[0:iRight+1] = 0
-
-    # Largest Frequency
-    fh_idx = np.argmax(pxx)
-    first_harmonic = f[fh_idx]
-    iHarm, iLeft, iRight = _get_tone_indices_from_psd(pxx, frequencies, first_harmonic)
-    signal_pxx = np.copy(pxx[iLeft:iRight + 1])
-    signal_f = np.copy(f[iLeft:iRight + 1])
-    pxx[iLeft:iRight + 1] = 0.0
-
-    # Remove MSD if greater than 0
-    pxx[np.abs(f-first_harmonic) < msd] = 0.0
-
-    # Identify Spurious Bin
-    spur_idx = np.argmax(pxx)
-    spur_freq = f[spur_idx]
-    iHarm, iLeft, iRight = _get_tone_indices_from_psd(pxx, frequencies, spur_freq)
-    spur_pxx = np.copy(pxx[iLeft:iRight + 1])
-    spur_f = np.copy(f[iLeft:iRight + 1])
-
-    signal_power = bandpower(signal_pxx, signal_f)
-    spur_power = bandpower(spur_pxx, spur_f)
-    return mag2db(signal_power / spur_power), mag2db(spur_power)
+    spectrum = _as_spectrum(pxx, frequencies, coherent)
+    fundamental = spectrum.fundamental
+    return _sfdr_from_psd_without_dc(spectrum._working_copy(last=True), spectrum.frequencies, fundamental, msd,
+                                     spectrum.coherent)
 
 
 def sfdr_power_spectrum(sxx, frequencies, msd=0):
@@ -121,7 +115,8 @@ def sfdr_power_spectrum(sxx, frequencies, msd=0):
     if len(f) != len(sxx):
         raise AssertionError("Power Spectrum data and Frequency List must be of same length")
 
-    # Remove DC component
+    # Remove DC component on a copy, leaving the input spectrum untouched
+    sxx = np.array(sxx, dtype=_float_dtype(sxx))
     sxx[0] = 2 * sxx[0]
     idx_dc_stop = np.argwhere(sxx[0:len(sxx)-1] < sxx[1:len(sxx)]).flatten()[0]
     if not np.isnan(idx_dc_stop) and idx_dc_stop != 0:
@@ -136,4 +131,26 @@ def sfdr_power_spectrum(sxx, frequencies, msd=0):
     spur_idx = np.argmax(sxx)
     spur_pow = sxx[spur_idx]
 
-    return mag2db(fund_pow / spur_pow), mag2db(spur_pow)
\ No newline at end of file
+    return mag2db(fund_pow / spur_pow), mag2db(spur_pow)
+
+
+@_profiled("spur_search")
+def _sfdr_from_psd_without_dc(pxx, frequencies, fundamental, msd, coherent=False):
+    # pxx has its DC component removed and is modified in place
+    f = frequencies
+    iLeft, iHarm, iRight = fundamental
+    signal_power = _get_band_powers(pxx, f, [[iLeft, iRight]], coherent)[0]
+    pxx[iLeft:iRight + 1] = 0.0
+
+    # Remove MSD if greater than 0, from the bins of the sorted frequency list around the fundamental
+    if msd > 0:
+        lo = max(np.searchsorted(f, f[iHarm] - msd) - 1, 0)
+        hi = np.searchsorted(f, f[iHarm] + msd, side="right") + 1
+        pxx[lo:hi][np.abs(f[lo:hi] - f[iHarm]) < msd] = 0.0
+
+    # Identify Spurious Bin
+    spur_idx = np.argmax(pxx)
+    spur_freq = f[spur_idx]
+    iHarm, iLeft, iRight = _get_tone_indices_from_psd(pxx, frequencies, spur_freq, coherent=coherent)
+    spur_power = _get_band_powers(pxx, f, [[iLeft, iRight]], coherent)[0]
+    return mag2db(signal_power / spur_power), mag2db(spur_power)
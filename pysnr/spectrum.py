@@ -0,0 +1,379 @@
+import numpy as np
+from pysnr.utils import _check_type_and_shape, _get_nearest_bins, _remove_dc_from_psd, _get_harmonic_indices_from_psd
+from pysnr.utils import _get_band_powers, _estimate_noise_psd, _estimate_noise_power
+
+
+class SpectrumIndex:
+    """Lookup structure built once from a periodogram.
+
+    The cumulative integrated power and the frequency grid are precomputed, so that the power of any band is
+    obtained in O(1) from the bin indices or in O(log N) from the frequencies, and the nearest bin of a frequency
+    in O(1) on uniform grids (O(log N) otherwise). A SpectrumIndex can be passed instead of `pxx` and
+    `frequencies` to all the ``*_power_spectral_density`` functions, which then obtain the power of the fundamental,
+    of the harmonics and of the intermodulation products from it in O(1) per band (the DC removal, the search of the
+    fundamental and the noise estimate still pass over the periodogram). Use a :class:`Spectrum` to share the
+    analysis between the metric functions.
+
+    The band powers follow the conventions of :func:`pysnr.bandpower`. Being differences of a cumulative sum, their
+    absolute error is of the order of the machine epsilon times the total power of the periodogram, e.g. a relative
+    error of about 1e-6 for a band 100 dB below the total power, which is negligible in dB; NaN bins make all the
+    bands above them NaN.
+
+    Parameters
+    ----------
+    pxx : numpy ndarray
+        The power spectral density of the signal
+    frequencies : numpy ndarray
+        The frequencies corresponding to the power spectral density. They are sorted if they are not increasing.
+    """
+
+    def __init__(self, pxx, frequencies):
+        pxx_dataCheck, pxx = _check_type_and_shape(pxx)
+        frequenciesCheck, f = _check_type_and_shape(frequencies)
+        if not pxx_dataCheck or not frequenciesCheck:
+            raise TypeError("Power Spectral Density data and Frequency List must be 1-D arrays")
+        if len(f) != len(pxx):
+            raise AssertionError("Power Spectral Density data and Frequency List must be of same length")
+        if len(f) < 2:
+            raise ValueError("At least two frequencies are needed to build the index")
+        if np.any(f[1:] < f[:-1]):
+            order = np.argsort(f, kind="stable")
+            pxx, f = pxx[order], f[order]
+        self.pxx = pxx.view()
+        self.pxx.flags.writeable = False
+        self.frequencies = f.view()
+        self.frequencies.flags.writeable = False
+
+        steps = np.diff(f)
+        # Power of the bins below each bin, with the width to the next bin (or to the previous one for bands
+        # starting at 0 Hz)
+        self._forward = np.hstack((0, np.cumsum(pxx[:-1] * steps)))
+        self._backward = np.hstack((0, np.cumsum(pxx[1:] * steps)))
+
+    def __len__(self):
+        return len(self.pxx)
+
+    @property
+    def fs(self):
+        """Sampling frequency implied by the frequency list, i.e. twice its last frequency."""
+        return self.frequencies[-1] * 2
+
+    @property
+    def cumulative_power(self):
+        """Integrated power of the bins below each bin."""
+        return self._forward
+
+    def nearest_bin(self, freq):
+        """Returns the index of the bin closest to a frequency.
+
+        Parameters
+        ----------
+        freq : float or numpy ndarray
+            The frequency, or an array of frequencies
+
+        Returns
+        -------
+        int or numpy ndarray
+            The index of the closest bin; the lower one is returned when two bins are equally close
+        """
+        bins = _get_nearest_bins(self.frequencies, freq)
+        return bins[()] if bins.ndim == 0 else bins
+
+    def alias(self, freq):
+        """Folds frequencies into the first Nyquist zone.
+
+        Parameters
+        ----------
+        freq : float or numpy ndarray
+            The frequency, or an array of frequencies
+
+        Returns
+        -------
+        float or numpy ndarray
+            The aliased frequencies, between 0 and `fs`/2
+        """
+        tone = np.asarray(freq, dtype=float) % self.fs
+        return np.where(tone > self.fs / 2, self.fs - tone, tone)
+
+    def range_power(self, lo, hi):
+        """Returns the power contained between two bins.
+
+        The result is equal to ``bandpower(pxx[lo:hi + 1], f[lo:hi + 1])``: ranges with less than two bins give NaN.
+
+        Parameters
+        ----------
+        lo : int or numpy ndarray
+            Index of the first bin of the band(s)
+        hi : int or numpy ndarray
+            Index of the last bin (inclusive) of the band(s)
+
+        Returns
+        -------
+        float or numpy ndarray
+            The power contained in each band
+        """
+        return self._range_power(lo, hi)
+
+    def _range_power(self, lo, hi, zeroed=-1):
+        # range_power of the periodogram with its bins up to `zeroed` set to zero, as its DC region in pxx_no_dc
+        f = self.frequencies
+        lo, hi = np.broadcast_arrays(np.asarray(lo, dtype=np.intp), np.asarray(hi, dtype=np.intp))
+        valid = (hi > lo) & (lo >= 0) & (hi < len(f))
+        lo = np.where(valid, lo, 0)
+        hi = np.where(valid, hi, 1)
+        missing_width = (f[hi] - f[lo]) / (hi - lo)
+        # The sums start after the zeroed bins, and the end bin given the missing width is dropped if zeroed
+        first = np.minimum(np.maximum(lo, zeroed + 1), hi)
+        forward = self._forward[hi] - self._forward[first] + np.where(hi > zeroed, self.pxx[hi], 0) * missing_width
+        first = np.minimum(np.maximum(lo, zeroed), hi)
+        backward = self._backward[hi] - self._backward[first] + np.where(lo > zeroed, self.pxx[lo], 0) * missing_width
+        power = np.where(valid, np.where(f[lo] == 0, backward, forward), np.nan)
+        return power[()] if power.ndim == 0 else power
+
+    def band_power(self, low, high):
+        """Returns the power contained in a frequency band.
+
+        Parameters
+        ----------
+        low : float or numpy ndarray
+            Lower edge of the band(s)
+        high : float or numpy ndarray
+            Upper edge of the band(s)
+
+        Returns
+        -------
+        float or numpy ndarray
+            The power contained in the bins lying within each band
+        """
+        lo = np.searchsorted(self.frequencies, low, side="left")
+        hi = np.searchsorted(self.frequencies, high, side="right") - 1
+        return self.range_power(lo, hi)
+
+
+class Spectrum:
+    """Periodogram whose analysis is computed lazily and shared by all the metric functions.
+
+    The DC removal, the fundamental, the harmonic regions for each (n, aliased), the noise estimates and the
+    cumulative power are computed on first use and memoized, so that the ``*_power_spectral_density`` functions
+    applied to the same Spectrum (or :func:`pysnr.analyze_power_spectral_density`) do not repeat them. The memoized
+    arrays are read-only. The computations that modify the periodogram (the median of the noise, the spur and
+    intermodulation searches) share a single working buffer.
+
+    Parameters
+    ----------
+    pxx : numpy ndarray
+        The power spectral density of the signal
+    frequencies : numpy ndarray
+        The frequencies corresponding to the power spectral density
+    coherent : bool
+        If True, the periodogram is assumed to be computed with a rectangular window from a coherently sampled
+        signal, so that each tone is a single bin
+    """
+
+    __slots__ = ("pxx", "frequencies", "coherent", "_pxx_no_dc", "_pxx_no_dc_view", "_harmonics", "_band_powers",
+                 "_noise", "_noise_power", "_index", "_indexed", "_work", "_disposable")
+
+    def __init__(self, pxx, frequencies, coherent=False):
+        pxx_dataCheck, pxx = _check_type_and_shape(pxx)
+        frequenciesCheck, f = _check_type_and_shape(frequencies)
+        if not pxx_dataCheck or not frequenciesCheck:
+            raise TypeError("Power Spectral Density data and Frequency List must be 1-D arrays")
+        if len(f) != len(pxx):
+            raise AssertionError("Power Spectral Density data and Frequency List must be of same length")
+        self.pxx = pxx
+        self.frequencies = f
+        self.coherent = coherent
+        self._pxx_no_dc = None
+        self._pxx_no_dc_view = None
+        self._harmonics = {}
+        self._band_powers = {}
+        self._noise = {}
+        self._noise_power = {}
+        self._index = None
+        self._indexed = False
+        self._work = None
+        self._disposable = False
+
+    @classmethod
+    def from_periodogram(cls, output, coherent=False):
+        """Builds a Spectrum from the output of :func:`pysnr.periodogram`.
+
+        Parameters
+        ----------
+        output : tuple of numpy ndarray
+            The frequencies and the power spectral density, as returned by :func:`pysnr.periodogram`
+        coherent : bool
+            If True, the periodogram is assumed to be computed with a rectangular window from a coherently sampled
+            signal
+
+        Returns
+        -------
+        Spectrum
+            The spectrum
+        """
+        f, pxx = output
+        return cls(pxx, f, coherent)
+
+    def __len__(self):
+        return len(self.pxx)
+
+    @property
+    def pxx_no_dc(self):
+        """The power spectral density with its DC region zeroed."""
+        if self._pxx_no_dc_view is None:
+            self._pxx_no_dc_view = _read_only(self._get_pxx_no_dc().view())
+        return self._pxx_no_dc_view
+
+    def _get_pxx_no_dc(self):
+        # Memoized writable, as NumPy copies read-only arrays in argmax, and only exposed through read-only views
+        if self._pxx_no_dc is None:
+            self._pxx_no_dc = _remove_dc_from_psd(self.pxx, self.frequencies, coherent=self.coherent)
+        return self._pxx_no_dc
+
+    @property
+    def fundamental(self):
+        """Indices of the first bin, the peak and the last bin of the fundamental region."""
+        return self.harmonic_indices(1, False)[0]
+
+    @property
+    def index(self):
+        """A :class:`SpectrumIndex` of the power spectral density, giving its cumulative power."""
+        if self._index is None:
+            self._index = SpectrumIndex(self.pxx, self.frequencies)
+        return self._index
+
+    @property
+    def cumulative_power(self):
+        """Integrated power of the bins below each bin."""
+        return self.index.cumulative_power
+
+    def harmonic_indices(self, n=6, aliased=False):
+        """Returns the regions of the fundamental and of its harmonics.
+
+        Parameters
+        ----------
+        n : int
+            Number of harmonics to use (including the fundamental frequency)
+        aliased : bool
+            If True, converts the harmonics that are aliased into the Nyquist frequency
+
+        Returns
+        -------
+        list of list of int
+            The indices of the first bin, the peak and the last bin of each region, the fundamental first.
+            Harmonics lying outside the frequency list are skipped.
+        """
+        key = (n, aliased)
+        if key not in self._harmonics:
+            self._harmonics[key] = _get_harmonic_indices_from_psd(self._get_pxx_no_dc(), self.frequencies, n, aliased,
+                                                                  self.coherent)
+        return [list(region) for region in self._harmonics[key]]
+
+    def band_powers(self, n=6, aliased=False):
+        """Returns the power of the fundamental and of its harmonics.
+
+        Parameters
+        ----------
+        n : int
+            Number of harmonics to use (including the fundamental frequency)
+        aliased : bool
+            If True, converts the harmonics that are aliased into the Nyquist frequency
+
+        Returns
+        -------
+        numpy ndarray
+            The power contained in each region of :meth:`harmonic_indices`
+        """
+        key = (n, aliased)
+        if key not in self._band_powers:
+            ranges = np.array(self.harmonic_indices(n, aliased))[:, [0, 2]]
+            self._band_powers[key] = _read_only(_get_band_powers(self._get_pxx_no_dc(), self.frequencies, ranges,
+                                                                 self.coherent, self._given_index()))
+        return self._band_powers[key]
+
+    def noise_psd(self, n=6, aliased=False):
+        """Returns the power spectral density with the fundamental and its harmonics replaced by the noise floor.
+
+        The regions of the tones are replaced by the median noise density, unless they were already below it.
+        With `n` set to 1, only the fundamental is removed and the harmonics are counted as noise (as for SINAD).
+
+        Parameters
+        ----------
+        n : int
+            Number of harmonics to use (including the fundamental frequency)
+        aliased : bool
+            If True, converts the harmonics that are aliased into the Nyquist frequency
+
+        Returns
+        -------
+        numpy ndarray
+            The estimated noise power spectral density
+        """
+        key = (n, aliased)
+        if key not in self._noise:
+            self._noise[key] = _read_only(_estimate_noise_psd(self.pxx, self._get_pxx_no_dc(), self._harmonics_of(key)))
+        return self._noise[key]
+
+    def noise_power(self, n=6, aliased=False):
+        """Returns the power of :meth:`noise_psd`.
+
+        Parameters
+        ----------
+        n : int
+            Number of harmonics to use (including the fundamental frequency)
+        aliased : bool
+            If True, converts the harmonics that are aliased into the Nyquist frequency
+
+        Returns
+        -------
+        float
+            The noise power
+        """
+        return self._get_noise_power((n, aliased))
+
+    def _get_noise_power(self, key, last=False):
+        if key not in self._noise_power:
+            freq_indices = self._harmonics_of(key)
+            work = self._working_copy(last)
+            self._noise_power[key] = _estimate_noise_power(self.pxx, self.frequencies, work, freq_indices, work=work)
+        return self._noise_power[key]
+
+    def _given_index(self):
+        # The SpectrumIndex passed to a metric function, integrating the bands in O(1)
+        return self._index if self._indexed else None
+
+    def _harmonics_of(self, key):
+        self.harmonic_indices(*key)
+        return self._harmonics[key]
+
+    def _working_copy(self, last=False):
+        # Writable copy of pxx_no_dc, in a buffer allocated once. The last computation of a metric function given
+        # arrays (see _as_spectrum) is handed pxx_no_dc itself instead, which would be computed again if needed.
+        pxx_no_dc = self._get_pxx_no_dc()
+        if last and self._disposable:
+            self._pxx_no_dc = self._pxx_no_dc_view = None
+            return pxx_no_dc
+        if self._work is None:
+            self._work = np.empty_like(pxx_no_dc)
+        np.copyto(self._work, pxx_no_dc)
+        return self._work
+
+
+def _read_only(array):
+    array.flags.writeable = False
+    return array
+
+
+def _as_spectrum(pxx, frequencies, coherent=False):
+    # The metric functions accept a Spectrum, a SpectrumIndex, or a power spectral density and its frequencies. A
+    # Spectrum built here is private to the metric function, whose last computation can consume its pxx_no_dc.
+    if isinstance(pxx, Spectrum):
+        return pxx
+    if isinstance(pxx, SpectrumIndex):
+        spectrum = Spectrum(pxx.pxx, pxx.frequencies, coherent)
+        spectrum._index = pxx
+        spectrum._indexed = True
+    else:
+        spectrum = Spectrum(pxx, frequencies, coherent)
+    spectrum._disposable = True
+    return spectrum
@@ -0,0 +1,329 @@
+import os
+import numpy as np
+from collections import namedtuple
+from pysnr.snr import snr_power_spectral_density
+from pysnr.fft import rfft
+from pysnr.utils import get_window, bandpower, mag2db
+from pysnr.utils import _remove_dc_from_psd, _get_harmonic_indices_from_psd, _estimate_noise_power, _segment_powers
+
+
+class WelchAccumulator:
+    """Welch-averaged periodogram built incrementally from chunks of a signal.
+
+    Samples are pushed with :meth:`update` and split into overlapping segments of `nperseg` samples.
+    Only the samples of the incomplete segment are kept between updates, so the memory used is bounded by
+    the chunk size and `nperseg`, irrespective of the length of the signal.
+    The mean of each segment is removed before windowing.
+
+    Parameters
+    ----------
+    fs : float
+        Sampling Frequency. Defaults to 1.0.
+    nperseg : int
+        Length of each segment
+    noverlap : int
+        Number of samples shared by consecutive segments. Defaults to half of `nperseg`.
+    window : str or tuple or array_like
+        Desired window to use. This is passed as an input to scipy's get_window() function
+    scaling : str
+        Decides whether to compute the power spectral density or the power spectrum. Can be 'density' or 'spectrum'
+    """
+
+    def __init__(self, fs=1.0, nperseg=65536, noverlap=None, window=('kaiser', 38), scaling="density"):
+        if noverlap is None:
+            noverlap = nperseg // 2
+        if not 0 <= noverlap < nperseg:
+            raise ValueError("noverlap must be non-negative and less than nperseg")
+        if scaling not in ("density", "spectrum"):
+            raise ValueError("scaling must be 'density' or 'spectrum'")
+        self.fs = fs
+        self.nperseg = nperseg
+        self.noverlap = noverlap
+        self.segments = 0
+        w = get_window(window, nperseg)
+        self._window = w.window
+        if scaling == "density":
+            self._scale = 1.0 / (fs * w.sum_squares)
+        else:
+            self._scale = 1.0 / w.sum ** 2
+        self._pending = np.empty(0)
+        self._power_sum = np.zeros(nperseg // 2 + 1)
+
+    def update(self, chunk):
+        """Adds the next chunk of samples to the running periodogram.
+
+        Parameters
+        ----------
+        chunk : numpy ndarray
+            The next samples of the signal
+        """
+        data = np.concatenate((self._pending, np.asarray(chunk).ravel()))
+        step = self.nperseg - self.noverlap
+        if len(data) < self.nperseg:
+            self._pending = data
+            return
+        segments = np.lib.stride_tricks.sliding_window_view(data, self.nperseg)[::step]
+        for start, power in _segment_powers(segments, self._window, detrend=True):
+            self._power_sum += np.sum(power, axis=0)
+        self.segments += len(segments)
+        self._pending = data[len(segments) * step:].copy()
+
+    def result(self):
+        """Returns the periodogram averaged over all the segments seen so far.
+
+        Returns
+        -------
+        numpy ndarray
+            List of frequencies
+        numpy ndarray
+            The periodogram
+        """
+        if self.segments == 0:
+            raise ValueError("At least nperseg samples are needed to compute the periodogram")
+        pxx = self._power_sum * (self._scale / self.segments)
+        if self.nperseg % 2 == 0:
+            pxx[1:-1] *= 2
+        else:
+            pxx[1:] *= 2
+        return np.fft.rfftfreq(self.nperseg, d=1.0/self.fs), pxx
+
+
+def _iter_file_chunks(path, dtype, chunk_size):
+    if str(path).endswith(".npy"):
+        data = np.load(path, mmap_mode="r")
+    else:
+        data = np.memmap(path, dtype=dtype, mode="r")
+    for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
+
+
+def welch_stream(source, fs=1.0, nperseg=65536, noverlap=None, window=('kaiser', 38), scaling="density",
+                 dtype=np.float64, chunk_size=1 << 20):
+    """Welch-averaged periodogram of a signal read in chunks.
+
+    This function computes the periodogram of signals which do not fit in memory.
+    The output can be passed to any of the ``*_power_spectral_density`` or ``*_power_spectrum`` functions.
+
+    Parameters
+    ----------
+    source : iterable of numpy ndarray or str
+        An iterable yielding consecutive chunks of the signal, or the path to a `.npy` file or a raw binary file
+    fs : float
+        Sampling Frequency. Defaults to 1.0.
+    nperseg : int
+        Length of each segment
+    noverlap : int
+        Number of samples shared by consecutive segments. Defaults to half of `nperseg`.
+    window : str or tuple or array_like
+        Desired window to use. This is passed as an input to scipy's get_window() function
+    scaling : str
+        Decides whether to compute the power spectral density or the power spectrum. Can be 'density' or 'spectrum'
+    dtype : numpy dtype
+        Data type of the samples in a raw binary file
+    chunk_size : int
+        Number of samples read from a file at a time
+
+    Returns
+    -------
+    numpy ndarray
+        List of frequencies
+    numpy ndarray
+        The periodogram
+    """
+    if isinstance(source, (str, os.PathLike)):
+        source = _iter_file_chunks(source, dtype, chunk_size)
+    accumulator = WelchAccumulator(fs, nperseg, noverlap, window, scaling)
+    for chunk in source:
+        accumulator.update(chunk)
+    return accumulator.result()
+
+
+def snr_stream(source, fs=1.0, n=6, aliased=False, nperseg=65536, noverlap=None, dtype=np.float64,
+               chunk_size=1 << 20):
+    """SNR from input signal read in chunks.
+
+    This function computes the SNR for a signal which does not fit in memory.
+    It assumes the fundamental frequency to be the desired signal.
+    Uses a Welch-averaged periodogram with a Kaiser window with beta set to 38.
+
+    Parameters
+    ----------
+    source : iterable of numpy ndarray or str
+        An iterable yielding consecutive chunks of the signal, or the path to a `.npy` file or a raw binary file
+    fs : float
+        Sampling Frequency. Defaults to 1.0.
+    n : int
+        Number of harmonics to use (including the fundamental frequency)
+    aliased : bool
+        If True, converts the harmonics that are aliased into the Nyquist frequency
+    nperseg : int
+        Length of each segment
+    noverlap : int
+        Number of samples shared by consecutive segments. Defaults to half of `nperseg`.
+    dtype : numpy dtype
+        Data type of the samples in a raw binary file
+    chunk_size : int
+        Number of samples read from a file at a time
+
+    Returns
+    -------
+    float
+        The computed SNR
+    float
+        The noise power magnitude
+    """
+    f, pxx = welch_stream(source, fs, nperseg, noverlap, dtype=dtype, chunk_size=chunk_size)
+    return snr_power_spectral_density(pxx, f, n, aliased)
+
+
+StreamingResult = namedtuple("StreamingResult", ["sample", "snr", "noise_power", "sinad", "noise_distortion_power"])
+StreamingResult.__doc__ = """SNR and SINAD emitted by :class:`StreamingAnalyzer`.
+
+`sample` is the number of samples pushed when the result was computed; the metrics cover the samples just before it.
+"""
+
+
+class StreamingAnalyzer:
+    """Sliding-window SNR and SINAD monitor for live signals.
+
+    Samples are pushed with :meth:`push` into a ring buffer holding the latest `window_length` samples.
+    Every `hop` samples the periodogram of the buffer is computed (with a Kaiser window with beta set to 38)
+    and the SNR and SINAD are emitted. The periodograms can be averaged exponentially: each update moves the average
+    by 1/`averaging` of its difference to the new periodogram. The ring buffer and the periodogram buffers are
+    allocated once and updated in place; only the FFT allocates its output at each update. The latency of a result
+    is at most `hop` samples.
+
+    Parameters
+    ----------
+    fs : float
+        Sampling Frequency. Defaults to 1.0.
+    window_length : int
+        Number of samples in the sliding window
+    hop : int
+        Number of samples between two results. Defaults to a quarter of `window_length`.
+    n : int
+        Number of harmonics to use (including the fundamental frequency) for the SNR
+    aliased : bool
+        If True, converts the harmonics that are aliased into the Nyquist frequency
+    averaging : int
+        Time constant, in updates, of the exponential averaging of the periodograms. 1 disables averaging.
+    callback : callable
+        If provided, called with every :class:`StreamingResult` as it is emitted
+    """
+
+    def __init__(self, fs=1.0, window_length=4096, hop=None, n=6, aliased=False, averaging=1, callback=None):
+        if hop is None:
+            hop = max(1, window_length // 4)
+        if hop < 1 or averaging < 1:
+            raise ValueError("hop and averaging must be positive")
+        self.fs = fs
+        self.window_length = window_length
+        self.hop = hop
+        self.n = n
+        self.aliased = aliased
+        self.averaging = averaging
+        self.callback = callback
+        self.samples = 0
+        self.updates = 0
+        self.latest = None
+
+        w = get_window(('kaiser', 38), window_length)
+        self._window = w.window
+        self._scale = 1.0 / (fs * w.sum_squares)
+        self._frequencies = np.fft.rfftfreq(window_length, d=1.0/fs)
+        self._ring = np.zeros(window_length)
+        self._position = 0
+        self._until_update = window_length
+        self._windowed = np.empty(window_length)
+        self._dc = np.empty(window_length)
+        self._pxx = np.empty(len(self._frequencies))
+        self._average = np.empty(len(self._frequencies))
+        self._pxx_no_dc = np.empty(len(self._frequencies))
+        self._noise = np.empty(len(self._frequencies))
+
+    def push(self, samples):
+        """Adds new samples to the sliding window.
+
+        Parameters
+        ----------
+        samples : numpy ndarray
+            The new samples of the signal
+
+        Returns
+        -------
+        list of StreamingResult
+            The results emitted while consuming the samples, oldest first
+        """
+        samples = np.asarray(samples).ravel()
+        results = []
+        start = 0
+        while start < len(samples):
+            count = min(len(samples) - start, self._until_update)
+            self._write(samples[start:start + count])
+            start += count
+            self.samples += count
+            self._until_update -= count
+            if self._until_update == 0:
+                self._until_update = self.hop
+                results.append(self._update())
+        return results
+
+    def _write(self, samples):
+        samples = samples[-self.window_length:]
+        head = min(len(samples), self.window_length - self._position)
+        self._ring[self._position:self._position + head] = samples[:head]
+        self._ring[:len(samples) - head] = samples[head:]
+        self._position = (self._position + len(samples)) % self.window_length
+
+    def _update(self):
+        # Unroll the ring buffer, oldest sample first, while applying the window
+        tail = self.window_length - self._position
+        np.multiply(self._ring[self._position:], self._window[:tail], out=self._windowed[:tail])
+        np.multiply(self._ring[:self._position], self._window[tail:], out=self._windowed[tail:])
+        np.multiply(self._window, np.mean(self._ring), out=self._dc)
+        self._windowed -= self._dc
+
+        np.abs(rfft(self._windowed), out=self._pxx)
+        self._pxx **= 2
+        self._pxx *= self._scale
+        if self.window_length % 2 == 0:
+            self._pxx[1:-1] *= 2
+        else:
+            self._pxx[1:] *= 2
+
+        if self.updates == 0 or self.averaging == 1:
+            self._average[:] = self._pxx
+        else:
+            self._pxx -= self._average
+            self._pxx /= self.averaging
+            self._average += self._pxx
+        self.updates += 1
+
+        self.latest = StreamingResult(self.samples, *self._metrics(self._average))
+        if self.callback is not None:
+            self.callback(self.latest)
+        return self.latest
+
+    def _metrics(self, pxx):
+        f = self._frequencies
+        pxx_no_dc = _remove_dc_from_psd(pxx, f, out=self._pxx_no_dc)
+        freq_indices = _get_harmonic_indices_from_psd(pxx_no_dc, f, self.n, self.aliased)
+        low, harmid, up = freq_indices[0]
+        signal_power = bandpower(pxx_no_dc[low:up + 1], f[low:up + 1])
+
+        snr_noise = _estimate_noise_power(pxx, f, pxx_no_dc, freq_indices, work=self._noise)
+        sinad_noise = _estimate_noise_power(pxx, f, pxx_no_dc, freq_indices[:1], work=self._noise)
+        return (mag2db(signal_power / snr_noise), mag2db(snr_noise),
+                mag2db(signal_power / sinad_noise), mag2db(sinad_noise))
+
+    def spectrum(self):
+        """Returns the current (averaged) periodogram.
+
+        Returns
+        -------
+        numpy ndarray
+            List of frequencies
+        numpy ndarray
+            The power spectral density
+        """
+        return self._frequencies, self._average.copy()
@@ -0,0 +1,161 @@
+import numpy as np
+from collections import namedtuple
+from pysnr.utils import mag2db, periodogram
+from pysnr.utils import _check_type_and_shape, _apply_to_batch, _get_harmonic_indices_from_psd, _get_band_powers
+from pysnr.utils import _get_bin_widths
+from pysnr.spectrum import _as_spectrum
+
+
+HarmonicSweep = namedtuple("HarmonicSweep", ["n", "snr", "noise_power", "thd", "harmonic_power"])
+HarmonicSweep.__doc__ = """SNR and THD computed by :func:`harmonic_sweep_signal` for every number of harmonics.
+
+`n` holds the numbers of harmonics (2 to `n_max`, including the fundamental frequency), and the other fields the
+values returned by the ``snr_*`` and ``thd_*`` functions for each of them.
+"""
+
+
+def harmonic_sweep_signal(signal, fs=1.0, n_max=10, aliased=False, axis=-1, nperseg=None, noverlap=None,
+                          average="mean", dtype=np.float64, coherent=False):
+    """SNR and THD from input signal, for every number of harmonics up to `n_max`.
+
+    This function gives the same values as :func:`pysnr.snr_signal` and :func:`pysnr.thd_signal` called with
+    n = 2, ..., `n_max`, at about the cost of a single call with `n_max`.
+    Uses a Kaiser window with beta set to 38 to compute the periodogram, or a rectangular window in coherent mode.
+
+    Parameters
+    ----------
+    signal : numpy ndarray
+        The true signal, or a 2-D array of signals to be processed as a batch
+    fs : float
+        Sampling Frequency. Defaults to 1.0.
+    n_max : int
+        Largest number of harmonics to use (including the fundamental frequency)
+    aliased : bool
+        If True, converts the harmonics that are aliased into the Nyquist frequency
+    axis : int
+        Axis of `signal` along which the samples lie, used when a 2-D batch of signals is provided
+    nperseg : int
+        If provided, the periodogram is Welch-averaged over segments of `nperseg` samples
+    noverlap : int
+        Number of samples shared by consecutive segments. Defaults to half of `nperseg`.
+    average : str
+        Decides how the periodograms of the segments are averaged. Can be 'mean' or 'median'
+    dtype : numpy dtype
+        Floating point precision of the periodogram: float64 (default) or float32
+    coherent : bool
+        If True, the signal is assumed to be coherently sampled (see :func:`pysnr.coherent_frequency`): a
+        rectangular window is used and each tone is a single bin of the periodogram
+
+    Returns
+    -------
+    HarmonicSweep
+        The computed curves. With a batch of signals, the curves of each signal are along the last axis.
+    """
+    signalCheck, signal = _check_type_and_shape(signal, batched=True)
+    if not signalCheck:
+        raise TypeError("Signal must be a 1-D or 2-D array")
+    window = "boxcar" if coherent else ('kaiser', 38)
+    f, pxx = periodogram(signal, fs, window=window, axis=axis, detrend=True,
+                         nperseg=nperseg, noverlap=noverlap, average=average, dtype=dtype)
+    if pxx.ndim == 2:
+        return HarmonicSweep(*_apply_to_batch(harmonic_sweep_power_spectral_density, pxx, f, n_max, aliased, coherent,
+                                              axis=axis))
+    return harmonic_sweep_power_spectral_density(pxx, f, n_max, aliased, coherent)
+
+
+def harmonic_sweep_power_spectral_density(pxx, frequencies=None, n_max=10, aliased=False, coherent=False):
+    """SNR and THD from input signal, for every number of harmonics up to `n_max`.
+
+    The fundamental and the harmonics up to `n_max` are located once. The THD curve is the cumulative power of the
+    harmonics, and the noise floor of each number of harmonics is the median of the bins left once the regions of
+    the lower-order harmonics are removed, selected from a single partial sort of the bins.
+
+    Parameters
+    ----------
+    pxx : numpy ndarray or Spectrum or SpectrumIndex
+        The power spectral density of the signal, or a :class:`pysnr.Spectrum` or :class:`pysnr.SpectrumIndex` built
+        from it
+    frequencies : numpy ndarray
+        The frequencies corresponding to the power spectral density. Not needed if `pxx` is a Spectrum or a
+        SpectrumIndex.
+    n_max : int
+        Largest number of harmonics to use (including the fundamental frequency)
+    aliased : bool
+        If True, converts the harmonics that are aliased into the Nyquist frequency
+    coherent : bool
+        If True, the periodogram is assumed to be computed with a rectangular window from a coherently sampled
+        signal, so that each tone is a single bin. Ignored if `pxx` is a Spectrum, which has its own mode.
+
+    Returns
+    -------
+    HarmonicSweep
+        The computed curves
+    """
+    if n_max < 2:
+        raise ValueError("n_max must be at least 2")
+    spectrum = _as_spectrum(pxx, frequencies, coherent)
+    pxx, f, pxx_no_dc = spectrum.pxx, spectrum.frequencies, spectrum._get_pxx_no_dc()
+    freq_indices, orders = _get_harmonic_indices_from_psd(pxx_no_dc, f, n_max, aliased, spectrum.coherent,
+                                                          return_orders=True)
+    orders = np.array(orders)
+    n = np.arange(2, n_max + 1)
+
+    # THD: cumulative power of the harmonics of order up to n
+    powers = _get_band_powers(pxx_no_dc, f, np.array(freq_indices)[:, [0, 2]], spectrum.coherent)
+    signal_power = powers[0]
+    harmonic_power = np.array([np.sum(powers[1:][orders[1:] <= i]) for i in n])
+
+    # Noise: the bins removed for every n (DC and fundamental) are excluded once. Removing the harmonic regions
+    # moves the median by at most their number of bins, so only a window of ranks around the median is sorted.
+    removed = pxx_no_dc == 0
+    low, harmid, up = freq_indices[0]
+    removed[low:up + 1] = True
+    always_removed = np.flatnonzero(removed)
+    region_bins = [np.setdiff1d(np.arange(max(low, 0), min(up + 1, len(f))), always_removed)
+                   for low, harmid, up in freq_indices[1:]]
+    harmonic_bins = np.unique(np.concatenate([np.arange(0, dtype=np.intp)] + region_bins))
+    values = pxx_no_dc[~removed]
+    nan_count = np.count_nonzero(np.isnan(values))
+    margin = len(harmonic_bins) + 1
+    first = max(0, (len(values) - 1) // 2 - margin)
+    last = max(first, min(len(values) - 1, len(values) // 2 + margin))
+    if len(values):
+        values.partition([first, last])
+    window = np.sort(values[first:last + 1])
+
+    # The noise spectral density only differs from pxx over the removed bins, integrated separately
+    weights = np.broadcast_to(_get_bin_widths(f), len(f))
+    all_removed = np.union1d(always_removed, harmonic_bins)
+    kept = np.ones(len(f), dtype=bool)
+    kept[all_removed] = False
+    base_power = np.dot(pxx[kept], weights[kept])
+
+    noise_power = np.empty(len(n))
+    for k, i in enumerate(n):
+        extra = np.unique(np.concatenate([np.arange(0, dtype=np.intp)] +
+                                         [bins for bins, order_ in zip(region_bins, orders[1:]) if order_ <= i]))
+        density = _median_without(window, first, len(values), pxx_no_dc[extra],
+                                  nan_count - np.count_nonzero(np.isnan(pxx_no_dc[extra])))
+        removed_now = removed[all_removed] | np.isin(all_removed, extra)
+        noise = np.where(removed_now, np.minimum(pxx[all_removed], density), pxx[all_removed])
+        noise_power[k] = base_power + np.dot(noise, weights[all_removed])
+
+    return HarmonicSweep(n, mag2db(signal_power / noise_power), mag2db(noise_power),
+                         mag2db(harmonic_power / signal_power), mag2db(harmonic_power))
+
+
+def _median_without(window, first, size, skipped, nan_count):
+    # Median of `size` values without the `skipped` ones, NaN if any NaN remains. `window` holds the sorted values of
+    # ranks first to first + len(window) - 1, which must include the ranks of the median once the values are skipped.
+    remaining = size - len(skipped)
+    if remaining == 0 or nan_count > 0:
+        return np.nan
+    below = first - np.count_nonzero(skipped < window[0])
+    inside = np.sort(skipped[(skipped >= window[0]) & (skipped <= window[-1])])
+    # Equal skipped values remove consecutive occurrences in the window
+    repeats = np.arange(len(inside)) - np.searchsorted(inside, inside)
+    window = np.delete(window, np.searchsorted(window, inside) + repeats)
+    half = remaining // 2
+    if remaining % 2 == 0:
+        return np.mean(window[half - 1 - below:half + 1 - below])
+    return window[half - below]
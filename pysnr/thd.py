@@ -1,43 +1,60 @@
 import numpy as np
-import scipy.signal
-from pysnr.utils import  _remove_dc_component, _alias_to_nyquist, _check_type_and_shape, _get_tone_indices_from_psd
-from pysnr.utils import mag2db, bandpower
+from pysnr.utils import _check_type_and_shape
+from pysnr.utils import mag2db, periodogram, _apply_to_batch
+from pysnr.spectrum import _as_spectrum
 
 
-def thd_signal(signal, fs=1.0, n=6, aliased=False):
+def thd_signal(signal, fs=1.0, n=6, aliased=False, axis=-1, nperseg=None, noverlap=None, average="mean",
+               dtype=np.float64, coherent=False):
     """THD from input signal.
 
     This function computes the THD for an input signal.
     It assumes the fundamental frequency to be the desired signal.
-    Uses a Kaiser window with beta set to 38 to compute the periodogram.
+    Uses a Kaiser window with beta set to 38 to compute the periodogram, or a rectangular window in coherent mode.
 
     Parameters
     ----------
     signal : numpy ndarray
-        The true signal
+        The true signal, or a 2-D array of signals to be processed as a batch
     fs : float
         Sampling Frequency. Defaults to 1.0.
     n : int
         Number of harmonics to use (including the fundamental frequency)
     aliased : bool
         If True, converts the harmonics that are aliased into the Nyquist frequency
+    axis : int
+        Axis of `signal` along which the samples lie, used when a 2-D batch of signals is provided
+    nperseg : int
+        If provided, the periodogram is Welch-averaged over segments of `nperseg` samples
+    noverlap : int
+        Number of samples shared by consecutive segments. Defaults to half of `nperseg`.
+    average : str
+        Decides how the periodograms of the segments are averaged. Can be 'mean' or 'median'
+    dtype : numpy dtype
+        Floating point precision of the periodogram: float64 (default) or float32
+    coherent : bool
+        If True, the signal is assumed to be coherently sampled (see :func:`pysnr.coherent_frequency`): a
+        rectangular window is used and each tone is a single bin of the periodogram
 
     Returns
     -------
-    float
+    float or numpy ndarray
         The computed THD
-    float
+    float or numpy ndarray
         The harmonic power magnitude
     """
-    signalCheck, signal = _check_type_and_shape(signal)
+    signalCheck, signal = _check_type_and_shape(signal, batched=True)
     if not signalCheck:
-        raise TypeError("Signal must be a 1-D array")
-    signal_no_dc = _remove_dc_component(signal)
-    f, pxx = scipy.signal.periodogram(signal_no_dc, fs, window=('kaiser', 38))
-    return thd_power_spectral_density(pxx, f, n, aliased)
+        raise TypeError("Signal must be a 1-D or 2-D array")
+    window = "boxcar" if coherent else ('kaiser', 38)
+    f, pxx = periodogram(signal, fs, window=window, axis=axis, detrend=True,
+                         nperseg=nperseg, noverlap=noverlap, average=average, dtype=dtype)
+    if pxx.ndim == 2:
+        return _apply_to_batch(thd_power_spectral_density, pxx, f, n, aliased, coherent, axis=axis)
+    return thd_power_spectral_density(pxx, f, n, aliased, coherent)
 
 
-def thd_power_spectral_density(pxx, frequencies, n=6, aliased=False):
+def thd_power_spectral_density(pxx, frequencies=None, n=6, aliased=False, coherent=False):
     """THD from input signal.
 
     This function computes the THD for an input signal from its density-periodogram.
@@ -45,14 +62,19 @@ def thd_power_spectral_density(pxx, frequencies, n=6, aliased=False):
 
     Parameters
     ----------
-    pxx : numpy ndarray
-        The power spectral density of the signal
+    pxx : numpy ndarray or Spectrum or SpectrumIndex
+        The power spectral density of the signal, or a :class:`pysnr.Spectrum` or :class:`pysnr.SpectrumIndex` built
+        from it. The analysis memoized by a Spectrum is reused across calls.
     frequencies : numpy ndarray
-        The frequencies corresponding to the power spectral density
+        The frequencies corresponding to the power spectral density. Not needed if `pxx` is a Spectrum or a
+        SpectrumIndex.
     n : int
         Number of harmonics to use (including the fundamental frequency)
     aliased : bool
         If True, converts the harmonics that are aliased into the Nyquist frequency
+    coherent : bool
+        If True, the periodogram is assumed to be computed with a rectangular window from a coherently sampled
+        signal, so that each tone is a single bin. Ignored if `pxx` is a Spectrum, which has its own mode.
 
     Returns
     -------
@@ -61,45 +83,10 @@ def thd_power_spectral_density(pxx, frequencies, n=6, aliased=False):
     float
         The harmonic power magnitude
     """
-    pxx_dataCheck, pxx = _check_type_and_shape(pxx)
-    frequenciesCheck, f = _check_type_and_shape(frequencies)
-    if not pxx_dataCheck or not frequenciesCheck:
-        raise TypeError("Power Spectral Density data and Frequency List must be 1-D arrays")
-    if len(f) != len(pxx):
-        raise AssertionError("Power Spectral Density data and Frequency List must be of same length")
-
-    # Remove DC component
-    pxx[0] = 2 * pxx[0]
-    iHarm, iLeft, iRight = _get_tone_indices_from_psd(pxx, frequencies, 0)
-    pxx[iLeft:iRight + 1] = 0
-
-    freq_indices = []
-    harmonics = []
-
-    fh_idx = np.argmax(pxx)
-    first_harmonic = f[fh_idx]
-    iHarm, iLeft, iRight = _get_tone_indices_from_psd(pxx, frequencies, first_harmonic)
-    freq_indices.append([iLeft, iHarm, iRight])
-    fs = frequencies[-1] * 2
-
-    for i in range(2, n + 1):
-        h = first_harmonic * i
-        if aliased:
-            h = _alias_to_nyquist(h, fs)
-        if not aliased and h > fs / 2:
-            continue
-        iHarm, iLeft, iRight = _get_tone_indices_from_psd(pxx, frequencies, h)
-        harmonics.append(frequencies[iHarm])
-        freq_indices.append([iLeft, iHarm, iRight])
-
-    signal_power = 0
-    harmonic_power = 0
-    for idx, harmonic_idx in enumerate(freq_indices):
-        low, harmid, up = harmonic_idx
-        if idx == 0:
-            signal_power = bandpower(pxx[low:up + 1], f[low:up+1])
-        else:
-            harmonic_power += bandpower(pxx[low:up + 1], f[low:up + 1])
+    spectrum = _as_spectrum(pxx, frequencies, coherent)
+    powers = spectrum.band_powers(n, aliased)
+    signal_power = powers[0]
+    harmonic_power = np.sum(powers[1:])
 
     return mag2db(harmonic_power / signal_power), mag2db(harmonic_power)
 
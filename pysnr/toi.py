@@ -1,40 +1,61 @@
 import numpy as np
-from pysnr.utils import mag2db, bandpower, periodogram
-from pysnr.utils import _check_type_and_shape, _remove_dc_component, _get_tone_indices_from_psd
+from pysnr.utils import mag2db, periodogram
+from pysnr.utils import _check_type_and_shape, _get_tone_indices_from_psd
+from pysnr.utils import _get_tones_indices_from_psd
+from pysnr.utils import _apply_to_batch, _get_band_powers
+from pysnr.spectrum import _as_spectrum
+from pysnr.profiling import _profiled
 
 
-def toi_signal(signal, fs=1.0):
+def toi_signal(signal, fs=1.0, axis=-1, nperseg=None, noverlap=None, average="mean",
+               dtype=np.float64, coherent=False):
     """TOI from input signal.
 
     This function computes the TOI for an input signal.
     It assumes the fundamental frequency to be the desired signal.
-    Uses a Kaiser window with beta set to 38 to compute the periodogram.
+    Uses a Kaiser window with beta set to 38 to compute the periodogram, or a rectangular window in coherent mode.
 
     Parameters
     ----------
     signal : numpy ndarray
-        The true signal
+        The true signal, or a 2-D array of signals to be processed as a batch
     fs : float
         Sampling Frequency. Defaults to 1.0.
+    axis : int
+        Axis of `signal` along which the samples lie, used when a 2-D batch of signals is provided
+    nperseg : int
+        If provided, the periodogram is Welch-averaged over segments of `nperseg` samples
+    noverlap : int
+        Number of samples shared by consecutive segments. Defaults to half of `nperseg`.
+    average : str
+        Decides how the periodograms of the segments are averaged. Can be 'mean' or 'median'
+    dtype : numpy dtype
+        Floating point precision of the periodogram: float64 (default) or float32
+    coherent : bool
+        If True, the signal is assumed to be coherently sampled (see :func:`pysnr.coherent_frequency`): a
+        rectangular window is used and each tone is a single bin of the periodogram
 
     Returns
     -------
-    float
+    float or numpy ndarray
         The computed TOI
     np.ndarray
         The powers contained in the two fundamental sinusoids of the signal
     np.ndarray
         The power contained in the lower and upper intermodulation products of the signal
     """
-    signalCheck, signal = _check_type_and_shape(signal)
+    signalCheck, signal = _check_type_and_shape(signal, batched=True)
     if not signalCheck:
-        raise TypeError("Signal must be a 1-D array")
-    signal_no_dc = _remove_dc_component(signal)
-    f, pxx = periodogram(signal_no_dc, fs, window=('kaiser', 38))
-    return toi_power_spectral_density(pxx, f)
+        raise TypeError("Signal must be a 1-D or 2-D array")
+    window = "boxcar" if coherent else ('kaiser', 38)
+    f, pxx = periodogram(signal, fs, window=window, axis=axis, detrend=True,
+                         nperseg=nperseg, noverlap=noverlap, average=average, dtype=dtype)
+    if pxx.ndim == 2:
+        return _apply_to_batch(toi_power_spectral_density, pxx, f, coherent, axis=axis)
+    return toi_power_spectral_density(pxx, f, coherent)
 
 
-def toi_power_spectral_density(pxx, frequencies):
+def toi_power_spectral_density(pxx, frequencies=None, coherent=False):
     """TOI from input signal.
 
     This function computes the TOI for an input signal from its density-periodogram.
@@ -42,10 +63,15 @@ def toi_power_spectral_density(pxx, frequencies):
 
     Parameters
     ----------
-    pxx : numpy ndarray
-        The power spectral density of the signal
+    pxx : numpy ndarray or Spectrum or SpectrumIndex
+        The power spectral density of the signal, or a :class:`pysnr.Spectrum` or :class:`pysnr.SpectrumIndex` built
+        from it. The analysis memoized by a Spectrum is reused across calls.
     frequencies : numpy ndarray
-        The frequencies corresponding to the power spectral density
+        The frequencies corresponding to the power spectral density. Not needed if `pxx` is a Spectrum or a
+        SpectrumIndex.
+    coherent : bool
+        If True, the periodogram is assumed to be computed with a rectangular window from a coherently sampled
+        signal, so that each tone is a single bin. Ignored if `pxx` is a Spectrum, which has its own mode.
 
     Returns
     -------
@@ -56,66 +82,10 @@ def toi_power_spectral_density(pxx, frequencies):
     np.ndarray
         The power contained in the lower and upper intermodulation products of the signal
     """
-    pxx_dataCheck, pxx = _check_type_and_shape(pxx)
-    frequenciesCheck, f = _check_type_and_shape(frequencies)
-    if not pxx_dataCheck or not frequenciesCheck:
-        raise TypeError("Power Spectral Density data and Frequency List must be 1-D arrays")
-    if len(f) != len(pxx):
-        raise AssertionError("Power Spectral Density data and Frequency List must be of same length")
-
-    # Remove DC component
-    pxx[0] = 2 * pxx[0]
-    iDCHarm, iDCLeft, iDCRight = _get_tone_indices_from_psd(pxx, frequencies, 0)
-    pxx[iDCLeft:iDCRight+1] = 0
-
-    # Dominant Frequency
-    fh_idx = np.argmax(pxx)
-    dominant1 = f[fh_idx]
-    d1iHarm, d1iLeft, d1iRight = _get_tone_indices_from_psd(pxx, frequencies, dominant1)
-    dominant1_pxx = np.copy(pxx[d1iLeft:d1iRight + 1])
-    pxx[d1iLeft:d1iRight + 1] = 0.0
-    # Second Dominant Frequency
-    fh_idx = np.argmax(pxx)
-    dominant2 = f[fh_idx]
-    d2iHarm, d2iLeft, d2iRight = _get_tone_indices_from_psd(pxx, frequencies, dominant2)
-    # Restore Dominant
-    pxx[d1iLeft:d1iRight + 1] = dominant1_pxx
-
-    # Flip order if new dominant less than old dominant
-    if d2iHarm < d1iHarm:
-        d1iHarm, d2iHarm = d2iHarm, d1iHarm
-        d1iLeft, d2iLeft = d2iLeft, d1iLeft
-        d1iRight, d2iRight = d2iRight, d1iRight
-
-    dominant1_pxx = np.copy(pxx[d1iLeft:d1iRight + 1])
-    dominant1_f = np.copy(f[d1iLeft:d1iRight + 1])
-    dominant2_pxx = np.copy(pxx[d2iLeft:d2iRight + 1])
-    dominant2_f = np.copy(f[d2iLeft:d2iRight + 1])
-
-    # Lower Third IMOD
-    lower_third_imod = (2 * f[d1iHarm]) - f[d2iHarm]
-    ltiIndices = _get_tone_indices_from_psd(pxx, frequencies, lower_third_imod)
-    ltiPower = pxx[ltiIndices[1]: ltiIndices[2]+1]
-    ltiF = f[ltiIndices[1]: ltiIndices[2]+1]
-
-    # Upper Third IMOD
-    upper_third_imod = (2 * f[d2iHarm]) - f[d1iHarm]
-    utiIndices = _get_tone_indices_from_psd(pxx, frequencies, upper_third_imod)
-    utiPower = pxx[utiIndices[1]: utiIndices[2]+1]
-    utiF = f[utiIndices[1]: utiIndices[2]+1]
-
-    oip3 = np.nan
-    # Compute fundamental power and imod power
-    fund_power = np.array([bandpower(dominant1_pxx, dominant1_f), bandpower(dominant2_pxx, dominant2_f)])
-    imod_power = np.array([bandpower(ltiPower, ltiF), bandpower(utiPower, utiF)])
-    fund_power = mag2db(fund_power)
-    imod_power = mag2db(imod_power)
-
-    # Compute TOI
-    if not np.isnan(imod_power).any() and not np.isnan(imod_power).any():
-        oip3 = np.mean(fund_power) + ((np.mean(fund_power) - np.mean(imod_power)) / 2)
-
-    return oip3, fund_power, imod_power
+    spectrum = _as_spectrum(pxx, frequencies, coherent)
+    fundamental = spectrum.fundamental
+    return _toi_from_psd_without_dc(spectrum._working_copy(last=True), spectrum.frequencies, fundamental,
+                                    spectrum.coherent, spectrum._given_index())
 
 
 def toi_power_spectrum(sxx, frequencies, rbw):
@@ -150,3 +120,43 @@ def toi_power_spectrum(sxx, frequencies, rbw):
         raise AssertionError("Power Spectrum data and Frequency List must be of same length")
     pxx = sxx/rbw
     return toi_power_spectral_density(pxx, f)
+
+
+@_profiled("imod_search")
+def _toi_from_psd_without_dc(pxx, frequencies, fundamental, coherent=False, index=None):
+    # pxx has its DC component removed; the dominant tone region is zeroed temporarily and restored
+    f = frequencies
+    d1iLeft, d1iHarm, d1iRight = fundamental
+    dominant1_pxx = np.copy(pxx[d1iLeft:d1iRight + 1])
+    pxx[d1iLeft:d1iRight + 1] = 0.0
+    # Second Dominant Frequency
+    fh_idx = np.argmax(pxx)
+    dominant2 = f[fh_idx]
+    d2iHarm, d2iLeft, d2iRight = _get_tone_indices_from_psd(pxx, frequencies, dominant2, coherent=coherent)
+    # Restore Dominant
+    pxx[d1iLeft:d1iRight + 1] = dominant1_pxx
+
+    # Flip order if new dominant less than old dominant
+    if d2iHarm < d1iHarm:
+        d1iHarm, d2iHarm = d2iHarm, d1iHarm
+        d1iLeft, d2iLeft = d2iLeft, d1iLeft
+        d1iRight, d2iRight = d2iRight, d1iRight
+
+    # Lower and Upper Third IMOD
+    lower_third_imod = (2 * f[d1iHarm]) - f[d2iHarm]
+    upper_third_imod = (2 * f[d2iHarm]) - f[d1iHarm]
+    ltiIndices, utiIndices = _get_tones_indices_from_psd(pxx, frequencies, [lower_third_imod, upper_third_imod],
+                                                         coherent)
+
+    oip3 = np.nan
+    # Compute fundamental power and imod power
+    powers = mag2db(_get_band_powers(pxx, f, [[d1iLeft, d1iRight], [d2iLeft, d2iRight],
+                                              ltiIndices[1:], utiIndices[1:]], coherent, index))
+    fund_power = powers[:2]
+    imod_power = powers[2:]
+
+    # Compute TOI
+    if not np.isnan(imod_power).any():
+        oip3 = np.mean(fund_power) + ((np.mean(fund_power) - np.mean(imod_power)) / 2)
+
+    return oip3, fund_power, imod_power
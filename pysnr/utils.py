@@ -1,59 +1,315 @@
+import threading
 import numpy as np
 import scipy.signal
+from collections import OrderedDict, namedtuple
+from pysnr.fft import rfft
+from pysnr.profiling import _stage, _profiled
+from pysnr import kernels as _kernels
 
 
-def _check_type_and_shape(data):
+CachedWindow = namedtuple("CachedWindow", ["window", "sum", "sum_squares", "enbw"])
+CachedWindow.__doc__ = """A window along with its derived constants, as returned by :func:`get_window`.
+
+`sum` and `sum_squares` are used for the spectrum and density scaling of the periodogram, and `enbw` is the
+equivalent noise bandwidth in bins.
+"""
+
+_window_cache = OrderedDict()
+_window_cache_lock = threading.Lock()
+_window_cache_stats = {"maxsize": 16, "maxbytes": 1 << 28, "hits": 0, "misses": 0}
+
+_bin_widths_cache = OrderedDict()
+_bin_widths_cache_lock = threading.Lock()
+_bin_widths_cache_min_length = 256
+
+
+def _check_type_and_shape(data, batched=False):
+    max_dims = 2 if batched else 1
     if isinstance(data, np.ndarray):
-        if len(data.shape) != 1:
+        if not 1 <= len(data.shape) <= max_dims:
             return False, None
         return True, data
     elif isinstance(data, list):
         data = np.array(data)
-        if len(data.shape) != 1:
+        if not 1 <= len(data.shape) <= max_dims:
             return False, None
         return True, data
     else:
         return False, None
 
 
-def _get_tone_indices_from_psd(pxx, frequencies, tone_freq):
-    idxTone = np.nan
-    idxLeft = 0
-    idxRight = 0
+def _float_dtype(data):
+    # Floating point data keeps its precision (e.g. float32 periodograms); anything else is promoted to float64
+    dtype = np.asarray(data).dtype
+    return dtype if np.issubdtype(dtype, np.floating) else np.dtype(np.float64)
+
 
-    if frequencies[0] <= tone_freq < frequencies[-1]:
-        idxTone = np.argmin(np.abs(frequencies - tone_freq))
-        iLeftBin = max(0, idxTone - 1)
-        iRightBin = min(idxTone+1, len(frequencies))
-        idxMax = np.argmax(pxx[iLeftBin: iRightBin+1])
-        idxTone = iLeftBin + idxMax
-        idxLeft = max(0, idxTone - 1)
-        idxRight = min(idxTone + 1, len(pxx)-1)
+def _apply_to_batch(func, pxx, f, *args, axis=-1):
+    pxx = np.moveaxis(pxx, axis, -1)
+    outputs = [func(row, f, *args) for row in pxx]
+    return tuple(np.array(values) for values in zip(*outputs))
 
-        while (idxLeft > -1) and (pxx[idxLeft-1] <= pxx[idxLeft]):
-            idxLeft -= 1
-        while (idxRight < len(pxx) - 1) and (pxx[idxRight] >= pxx[idxRight+1]):
-            idxRight += 1
 
-        idxLeft = max(0, idxLeft)
-        idxRight = min(idxRight, len(pxx)-1)
+@_profiled("tone_search")
+def _get_tones_indices_from_psd(pxx, frequencies, tone_freqs, coherent=False):
+    tone_freqs = np.asarray(tone_freqs, dtype=float).ravel()
+    indices = [(np.nan, 0, -1)] * len(tone_freqs)
+    valid = np.flatnonzero((frequencies[0] <= tone_freqs) & (tone_freqs < frequencies[-1]))
+    if len(valid) == 0:
+        return indices
 
-    if np.isnan(idxTone):
-        return idxTone, 0, -1
-    return idxTone, idxLeft, idxRight
+    idxTone = _get_nearest_bins(frequencies, tone_freqs[valid])
+    if coherent:
+        # Coherently sampled tones fall in a single bin
+        for k, i in enumerate(valid):
+            indices[i] = (idxTone[k], idxTone[k], idxTone[k])
+        return indices
+    candidates = np.clip(idxTone[:, np.newaxis] + np.arange(-1, 2), 0, len(pxx) - 1)
+    idxTone = candidates[np.arange(len(candidates)), np.argmax(pxx[candidates], axis=1)]
+
+    # Walk left until the previous bin is higher, and right until the next bin is higher
+    if _kernels._use_numba():
+        idxLeft, idxRight = _kernels._tone_borders(pxx, idxTone)
+    else:
+        idxLeft, idxRight = _walk_tone_borders(pxx, idxTone)
+
+    for k, i in enumerate(valid):
+        indices[i] = (idxTone[k], idxLeft[k], idxRight[k])
+    return indices
+
+
+def _walk_tone_borders(pxx, tone_indices):
+    # Same walks as the Numba kernel, comparing blocks of bins that grow geometrically from the tone, so that the cost
+    # depends on the width of the tone region and not on the length of the PSD
+    N = len(pxx)
+    left = np.zeros(len(tone_indices), dtype=np.intp)
+    right = np.full(len(tone_indices), N - 1, dtype=np.intp)
+    for k, t in enumerate(tone_indices):
+        # Last j < max(0, t - 1) with pxx[j] > pxx[j + 1]
+        stop = max(0, t - 1)
+        width = 16
+        while stop > 0:
+            start = max(0, stop - width)
+            stops = np.flatnonzero(~(pxx[start:stop] <= pxx[start + 1:stop + 1]))
+            if len(stops):
+                left[k] = start + stops[-1] + 1
+                break
+            stop = start
+            width *= 4
+        # First j >= min(t + 1, N - 1) with pxx[j] < pxx[j + 1]
+        start = min(t + 1, N - 1)
+        width = 16
+        while start < N - 1:
+            stop = min(N - 1, start + width)
+            stops = np.flatnonzero(~(pxx[start:stop] >= pxx[start + 1:stop + 1]))
+            if len(stops):
+                right[k] = start + stops[0]
+                break
+            start = stop
+            width *= 4
+    return left, right
+
+
+def _get_nearest_bins(frequencies, tone_freqs):
+    # Index of the bin closest to each tone, the lowest one on ties, as an argmin of the distances would give.
+    # The bin is guessed in O(1) from the mean spacing of the grid, and the guess is kept if its neighbours lie on
+    # the uniform grid (which is then assumed sorted); otherwise it is found by bisection of sorted grids. The guess
+    # is refined among its neighbours.
+    N = len(frequencies)
+    tone_freqs = np.asarray(tone_freqs, dtype=float)
+    candidates = None
+    step = (frequencies[-1] - frequencies[0]) / (N - 1) if N >= 2 else 0
+    if step > 0:
+        guess = np.rint((tone_freqs - frequencies[0]) / step)
+        guess = np.clip(guess, -1, N).astype(np.intp)
+        candidates = np.clip(guess[..., np.newaxis] + np.arange(-1, 2), 0, N - 1)
+        if not np.all(np.abs(frequencies[candidates] - (frequencies[0] + candidates * step)) <= 1e-6 * step):
+            candidates = None
+    if candidates is None:
+        if not np.all(frequencies[1:] >= frequencies[:-1]):
+            return np.array([np.argmin(np.abs(frequencies - tone)) for tone in tone_freqs], dtype=np.intp)
+        guess = np.searchsorted(frequencies, tone_freqs)
+        candidates = np.clip(guess[..., np.newaxis] + np.arange(-1, 2), 0, N - 1)
+    distances = np.abs(frequencies[candidates] - tone_freqs[..., np.newaxis])
+    return np.take_along_axis(candidates, np.argmin(distances, axis=-1)[..., np.newaxis], axis=-1)[..., 0]
+
+
+def _get_tone_indices_from_psd(pxx, frequencies, tone_freq, coherent=False):
+    return _get_tones_indices_from_psd(pxx, frequencies, [tone_freq], coherent)[0]
+
+
+@_profiled("dc_removal")
+def _remove_dc_from_psd(pxx, frequencies, out=None, coherent=False):
+    if out is None:
+        pxx_no_dc = np.array(pxx, dtype=_float_dtype(pxx))
+    else:
+        pxx_no_dc = out
+        np.copyto(pxx_no_dc, pxx)
+    if coherent:
+        # Without a window, the DC component does not leak out of the first bin
+        pxx_no_dc[0] = 0
+        return pxx_no_dc
+    pxx_no_dc[0] = 2 * pxx_no_dc[0]
+    iHarm, iLeft, iRight = _get_tone_indices_from_psd(pxx_no_dc, frequencies, 0)
+    pxx_no_dc[iLeft:iRight + 1] = 0
+    return pxx_no_dc
+
+
+@_profiled("harmonic_search")
+def _get_harmonic_indices_from_psd(pxx, frequencies, n, aliased, coherent=False, return_orders=False):
+    fh_idx = np.argmax(pxx)
+    first_harmonic = frequencies[fh_idx]
+    fs = frequencies[-1] * 2
+
+    tones = [first_harmonic]
+    orders = [1]
+    for i in range(2, n + 1):
+        h = first_harmonic * i
+        if aliased:
+            h = _alias_to_nyquist(h, fs)
+        if not aliased and h > fs / 2:
+            continue
+        tones.append(h)
+        orders.append(i)
+
+    # Harmonics falling outside the frequency list (e.g. exactly at Nyquist) are skipped
+    tone_indices = _get_tones_indices_from_psd(pxx, frequencies, tones, coherent)
+    freq_indices = [[iLeft, iHarm, iRight] for iHarm, iLeft, iRight in tone_indices[:1]]
+    freq_indices += [[iLeft, iHarm, iRight] for iHarm, iLeft, iRight in tone_indices[1:] if not np.isnan(iHarm)]
+    if return_orders:
+        # Order of each region, 1 for the fundamental
+        return freq_indices, [1] + [i for i, (iHarm, iLeft, iRight) in zip(orders[1:], tone_indices[1:])
+                                    if not np.isnan(iHarm)]
+    return freq_indices
+
+
+def _get_band_powers(pxx, frequencies, ranges, coherent=False, index=None):
+    # Power of each [lo, hi] range of bins; in coherent mode each range is a single bin, integrated over the bin
+    # spacing. pxx is a periodogram with its DC region zeroed: given a SpectrumIndex of the periodogram, the ranges
+    # are integrated in O(1) from its cumulative power.
+    ranges = np.asarray(ranges, dtype=np.intp).reshape(-1, 2)
+    if not coherent:
+        if index is not None:
+            return index._range_power(ranges[:, 0], ranges[:, 1], _count_leading_zeros(pxx) - 1)
+        return bandpower_ranges(pxx, frequencies, ranges)
+    power = np.full(len(ranges), np.nan)
+    valid = ranges[:, 1] >= ranges[:, 0]
+    power[valid] = pxx[ranges[valid, 0]] * (frequencies[1] - frequencies[0])
+    return power
+
+
+@_profiled("noise_estimate")
+def _estimate_noise_psd(pxx, pxx_no_dc, freq_indices, out=None):
+    # Bins of the removed tones are replaced by the median noise density, unless they were already below it.
+    # The median is selected in `out` (pxx_no_dc itself can be used), which is then filled with the noise PSD.
+    intervals = _get_removed_intervals(pxx_no_dc, freq_indices)
+    if out is None:
+        out = np.array(pxx_no_dc, dtype=_float_dtype(pxx))
+    elif out is not pxx_no_dc:
+        np.copyto(out, pxx_no_dc)
+    estimated_noise_density = _noise_density(out, intervals)
+    np.copyto(out, pxx)
+    for lo, hi in intervals:
+        np.minimum(pxx[lo:hi + 1], estimated_noise_density, out=out[lo:hi + 1])
+    return out
+
+
+@_profiled("noise_estimate")
+def _estimate_noise_power(pxx, frequencies, pxx_no_dc, freq_indices, work=None):
+    # Power of the noise PSD of _estimate_noise_psd, integrated without building it: the bins outside the removed
+    # intervals keep their value and the others are limited to the noise density. The median is selected in `work`
+    # (pxx_no_dc itself can be used), and in a copy of pxx_no_dc if it is not given.
+    intervals = _get_removed_intervals(pxx_no_dc, freq_indices)
+    if work is None:
+        work = np.array(pxx_no_dc)
+    elif work is not pxx_no_dc:
+        np.copyto(work, pxx_no_dc)
+    estimated_noise_density = _noise_density(work, intervals)
+    widths = _get_bin_widths(np.asarray(frequencies))
+
+    def integrate(lo, hi, values):
+        if np.ndim(widths) == 0:
+            return widths * np.sum(values, dtype=np.float64)
+        return np.dot(values, widths[lo:hi])
+
+    power = 0.0
+    start = 0
+    for lo, hi in intervals:
+        power += integrate(start, lo, pxx[start:lo])
+        power += integrate(lo, hi + 1, np.minimum(pxx[lo:hi + 1], estimated_noise_density))
+        start = hi + 1
+    return power + integrate(start, len(pxx), pxx[start:])
+
+
+def _get_removed_intervals(pxx_no_dc, freq_indices):
+    # Sorted and disjoint [lo, hi] intervals of the bins replaced by the noise floor: the zeroed DC region at the start
+    # of pxx_no_dc and the tone regions. Other zero bins are also left out of the median, but a zero PSD bin is kept
+    # by the fill anyway.
+    N = len(pxx_no_dc)
+    dc_end = _count_leading_zeros(pxx_no_dc)
+    ranges = [(0, dc_end - 1)] if dc_end > 0 else []
+    for low, harmid, up in freq_indices:
+        lo, hi = max(int(low), 0), min(int(up), N - 1)
+        if hi >= lo:
+            ranges.append((lo, hi))
+    intervals = []
+    for lo, hi in sorted(ranges):
+        if intervals and lo <= intervals[-1][1] + 1:
+            intervals[-1][1] = max(intervals[-1][1], hi)
+        else:
+            intervals.append([lo, hi])
+    return intervals
+
+
+def _count_leading_zeros(pxx):
+    # Searched in blocks growing geometrically, the zeroed DC region being usually short
+    start = 0
+    width = 16
+    while start < len(pxx):
+        nonzero = np.flatnonzero(pxx[start:start + width])
+        if len(nonzero):
+            return start + nonzero[0]
+        start += width
+        width *= 4
+    return len(pxx)
+
+
+def _noise_density(work, intervals):
+    # Median of the nonzero bins of `work` outside the removed intervals, selected in place with introselect, `work`
+    # being left in an unspecified order. Zero bins sort after the negative ones (normally none) and before the
+    # others, and NaN sorts last.
+    for lo, hi in intervals:
+        work[lo:hi + 1] = 0
+    size = np.count_nonzero(work)
+    if size == 0:
+        return np.nan
+    zeros = len(work) - size
+    negatives = np.count_nonzero(work < 0) if np.fmin.reduce(work) < 0 else 0
+    half = size // 2
+    ranks = [half - 1, half] if size % 2 == 0 else [half]
+    positions = [rank if rank < negatives else rank + zeros for rank in ranks]
+    work.partition(sorted(set(positions + [len(work) - 1])))
+    if np.isnan(work[-1]):
+        return np.nan
+    if size % 2 == 0:
+        return np.mean(work[positions])
+    return work[positions[0]]
 
 
 def _get_peak_border(sxx, f, fund_freq, fund_bin, msd):
     leftBin = np.nan
     rightBin = np.nan
-    try:
-        leftBin = np.argwhere(sxx[1:fund_bin+1] < sxx[0:fund_bin]).flatten()[-1]
-    except IndexError:
-        leftBin = 0
-    try:
-        rightBin = fund_bin + np.argwhere(sxx[fund_bin+1:len(sxx)] > sxx[fund_bin:len(sxx)-1]).flatten()[0] - 1
-    except IndexError:
-        rightBin = len(sxx) - 1
+    if _kernels._use_numba():
+        leftBin, rightBin = _kernels._peak_border(sxx, fund_bin)
+    else:
+        try:
+            leftBin = np.argwhere(sxx[1:fund_bin+1] < sxx[0:fund_bin]).flatten()[-1]
+        except IndexError:
+            leftBin = 0
+        try:
+            rightBin = fund_bin + np.argwhere(sxx[fund_bin+1:len(sxx)] > sxx[fund_bin:len(sxx)-1]).flatten()[0] - 1
+        except IndexError:
+            rightBin = len(sxx) - 1
 
     leftBinG = np.nan
     rightBinG = np.nan
@@ -81,50 +337,245 @@ def _alias_to_nyquist(f, fs):
         return tone
 
 
-def _remove_dc_component(signal):
-    return signal - np.mean(signal)
+def get_window(window, N, dtype=np.float64):
+    """Returns a window and its derived constants from a bounded LRU cache.
+
+    Windows are keyed by (window, N, dtype), so repeated periodograms of captures of the same length reuse the same
+    window. The cache holds at most 16 windows and 256 MB by default (see :func:`window_cache_clear`); windows given
+    as arrays, or larger than the byte limit, are not cached.
+
+    Parameters
+    ----------
+    window : str or tuple or array_like
+        Desired window to use. This is passed as an input to scipy's get_window() function
+    N : int
+        Length of the window
+    dtype : numpy dtype
+        Data type of the window. Defaults to float64.
+
+    Returns
+    -------
+    CachedWindow
+        The window (read-only), its sum, its sum of squares and its equivalent noise bandwidth in bins
+    """
+    try:
+        key = (window, N, np.dtype(dtype).str)
+        hash(key)
+    except TypeError:
+        return _make_window(window, N, dtype)
+    with _window_cache_lock:
+        if key in _window_cache:
+            _window_cache.move_to_end(key)
+            _window_cache_stats["hits"] += 1
+            return _window_cache[key]
+        _window_cache_stats["misses"] += 1
+    entry = _make_window(window, N, dtype)
+    if entry.window.nbytes > _window_cache_stats["maxbytes"]:
+        return entry
+    with _window_cache_lock:
+        _window_cache[key] = entry
+        while (len(_window_cache) > _window_cache_stats["maxsize"] or
+               _window_cache_bytes() > _window_cache_stats["maxbytes"]):
+            _window_cache.popitem(last=False)
+    return entry
+
+
+def _window_cache_bytes():
+    return sum(entry.window.nbytes for entry in _window_cache.values())
+
+
+def _make_window(window, N, dtype):
+    if isinstance(window, (str, tuple)) or np.isscalar(window):
+        w = scipy.signal.get_window(window, N)
+    else:
+        w = np.asarray(window, dtype=float)
+        if w.shape != (N,):
+            raise ValueError("window must be of the same length as the signal")
+    w = w.astype(dtype)
+    w.setflags(write=False)
+    return CachedWindow(w, np.sum(w, dtype=np.float64), np.sum(w ** 2, dtype=np.float64), enbw(w))
+
+
+def window_cache_info():
+    """Returns the state of the window cache.
+
+    Returns
+    -------
+    dict
+        The number of cache hits and misses, the maximum number of windows and of bytes, the number of windows and of
+        bytes cached, and the keys (window, N, dtype) currently cached
+    """
+    with _window_cache_lock:
+        return dict(_window_cache_stats, size=len(_window_cache), bytes=_window_cache_bytes(),
+                    keys=list(_window_cache.keys()))
 
 
-def periodogram(data, Fs, window, method="welch", scaling="density"):
+def window_cache_clear(maxsize=None, maxbytes=None):
+    """Empties the window cache and resets its statistics.
+
+    Parameters
+    ----------
+    maxsize : int
+        If provided, the new maximum number of windows kept in the cache
+    maxbytes : int
+        If provided, the new maximum total size in bytes of the windows kept in the cache
+    """
+    with _window_cache_lock:
+        _window_cache.clear()
+        _window_cache_stats.update(hits=0, misses=0)
+        if maxsize is not None:
+            _window_cache_stats["maxsize"] = maxsize
+        if maxbytes is not None:
+            _window_cache_stats["maxbytes"] = maxbytes
+
+
+def _apply_window(data, window, detrend=False):
+    # A single copy of the data is made, in the precision of the window and in C order so that strided inputs (such
+    # as de-interleaved channels) are transformed contiguously; the mean is removed from the windowed signal
+    signal = np.multiply(data, window, dtype=window.dtype, order="C")
+    if detrend:
+        signal -= np.mean(data, axis=-1, keepdims=True).astype(window.dtype) * window
+    return signal
+
+
+def _segment_powers(segments, window, detrend=False):
+    # Yields the squared FFT magnitudes of groups of segments (along the second to last axis), bounding the
+    # FFT workspace to roughly 512k samples
+    count = segments.shape[-2]
+    group = max(1, (1 << 19) // (segments.shape[-1] * max(1, int(np.prod(segments.shape[:-2])))))
+    for start in range(0, count, group):
+        with _stage("window"):
+            signal = _apply_window(segments[..., start:start + group, :], window, detrend)
+        with _stage("fft"):
+            power = np.abs(rfft(signal, axis=-1, overwrite_x=True)) ** 2
+        yield start, power
+
+
+def _median_bias(count):
+    # Ratio of the median to the mean of a chi-squared distribution with 2 degrees of freedom, over `count` samples
+    ii_2 = 2 * np.arange(1., (count - 1) // 2 + 1)
+    return 1 + np.sum(1. / (ii_2 + 1) - 1. / ii_2)
+
+
+def _welch_power(data, window, nperseg, noverlap, average, detrend):
+    # Segments are a strided view of the data: only the FFT workspace of a group of segments is allocated for the
+    # mean, while the median keeps the powers of all the segments and selects it in place among them
+    if noverlap is None:
+        noverlap = nperseg // 2
+    if not 0 < nperseg <= data.shape[-1]:
+        raise ValueError("nperseg must be positive and not larger than the length of the signal")
+    if not 0 <= noverlap < nperseg:
+        raise ValueError("noverlap must be non-negative and less than nperseg")
+    if average not in ("mean", "median"):
+        raise ValueError("average must be 'mean' or 'median'")
+    step = nperseg - noverlap
+    segments = np.lib.stride_tricks.sliding_window_view(data, nperseg, axis=-1)[..., ::step, :]
+    count = segments.shape[-2]
+    if average == "median":
+        powers = np.empty(segments.shape[:-1] + (nperseg // 2 + 1,), dtype=window.dtype)
+        for start, power in _segment_powers(segments, window, detrend):
+            powers[..., start:start + power.shape[-2], :] = power
+        median = np.median(powers, axis=-2, overwrite_input=True)
+        # In place, keeping the precision of the window (the bias is a float64 scalar)
+        median /= _median_bias(count)
+        return median
+    total = np.zeros(segments.shape[:-2] + (nperseg // 2 + 1,), dtype=window.dtype)
+    for start, power in _segment_powers(segments, window, detrend):
+        total += np.sum(power, axis=-2)
+    return total / count
+
+
+def periodogram(data, Fs, window, method="welch", scaling="density", axis=-1, detrend=False, scale=1.0,
+                nperseg=None, noverlap=None, average="mean", dtype=np.float64):
     """Computes the periodogram from signal.
 
     This function computes the periodogram using one of two techniques - Welch method or FFT method
     By default, it is set to Welch method.
+    With the Welch method, the periodogram of the whole signal is computed unless `nperseg` is provided, in which
+    case the periodograms of overlapping segments of `nperseg` samples are averaged. The segments are read through a
+    strided view of `data`, so with the mean average the memory used depends on `nperseg` and not on the length of
+    the signal. The median average needs the periodograms of all the segments at once: about the size of the signal
+    with the default overlap, in the precision of `dtype`.
+    If `data` is 2-D, the periodograms of all the signals along `axis` are computed in a single FFT.
+    Integer data (such as a memory-mapped ADC capture) is converted to floating point only when the window is applied.
+    With `dtype` set to float32, the windowed signal, the FFT (complex64) and the periodogram are kept in single
+    precision, halving the memory traffic.
 
     Parameters
     ----------
     data : numpy ndarray
-        The signal whose periodogram is to be computed
+        The signal (or 2-D array of signals) whose periodogram is to be computed
     Fs : numpy ndarray
         Sampling Freqeuncy of input signal
     window : str or tuple or array_like
-        Desired window to use. This is passed as an input to scipy's get_window() function
+        Desired window to use. This is passed as an input to scipy's get_window() function, through the window cache
     method : str
         Decides which method to use for computing the periodogram. Can be `welch` or 'fft'
     scaling : str
         Decides whether to compute the power spectral density or the power spectrum. Can be 'density' or 'spectrum'
+    axis : int
+        Axis along which the periodogram is computed. Defaults to the last axis.
+    detrend : bool
+        If True, the mean of the signal (or of each segment) is removed before computing the periodogram
+    scale : float
+        Factor applied to the samples, e.g. to convert ADC codes to volts. Defaults to 1.0.
+    nperseg : int
+        Length of each segment for the Welch method. Defaults to the length of the signal.
+    noverlap : int
+        Number of samples shared by consecutive segments. Defaults to half of `nperseg`.
+    average : str
+        Decides how the periodograms of the segments are averaged. Can be 'mean' or 'median'
+    dtype : numpy dtype
+        Floating point precision of the computation: float64 (default) or float32
 
     Returns
     -------
     numpy ndarray
         List of frequencies
     numpy ndarray
-        The periodogram
+        The periodogram, with the frequencies along `axis`
     """
     f, pxx = None, None
+    data = np.moveaxis(data, axis, -1)
+    N = data.shape[-1]
     if method == "welch":
-        f, pxx = scipy.signal.periodogram(data, Fs, window, scaling=scaling, detrend=False)
+        if nperseg is None:
+            w = get_window(window, N, dtype)
+            with _stage("window"):
+                signal = _apply_window(data, w.window, detrend)
+            with _stage("fft"):
+                pxx = np.abs(rfft(signal, axis=-1, overwrite_x=True)) ** 2
+        else:
+            N = nperseg
+            w = get_window(window, N, dtype)
+            pxx = _welch_power(data, w.window, nperseg, noverlap, average, detrend)
+        f = np.fft.rfftfreq(N, d=1.0/Fs)
+        # The scale of the samples is applied to the power, along with the normalization
+        if scaling == "density":
+            pxx *= scale ** 2 / (Fs * w.sum_squares)
+        else:
+            pxx *= scale ** 2 / (w.sum ** 2)
+        if N % 2 == 0:
+            pxx[..., 1:-1] *= 2
+        else:
+            pxx[..., 1:] *= 2
+        pxx = np.moveaxis(pxx, -1, axis)
     if method == "fft":
-        N = len(data)
-        w = scipy.signal.get_window(window, N)
-        signal = data * w
-        dftout = np.abs(np.fft.rfft(signal))
+        if nperseg is not None:
+            raise ValueError("Segment averaging is only available with the Welch method")
+        w = get_window(window, N, dtype).window
+        with _stage("window"):
+            signal = _apply_window(data, w, detrend)
+        with _stage("fft"):
+            dftout = np.abs(rfft(signal, axis=-1, overwrite_x=True))
         f = np.fft.rfftfreq(N, d=1.0/Fs)
+        pxx = dftout ** 2
         if scaling == "density":
-            pxx = (1.0/(Fs * N)) * (dftout ** 2)
+            pxx *= scale ** 2 / (Fs * N)
         else:
-            pxx = (1.0 / (N ** 2)) * (dftout ** 2)
-        pxx[1:N-1] = 2 * pxx[1:N-1]
+            pxx *= scale ** 2 / (N ** 2)
+        pxx[..., 1:N-1] = 2 * pxx[..., 1:N-1]
+        pxx = np.moveaxis(pxx, -1, axis)
     return f, pxx
 
 
@@ -186,6 +637,7 @@ def enbw(window, Fs=None):
     return bw
 
 
+@_profiled("bandpower")
 def bandpower(pxx, f):
     """Computes the equivalent noise bandwidth
 
@@ -201,15 +653,103 @@ def bandpower(pxx, f):
     float
         The computed value
     """
+    pxx = np.asarray(pxx)
     if len(pxx) == 0:
         return np.nan
-    sxx = []
-    widths = np.diff(f)
+    f = np.asarray(f)
+    if _kernels._use_numba() and len(f) < _bin_widths_cache_min_length:
+        # Short bands are integrated without computing their widths
+        return _kernels._bandpower(pxx, np.asarray(f, dtype=np.float64))
+    widths = _get_bin_widths(f)
+    if np.ndim(widths) == 0:
+        return widths * np.sum(pxx, dtype=np.float64)
+    return np.dot(pxx, widths)
+
+
+@_profiled("bandpower")
+def bandpower_ranges(pxx, f, ranges):
+    """Computes the power contained in many bands of a periodogram at once.
+
+    The result for a band ``[lo, hi]`` is equal to ``bandpower(pxx[lo:hi + 1], f[lo:hi + 1])``: bands with less
+    than two bins give NaN. The bins of all the bands are gathered and integrated in a single pass with
+    :func:`numpy.add.reduceat`, so that the cost depends on the width of the bands and not on the length of `pxx`,
+    and, unlike differences of a cumulative sum, the precision of bands far below the peak of `pxx` is kept.
+
+    Parameters
+    ----------
+    pxx : numpy ndarray
+        The periodogram values in the power spectral density form
+    f : numpy ndarray
+        The frequencies corresponding to the periodogram
+    ranges : array_like
+        A (bands, 2) array of the first and last index (inclusive) of each band
+
+    Returns
+    -------
+    numpy ndarray
+        The power contained in each band
+    """
+    pxx = np.asarray(pxx)
+    f = np.asarray(f)
+    ranges = np.asarray(ranges, dtype=np.intp).reshape(-1, 2)
+    lo, hi = ranges[:, 0], ranges[:, 1]
+    valid = hi > lo
+    if np.any(valid & ((lo < 0) | (hi >= len(pxx)))):
+        raise IndexError("Band indices must lie within the periodogram")
+    power = np.full(len(ranges), np.nan)
+    if not np.any(valid):
+        return power
+    lo, hi = lo[valid], hi[valid]
+    # Bins lo..hi-1 of every band, concatenated, and the start of each band in the concatenation
+    lengths = hi - lo
+    starts = np.hstack((0, np.cumsum(lengths)[:-1]))
+    bins = np.arange(np.sum(lengths)) + np.repeat(lo - starts, lengths)
+    # Bins lo..hi-1 take the width to the next bin and the last bin the mean width of the band, except
+    # for bands starting at 0 Hz where the first bin takes the mean width and the others the width to the previous bin
+    steps = f[bins + 1] - f[bins]
+    missing_width = (f[hi] - f[lo]) / (hi - lo)
+    forward = np.add.reduceat(pxx[bins] * steps, starts)
+    power[valid] = forward + pxx[hi] * missing_width
+    from_zero = f[lo] == 0
+    if np.any(from_zero):
+        backward = np.add.reduceat(pxx[bins + 1] * steps, starts)
+        power[np.flatnonzero(valid)[from_zero]] = (backward + pxx[lo] * missing_width)[from_zero]
+    return power
+
+
+def _get_bin_widths(f):
+    # Returns the width of each bin, or a scalar width for uniform grids. The widths of long grids are cached
+    # along with a copy of the grid: a hit is only used if the grid is equal to the cached one, which is cheaper
+    # than checking its uniformity again.
     missing_width = (f[-1] - f[0])/(len(f) - 1)
-    if f[0] == 0:
+    key = None
+    if len(f) >= _bin_widths_cache_min_length:
+        key = (len(f), f.dtype.str, float(f[0]), float(f[-1]))
+        with _bin_widths_cache_lock:
+            entry = _bin_widths_cache.get(key)
+            if entry is not None:
+                _bin_widths_cache.move_to_end(key)
+        if entry is not None and (entry[0] is f or _blocks_equal(entry[0], f)):
+            return entry[1]
+    widths = np.diff(f)
+    if key is not None and np.allclose(widths, missing_width, rtol=1e-9, atol=0):
+        widths = missing_width
+    elif f[0] == 0:
         widths = np.hstack((missing_width, widths))
     else:
         widths = np.hstack((widths, missing_width))
-    for p, w in zip(pxx, widths):
-        sxx.append(p*w)
-    return np.sum(np.array(sxx))
\ No newline at end of file
+    if key is not None:
+        if np.ndim(widths):
+            widths.setflags(write=False)
+        grid = np.array(f)
+        grid.setflags(write=False)
+        with _bin_widths_cache_lock:
+            _bin_widths_cache[key] = (grid, widths)
+            while len(_bin_widths_cache) > 8:
+                _bin_widths_cache.popitem(last=False)
+    return widths
+
+
+def _blocks_equal(a, b, block=1 << 16):
+    # np.array_equal of arrays of the same length, without a temporary the length of the arrays
+    return all(np.array_equal(a[i:i + block], b[i:i + block]) for i in range(0, len(a), block))
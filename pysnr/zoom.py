@@ -0,0 +1,270 @@
+import numpy as np
+import scipy.fft
+import scipy.special
+from collections import namedtuple
+from pysnr.utils import mag2db, bandpower, periodogram
+from pysnr.utils import _remove_dc_from_psd, _get_harmonic_indices_from_psd, _estimate_noise_power
+from pysnr.utils import _get_tone_indices_from_psd, _alias_to_nyquist
+from pysnr.profiling import _stage
+
+
+ZoomAnalysisResult = namedtuple("ZoomAnalysisResult", [
+    "snr", "noise_power",
+    "sinad", "noise_distortion_power",
+    "thd", "harmonic_power",
+])
+ZoomAnalysisResult.__doc__ = """Metrics computed by :func:`analyze_zoom`.
+
+Each metric is followed by the power magnitude returned alongside it by the corresponding ``*_signal`` function.
+"""
+
+
+def zoom_periodogram(signal, fs=1.0, f_start=0.0, f_stop=None, beta=38, chunk_size=1 << 16):
+    """Computes the periodogram of a whole signal over a frequency band only.
+
+    The periodogram is equal to the corresponding bins of :func:`pysnr.periodogram` computed with a Kaiser window
+    and with the mean of the signal removed, but it is evaluated with chirp-z transforms of chunks of the signal, so
+    that the memory used depends on `chunk_size` and on the width of the band, and not on the length of the signal.
+
+    Parameters
+    ----------
+    signal : numpy ndarray
+        The 1-D signal, e.g. a memory-mapped capture
+    fs : float
+        Sampling Frequency. Defaults to 1.0.
+    f_start : float
+        Lower edge of the band
+    f_stop : float
+        Upper edge of the band. Defaults to the Nyquist frequency.
+    beta : float
+        Shape parameter of the Kaiser window
+    chunk_size : int
+        Number of samples transformed at a time
+
+    Returns
+    -------
+    numpy ndarray
+        List of frequencies, the bins of the full-length periodogram lying within the band
+    numpy ndarray
+        The power spectral density
+    """
+    signal = np.asarray(signal)
+    if signal.ndim != 1:
+        raise TypeError("Signal must be a 1-D array")
+    fs = float(fs)
+    N = len(signal)
+    if f_stop is None:
+        f_stop = fs / 2
+    first = max(0, int(np.ceil(f_start * N / fs)))
+    last = min(N // 2, int(np.floor(f_stop * N / fs)))
+    if last < first:
+        raise ValueError("The band contains no frequency bin")
+    zoom = _ZoomTransform(signal, fs, beta, chunk_size)
+    return zoom.frequencies(first, last), zoom.power([(first, last)])[0]
+
+
+def analyze_zoom(signal, fs=1.0, n=6, aliased=False, nperseg=65536, margin=64, chunk_size=1 << 16):
+    """SNR, SINAD and THD from a long input signal, located in two stages.
+
+    A coarse Welch-averaged periodogram over segments of `nperseg` samples locates the fundamental and the
+    harmonics, and gives the noise floor: as with the full periodogram, the tone regions are replaced by the median
+    noise density, which corrects for the wider tone regions of the coarse resolution. The fundamental and the
+    harmonics are then refined at the full resolution of the signal with :func:`zoom_periodogram`, over the coarse
+    neighbourhood of the fundamental and `margin` bins around each harmonic. The memory used does not depend on the
+    length of the signal.
+    Uses a Kaiser window with beta set to 38 for both stages.
+
+    Parameters
+    ----------
+    signal : numpy ndarray
+        The 1-D signal, e.g. a memory-mapped capture
+    fs : float
+        Sampling Frequency. Defaults to 1.0.
+    n : int
+        Number of harmonics to use (including the fundamental frequency)
+    aliased : bool
+        If True, converts the harmonics that are aliased into the Nyquist frequency
+    nperseg : int
+        Length of the segments of the coarse periodogram
+    margin : int
+        Number of full-resolution bins refined on each side of the tones
+    chunk_size : int
+        Number of samples transformed at a time by the refinement
+
+    Returns
+    -------
+    ZoomAnalysisResult
+        The computed metrics
+    """
+    signal = np.asarray(signal)
+    if signal.ndim != 1:
+        raise TypeError("Signal must be a 1-D array")
+    fs = float(fs)
+    N = len(signal)
+    nperseg = min(nperseg, N)
+
+    # Coarse stage: tone neighbourhoods and noise floor
+    fc, pxx = periodogram(signal, fs, ('kaiser', 38), detrend=True, nperseg=nperseg)
+    pxx_no_dc = _remove_dc_from_psd(pxx, fc)
+    freq_indices = _get_harmonic_indices_from_psd(pxx_no_dc, fc, n, aliased)
+    snr_noise = _estimate_noise_power(pxx, fc, pxx_no_dc, freq_indices)
+    # pxx_no_dc is not needed afterwards: the last median is selected in it
+    sinad_noise = _estimate_noise_power(pxx, fc, pxx_no_dc, freq_indices[:1], work=pxx_no_dc)
+
+    # Fine stage, in a single pass over the signal: the fundamental around its coarse bin, and the harmonics around
+    # their coarse frequencies, widened by the uncertainty of the coarse fundamental
+    zoom = _ZoomTransform(signal, fs, 38, chunk_size)
+    coarse_fundamental = fc[freq_indices[0][1]]
+    ratio = N / nperseg
+    orders, bands = [], []
+    for i in range(1, n + 1):
+        h = coarse_fundamental * i
+        half_width = int(np.ceil(2 * i * ratio)) + margin
+        if aliased:
+            h = _alias_to_nyquist(h, fs)
+        elif h - half_width * fs / N > fs / 2:
+            continue
+        centre = int(round(h * N / fs))
+        orders.append(i)
+        bands.append((max(0, centre - half_width), min(N // 2, centre + half_width)))
+    powers = zoom.power(bands)
+
+    f = zoom.frequencies(*bands[0])
+    fundamental = f[np.argmax(powers[0])]
+    signal_power = _tone_power(powers[0], f, fundamental)
+    harmonic_power = 0.0
+    for i, band, pxx in zip(orders[1:], bands[1:], powers[1:]):
+        h = fundamental * i
+        if aliased:
+            h = _alias_to_nyquist(h, fs)
+        if not aliased and h > fs / 2:
+            continue
+        power = _tone_power(pxx, zoom.frequencies(*band), h)
+        if not np.isnan(power):
+            harmonic_power += power
+
+    return ZoomAnalysisResult(mag2db(signal_power / snr_noise), mag2db(snr_noise),
+                              mag2db(signal_power / sinad_noise), mag2db(sinad_noise),
+                              mag2db(harmonic_power / signal_power), mag2db(harmonic_power))
+
+
+def _tone_power(pxx, frequencies, tone):
+    # Power of the tone region around a frequency, NaN if the frequency lies outside the band
+    f = frequencies
+    iHarm, iLeft, iRight = _get_tone_indices_from_psd(pxx, f, tone)
+    if np.isnan(iHarm):
+        return np.nan
+    return bandpower(pxx[iLeft:iRight + 1], f[iLeft:iRight + 1])
+
+
+class _ZoomTransform:
+    # Bins of the N-point DFT of the detrended, Kaiser-windowed signal. The DFT of the signal without window is
+    # evaluated on each band with a chirp-z transform of chunks of the signal, whose forward FFT is shared by all
+    # the bands; the window is then applied in the frequency domain, as the convolution with the DFT of the Kaiser
+    # window, whose main lobe has a closed form and outside of which it is below the rounding errors of the FFT.
+    #
+    # The contribution of the chunk starting at sample s is shifted by exp(-2j pi k s / N). When the chunks split the
+    # signal evenly and the FFT length is a multiple of their number, this shift is a circular rotation of the
+    # product of the FFTs: the rotated products are accumulated over the chunks and transformed back once per band.
+    # Otherwise each chunk is transformed back and shifted on its own.
+
+    def __init__(self, signal, fs, beta, chunk_size):
+        self.signal = signal
+        self.fs = fs
+        self.N = len(signal)
+        self.chunk_size = min(chunk_size, self.N)
+        self.mean = sum(np.sum(signal[start:start + self.chunk_size], dtype=np.float64)
+                        for start in range(0, self.N, self.chunk_size)) / self.N
+        self.kernel = _kaiser_kernel(beta, self.N)
+        # Parseval: the window vanishes outside of the main lobe of its DFT
+        self.sum_squares = np.sum(self.kernel ** 2) / self.N
+
+    def frequencies(self, first, last):
+        return np.arange(first, last + 1) * (self.fs / self.N)
+
+    def power(self, bands):
+        # Power spectral density over each (first, last) range of bins, inclusive
+        N = self.N
+        half = len(self.kernel) // 2
+        transforms = self._transform([(first - half, last + half) for first, last in bands])
+        powers = []
+        for (first, last), transform in zip(bands, transforms):
+            with _stage("window"):
+                windowed = np.convolve(transform, self.kernel, mode="valid") / N
+            pxx = np.abs(windowed) ** 2 / (self.fs * self.sum_squares)
+            k = np.arange(first, last + 1)
+            pxx[(k > 0) & ~((N % 2 == 0) & (k == N // 2))] *= 2
+            powers.append(pxx)
+        return powers
+
+    def _plan(self, widest):
+        # Chunk length, FFT length, and whether the chunk shifts are rotations: the number of chunks must divide
+        # both N and the FFT length, which is looked for among the chunk lengths down to half of chunk_size
+        N, L = self.N, self.chunk_size
+        count = -(-N // L)
+        for chunks in range(count, 2 * count + 1):
+            if N % chunks == 0:
+                length = N // chunks
+                size = chunks * scipy.fft.next_fast_len(-(-(length + widest - 1) // chunks))
+                if size <= 2 * (length + widest):
+                    return length, size, True
+                break
+        return L, scipy.fft.next_fast_len(L + widest - 1), False
+
+    def _transform(self, bands):
+        # DFT of the detrended signal over each (first, last) range of bins, inclusive; the bins may lie outside of
+        # [0, N), the DFT being periodic
+        N = self.N
+        L, size, rotate = self._plan(max(last - first + 1 for first, last in bands))
+        bins = [np.arange(first, last + 1) for first, last in bands]
+        chirp = _chirp(np.arange(L), N)
+        filters, sums = [], []
+        for (first, last), k in zip(bands, bins):
+            # The chirp over the differences of the bins and of the sample indices, wrapped around the FFT length
+            h = np.zeros(size, dtype=complex)
+            lags = np.arange(first - L + 1, last + 1)
+            h[lags % size] = _chirp(lags, N).conj()
+            filters.append(scipy.fft.fft(h, overwrite_x=True))
+            sums.append(np.zeros(size if rotate else len(k), dtype=complex))
+
+        block = np.zeros(size, dtype=complex)
+        product = np.empty(size, dtype=complex)
+        for chunk, start in enumerate(range(0, N, L)):
+            with _stage("fft"):
+                data = self.signal[start:start + L]
+                block[:len(data)] = (data - self.mean) * chirp[:len(data)]
+                block[len(data):] = 0
+                spectrum = scipy.fft.fft(block)
+                shift = chunk * (size // (N // L)) % size if rotate else None
+                for k, transform, total in zip(bins, filters, sums):
+                    np.multiply(spectrum, transform, out=product)
+                    if rotate:
+                        total[:size - shift] += product[shift:]
+                        total[size - shift:] += product[:shift]
+                    else:
+                        total += scipy.fft.ifft(product, overwrite_x=True)[k % size] * np.exp(
+                            -2j * np.pi * ((start * k) % N) / N)
+
+        transforms = []
+        for k, total in zip(bins, sums):
+            if rotate:
+                total = scipy.fft.ifft(total, overwrite_x=True)[k % size]
+            transforms.append(total * _chirp(k, N))
+        return transforms
+
+
+def _chirp(k, N):
+    # exp(-1j pi k^2 / N), with the square reduced modulo 2N in integers
+    k = np.asarray(k, dtype=np.int64)
+    return np.exp(-1j * np.pi * ((k * k) % (2 * N)) / N)
+
+
+def _kaiser_kernel(beta, N):
+    # DFT of the periodic Kaiser window of length N over its main lobe and one bin on each side, from the Fourier
+    # transform of the continuous window: N sinh(sqrt(beta^2 - (pi m)^2)) / (I0(beta) sqrt(beta^2 - (pi m)^2))
+    half = int(np.ceil(beta / np.pi)) + 1
+    m = np.arange(-half, half + 1)
+    root = np.emath.sqrt(beta ** 2 - (np.pi * m) ** 2)
+    # Scaled by exp(-beta) against overflows
+    sinhc = np.real((np.exp(root - beta) - np.exp(-root - beta)) / (2 * root))
+    return N * (-1.0) ** m * sinhc / scipy.special.i0e(beta)
@@ -0,0 +1,98 @@
+import sys
+import os
+import numpy as np
+import unittest
+import scipy.signal
+import scipy.io
+
+sys.path.append(os.path.join("../pysnr"))
+import pysnr
+
+
+class TestAnalyze(unittest.TestCase):
+
+    def setUp(self):
+        self.sine = scipy.io.loadmat("test/data/sine_data.mat")
+        self.aliased = scipy.io.loadmat("test/data/alias_data.mat")
+        self.toi = scipy.io.loadmat("test/data/toi_data.mat")
+
+    def get_signal_data(self, struct):
+        Fi = struct["Fi"].flatten()
+        Fs = struct["Fs"].flatten()
+        N = struct["N"].flatten()
+        noise = struct["noise"].flatten()
+        x = struct["x"].flatten()
+
+        return Fi, Fs, N, noise, x
+
+    def assertMatchesSignalFunctions(self, output, signal, Fs, n=6, aliased=False, msd=0):
+        expected = (pysnr.snr_signal(signal, Fs, n, aliased) + pysnr.sinad_signal(signal, Fs) +
+                    pysnr.thd_signal(signal, Fs, n, aliased) + pysnr.sfdr_signal(signal, Fs, msd) +
+                    pysnr.toi_signal(signal, Fs))
+        for value, expected_value in zip(output, expected):
+            self.assertTrue(np.allclose(value, expected_value, equal_nan=True))
+
+    def test_analyze(self):
+
+        Fi, Fs, N, noise, signal = self.get_signal_data(self.sine)
+        output = pysnr.analyze(signal + noise, Fs)
+        self.assertTrue(np.isclose(output.snr, 57.7103, rtol=0.025))
+        self.assertTrue(np.isclose(output.thd, -86.1283, rtol=0.025))
+        self.assertTrue(np.isclose(output.sfdr, 78.2632, rtol=0.025))
+        self.assertMatchesSignalFunctions(output, signal + noise, Fs)
+
+        Fi, Fs, N, noise, signal = self.get_signal_data(self.aliased)
+        output = pysnr.analyze(signal + noise, Fs, aliased=True, msd=100)
+        self.assertTrue(np.isclose(output.snr, 55.0423, rtol=0.025))
+        self.assertTrue(np.isclose(output.thd, -22.5413, rtol=0.025))
+        self.assertTrue(np.isclose(output.sfdr, 23.6745, rtol=0.025))
+        self.assertMatchesSignalFunctions(output, signal + noise, Fs, aliased=True, msd=100)
+
+        Fi, Fs, N, noise, signal = self.get_signal_data(self.toi)
+        output = pysnr.analyze(signal + noise, Fs)
+        self.assertTrue(np.isclose(output.toi, 1.3951, rtol=0.025))
+        self.assertMatchesSignalFunctions(output, signal + noise, Fs)
+
+    def test_analyze_psd(self):
+
+        Fi, Fs, N, noise, signal = self.get_signal_data(self.sine)
+        signal = signal - np.mean(signal + noise)
+        f, pxx = pysnr.periodogram(signal + noise, Fs, window=('kaiser', 38))
+        original = np.copy(pxx)
+        output = pysnr.analyze_power_spectral_density(pxx, f)
+        self.assertTrue(np.array_equal(pxx, original))
+        self.assertMatchesSignalFunctions(output, signal + noise, Fs)
+
+    def test_analyze_batched(self):
+
+        Fi, Fs, N, noise, signal = self.get_signal_data(self.toi)
+        batch = np.vstack((signal + noise, signal + noise[::-1]))
+        output = pysnr.analyze(batch, Fs)
+        self.assertEqual(output.snr.shape, (2,))
+        self.assertEqual(output.fund_power.shape, (2, 2))
+        for idx, row in enumerate(batch):
+            single = pysnr.analyze(row, Fs)
+            for value, expected_value in zip(output, single):
+                self.assertTrue(np.allclose(value[idx], expected_value, equal_nan=True))
+
+    def test_analyze_float32(self):
+        # Single precision keeps the periodogram within 1e-6 of its peak and the metrics within 1e-3 dB
+        for struct in (self.sine, self.toi):
+            Fi, Fs, N, noise, signal = self.get_signal_data(struct)
+            f, pxx = pysnr.periodogram(signal + noise, Fs, ('kaiser', 38), detrend=True, dtype=np.float32)
+            f, expected_pxx = pysnr.periodogram(signal + noise, Fs, ('kaiser', 38), detrend=True)
+            self.assertEqual(pxx.dtype, np.float32)
+            self.assertLess(np.max(np.abs(pxx - expected_pxx)) / np.max(expected_pxx), 1e-6)
+            self.assertEqual(pysnr.utils._remove_dc_from_psd(pxx, f).dtype, np.float32)
+
+            result = pysnr.analyze(signal + noise, Fs, dtype=np.float32)
+            expected = pysnr.analyze(signal + noise, Fs)
+            for value, expected_value in zip(result, expected):
+                self.assertTrue(np.allclose(value, expected_value, rtol=0, atol=1e-3, equal_nan=True))
+
+        adc = np.round(2047 * np.sin(2 * np.pi * 0.1234 * np.arange(1 << 14))).astype(np.int16)
+        self.assertTrue(np.allclose(pysnr.snr_signal(adc, dtype=np.float32), pysnr.snr_signal(adc), rtol=0, atol=1e-3))
+
+
+if __name__ == '__main__':
+    unittest.main()
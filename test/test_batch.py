@@ -0,0 +1,75 @@
+import sys
+import os
+import csv
+import tempfile
+import numpy as np
+import unittest
+import scipy.signal
+import scipy.io
+
+sys.path.append(os.path.join("../pysnr"))
+import pysnr
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.sine = scipy.io.loadmat("test/data/sine_data.mat")
+
+    def get_signal_data(self, struct):
+        Fi = struct["Fi"].flatten()[0]
+        Fs = struct["Fs"].flatten()[0]
+        N = struct["N"].flatten()[0]
+        noise = struct["noise"].flatten()
+        x = struct["x"].flatten()
+
+        return Fi, Fs, N, noise, x
+
+    def get_captures(self):
+        Fi, Fs, N, noise, signal = self.get_signal_data(self.sine)
+        captures = np.vstack([signal + noise * (1 + idx / 4) for idx in range(7)])
+        return Fs, captures
+
+    def test_run_batch_array(self):
+
+        Fs, captures = self.get_captures()
+        expected = pysnr.analyze(captures, Fs)
+        progress = []
+        results = pysnr.run_batch(captures, Fs, workers=2, chunk_size=3,
+                                  progress=lambda done, total: progress.append((done, total)))
+        self.assertTrue(np.array_equal(results["index"], np.arange(7)))
+        self.assertTrue(np.allclose(results["snr"], expected.snr))
+        self.assertTrue(np.allclose(results["thd"], expected.thd))
+        self.assertTrue(np.allclose(results["sfdr"], expected.sfdr))
+        self.assertTrue(np.allclose(results["fund_power"], expected.fund_power, equal_nan=True))
+        self.assertEqual(sorted(progress)[-1], (7, 7))
+
+    def test_run_batch_files(self):
+
+        Fs, captures = self.get_captures()
+        expected = pysnr.analyze(captures, Fs)
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "captures.bin")
+            captures.tofile(path)
+            memmapped = np.memmap(path, dtype=np.float64, mode="r", shape=captures.shape)
+            csv_path = os.path.join(folder, "results.csv")
+            results = pysnr.run_batch(memmapped, Fs, workers=2, chunk_size=4, csv_path=csv_path)
+            self.assertTrue(np.allclose(results["snr"], expected.snr))
+            with open(csv_path) as fh:
+                rows = list(csv.DictReader(fh))
+            self.assertEqual(len(rows), 7)
+            self.assertIn("fund_power_1", rows[0])
+            for row in rows:
+                self.assertTrue(np.isclose(float(row["snr"]), expected.snr[int(row["index"])]))
+            del memmapped
+
+            paths = []
+            for idx in range(3):
+                paths.append(os.path.join(folder, "capture{}.npy".format(idx)))
+                np.save(paths[-1], captures[idx])
+            results = pysnr.run_batch(paths, Fs, workers=0)
+            self.assertTrue(np.allclose(results["sinad"], expected.sinad[:3]))
+
+
+if __name__ == '__main__':
+    unittest.main()
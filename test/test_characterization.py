@@ -0,0 +1,90 @@
+import sys
+import os
+import csv
+import tempfile
+import numpy as np
+import unittest
+
+sys.path.append(os.path.join("../pysnr"))
+import pysnr
+
+
+class TestCharacterization(unittest.TestCase):
+
+    def setUp(self):
+        self.Fs = 1000.0
+        self.N = 8192
+        self.amplitudes = [-40.0, -20.0, -6.0]
+        self.frequencies = [pysnr.coherent_frequency(f, self.N, self.Fs)[0] for f in (51.0, 203.0)]
+        self.rng = np.random.default_rng(3)
+
+    def write_captures(self, folder):
+        manifest = []
+        t = np.arange(self.N) / self.Fs
+        for frequency in self.frequencies:
+            for amplitude in self.amplitudes:
+                level = 10 ** (amplitude / 20)
+                signal = (level * np.sin(2 * np.pi * frequency * t) + 1e-3 * level * np.sin(4 * np.pi * frequency * t)
+                          + 1e-4 * self.rng.standard_normal(self.N))
+                path = os.path.join(folder, "capture{}.npy".format(len(manifest)))
+                np.save(path, signal)
+                manifest.append({"path": path, "amplitude": amplitude, "frequency": frequency})
+        return manifest
+
+    def test_characterize(self):
+        with tempfile.TemporaryDirectory() as folder:
+            manifest = self.write_captures(folder)
+            cache_dir = os.path.join(folder, "cache")
+            progress = []
+            result = pysnr.characterize(manifest, self.Fs, workers=0, cache_dir=cache_dir,
+                                        progress=lambda done, total: progress.append((done, total)))
+            self.assertEqual(progress[-1], (6, 6))
+            for row, entry in enumerate(manifest):
+                expected = pysnr.analyze(np.load(entry["path"]), self.Fs)
+                self.assertAlmostEqual(result.captures["snr"][row], expected.snr)
+                self.assertAlmostEqual(result.captures["sfdr"][row], expected.sfdr)
+                self.assertEqual(result.captures["amplitude"][row], entry["amplitude"])
+
+            curve = result.snr_vs_amplitude
+            np.testing.assert_array_equal(curve["frequency"], np.repeat(self.frequencies, 3))
+            np.testing.assert_array_equal(curve["amplitude"], np.tile(self.amplitudes, 2))
+            self.assertTrue(np.all(np.diff(curve["snr"][:3]) > 0))
+            np.testing.assert_array_equal(result.sfdr_vs_frequency["amplitude"], np.repeat(self.amplitudes, 2))
+            np.testing.assert_allclose(result.enob["enob"],
+                                       (result.enob["sinad"] - 1.76 - result.enob["amplitude"]) / 6.02)
+            np.testing.assert_allclose(result.dynamic_range["dynamic_range"],
+                                       result.enob["sinad"][::3] + 40, rtol=1e-12)
+            # Noise of 1e-4 rms against a 0 dBFS sine of amplitude 1
+            np.testing.assert_allclose(result.dynamic_range["dynamic_range"], 10 * np.log10(0.5 / 1e-8), atol=1)
+
+            # A second run only reads the cache, including through a CSV manifest
+            manifest_path = os.path.join(folder, "manifest.csv")
+            with open(manifest_path, "w", newline="") as fh:
+                writer = csv.DictWriter(fh, fieldnames=["path", "amplitude", "frequency"])
+                writer.writeheader()
+                for entry in manifest:
+                    writer.writerow(dict(entry, path=os.path.basename(entry["path"])))
+            progress = []
+            resumed = pysnr.characterize(manifest_path, self.Fs, workers=0, cache_dir=cache_dir,
+                                         progress=lambda done, total: progress.append((done, total)))
+            self.assertEqual(progress, [])
+            for name in pysnr.CAPTURE_DTYPE.names:
+                np.testing.assert_array_equal(resumed.captures[name], result.captures[name])
+
+            # Changing the analysis parameters invalidates the cache
+            pysnr.characterize(manifest, self.Fs, n=3, workers=0, cache_dir=cache_dir,
+                               progress=lambda done, total: progress.append((done, total)))
+            self.assertEqual(progress[-1], (6, 6))
+
+    def test_repeated_captures(self):
+        with tempfile.TemporaryDirectory() as folder:
+            manifest = self.write_captures(folder)
+            manifest.append(dict(manifest[0]))
+            result = pysnr.characterize(manifest, self.Fs, workers=2)
+            self.assertEqual(len(result.captures), 7)
+            self.assertEqual(len(result.snr_vs_amplitude), 6)
+            self.assertAlmostEqual(result.snr_vs_amplitude["snr"][0], result.captures["snr"][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
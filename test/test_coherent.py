@@ -0,0 +1,71 @@
+import sys
+import os
+import numpy as np
+import unittest
+
+sys.path.append(os.path.join("../pysnr"))
+import pysnr
+
+
+class TestCoherent(unittest.TestCase):
+
+    def setUp(self):
+        self.N = 4096
+        self.Fs = 48000.0
+        self.freq, self.cycles = pysnr.coherent_frequency(1000, self.N, self.Fs)
+        t = np.arange(self.N) / self.Fs
+        rng = np.random.default_rng(7)
+        self.noise = 1e-5 * rng.standard_normal(self.N)
+        self.signal = (0.1 + np.sin(2 * np.pi * self.freq * t) + 1e-3 * np.sin(2 * np.pi * 2 * self.freq * t)
+                       + 3e-4 * np.sin(2 * np.pi * 3 * self.freq * t + 1) + self.noise)
+
+    def test_coherent_frequency(self):
+        self.assertEqual(self.cycles, 85)
+        self.assertAlmostEqual(self.freq, 85 * self.Fs / self.N)
+        self.assertTrue(pysnr.is_coherent(self.freq, self.N, self.Fs))
+        self.assertFalse(pysnr.is_coherent(1000, self.N, self.Fs))
+        self.assertFalse(pysnr.is_coherent(self.Fs / 2, self.N, self.Fs))
+        self.assertEqual(pysnr.coherent_frequency(0.25, 16)[1], 3)
+        self.assertRaises(ValueError, pysnr.coherent_frequency, 0.6, 16)
+
+    def test_single_bin_tones(self):
+        f, pxx = pysnr.periodogram(self.signal, self.Fs, "boxcar", detrend=True)
+        pxx_no_dc = pysnr.utils._remove_dc_from_psd(pxx, f, coherent=True)
+        self.assertEqual(pxx_no_dc[0], 0)
+        np.testing.assert_array_equal(pxx_no_dc[1:], pxx[1:])
+        indices = pysnr.utils._get_harmonic_indices_from_psd(pxx_no_dc, f, 3, False, coherent=True)
+        np.testing.assert_array_equal(np.array(indices), np.array([[1, 1, 1], [2, 2, 2], [3, 3, 3]]) * self.cycles)
+
+    def test_metrics(self):
+        thd, harmonic_power = pysnr.thd_signal(self.signal, self.Fs, coherent=True)
+        self.assertAlmostEqual(harmonic_power, 10 * np.log10((1e-6 + 9e-8) / 2), places=2)
+        self.assertAlmostEqual(thd, 10 * np.log10(1e-6 + 9e-8), places=2)
+
+        snr, noise_power = pysnr.snr_signal(self.signal, self.Fs, coherent=True)
+        self.assertAlmostEqual(noise_power, 10 * np.log10(np.var(self.noise)), delta=0.2)
+        self.assertAlmostEqual(snr, 10 * np.log10(0.5 / np.var(self.noise)), delta=0.2)
+
+        sinad, distortion_power = pysnr.sinad_signal(self.signal, self.Fs, coherent=True)
+        self.assertAlmostEqual(sinad, -thd, delta=0.01)
+
+        sfdr, spur_power = pysnr.sfdr_signal(self.signal, self.Fs, coherent=True)
+        self.assertAlmostEqual(sfdr, 60, places=2)
+
+        result = pysnr.analyze(np.vstack((self.signal, self.signal)), self.Fs, coherent=True)
+        np.testing.assert_allclose(result.snr, snr, rtol=1e-12)
+        np.testing.assert_allclose(result.thd, thd, rtol=1e-12)
+        np.testing.assert_allclose(result.sfdr, sfdr, rtol=1e-12)
+
+    def test_toi(self):
+        f2, cycles2 = pysnr.coherent_frequency(1100, self.N, self.Fs)
+        t = np.arange(self.N) / self.Fs
+        tones = np.array([self.freq, f2, 2 * self.freq - f2, 2 * f2 - self.freq])
+        signal = np.array([1, 1, 1e-3, 1e-3]) @ np.sin(2 * np.pi * tones[:, np.newaxis] * t)
+        toi, fund_power, imod_power = pysnr.toi_signal(signal, self.Fs, coherent=True)
+        np.testing.assert_allclose(fund_power, 10 * np.log10(0.5), atol=1e-9)
+        np.testing.assert_allclose(imod_power, 10 * np.log10(0.5e-6), atol=1e-6)
+        self.assertAlmostEqual(toi, 10 * np.log10(0.5) + 30, places=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
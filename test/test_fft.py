@@ -0,0 +1,73 @@
+import sys
+import os
+import numpy as np
+import unittest
+import importlib.util
+import scipy.signal
+import scipy.io
+
+sys.path.append(os.path.join("../pysnr"))
+import pysnr
+
+
+class TestFFT(unittest.TestCase):
+
+    def setUp(self):
+        self.sine = scipy.io.loadmat("test/data/sine_data.mat")
+
+    def get_signal_data(self, struct):
+        Fi = struct["Fi"].flatten()[0]
+        Fs = struct["Fs"].flatten()[0]
+        N = struct["N"].flatten()[0]
+        noise = struct["noise"].flatten()
+        x = struct["x"].flatten()
+
+        return Fi, Fs, N, noise, x
+
+    def test_backends(self):
+
+        Fi, Fs, N, noise, signal = self.get_signal_data(self.sine)
+        self.assertEqual(pysnr.fft.get_backend()[0], "numpy")
+        f, pxx = pysnr.periodogram(signal + noise, Fs, ('kaiser', 38))
+        expected = pysnr.snr_signal(signal + noise, Fs)
+        for name in ("scipy", "pocketfft"):
+            with pysnr.fft.backend(name, workers=2):
+                self.assertEqual(pysnr.fft.get_backend(), (name, {"workers": 2}))
+                self.assertTrue(np.allclose(pysnr.periodogram(signal + noise, Fs, ('kaiser', 38))[1], pxx))
+                self.assertTrue(np.allclose(pysnr.snr_signal(signal + noise, Fs), expected))
+        self.assertEqual(pysnr.fft.get_backend()[0], "numpy")
+
+    @unittest.skipUnless(importlib.util.find_spec("pyfftw"), "pyfftw is not installed")
+    def test_pyfftw_backend(self):
+
+        Fi, Fs, N, noise, signal = self.get_signal_data(self.sine)
+        expected = pysnr.snr_signal(signal + noise, Fs)
+        with pysnr.fft.backend("pyfftw", threads=2, planner_effort="FFTW_ESTIMATE"):
+            self.assertTrue(np.allclose(pysnr.snr_signal(signal + noise, Fs), expected))
+            self.assertTrue(np.allclose(pysnr.snr_signal(signal + noise, Fs), expected))
+
+    def test_register_backend(self):
+
+        Fi, Fs, N, noise, signal = self.get_signal_data(self.sine)
+        calls = []
+
+        def counting_backend():
+            def rfft(x, axis=-1, overwrite_x=False):
+                calls.append(x.shape)
+                return np.fft.rfft(x, axis=axis)
+            return rfft
+
+        pysnr.fft.register_backend("counting", counting_backend)
+        self.addCleanup(pysnr.fft._backends.pop, "counting", None)
+        self.assertIn("counting", pysnr.fft.available_backends())
+        with pysnr.fft.backend("counting"):
+            pysnr.snr_signal(np.vstack((signal, signal + noise)), Fs)
+            pysnr.sfdr_signal(signal + noise, Fs)
+        self.assertEqual(calls, [(2, N), (N,)])
+
+        with self.assertRaises(ValueError):
+            pysnr.fft.set_backend("unknown")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import sys
+import os
+import numpy as np
+import unittest
+import scipy.signal
+import scipy.io
+
+sys.path.append(os.path.join("../pysnr"))
+import pysnr
+from pysnr.kernels import kernels
+
+
+@unittest.skipUnless("numba" in pysnr.kernels.available_kernels(), "numba is not installed")
+class TestKernels(unittest.TestCase):
+
+    def setUp(self):
+        self.datasets = [scipy.io.loadmat("test/data/{}_data.mat".format(name))
+                         for name in ("sine", "cosine", "alias", "toi")]
+
+    def get_signal_data(self, struct):
+        Fs = struct["Fs"].flatten()[0]
+        noise = struct["noise"].flatten()
+        x = struct["x"].flatten()
+
+        return Fs, noise, x
+
+    def test_indices(self):
+        rng = np.random.default_rng(4)
+        for struct in self.datasets:
+            Fs, noise, signal = self.get_signal_data(struct)
+            f, pxx = pysnr.periodogram(signal + noise, Fs, ('kaiser', 38), detrend=True)
+            pxx_no_dc = pysnr.utils._remove_dc_from_psd(pxx, f)
+            tones = rng.uniform(0, f[-1], 50)
+            outputs = {}
+            for name in ("numpy", "numba"):
+                with kernels(name):
+                    freq_indices = pysnr.utils._get_harmonic_indices_from_psd(pxx_no_dc, f, 8, True)
+                    fund = freq_indices[0][1]
+                    outputs[name] = (pysnr.utils._get_tones_indices_from_psd(pxx_no_dc, f, tones), freq_indices,
+                                     pysnr.utils._get_peak_border(pxx_no_dc, f, f[fund], fund, 3),
+                                     pysnr.utils._estimate_noise_psd(pxx, pxx_no_dc, freq_indices))
+            for expected, value in zip(outputs["numpy"], outputs["numba"]):
+                self.assertTrue(np.array_equal(np.array(expected, dtype=float), np.array(value, dtype=float),
+                                               equal_nan=True))
+
+    def test_metrics(self):
+        # The band powers are summed in a different order, so the dB results agree to rounding
+        for struct in self.datasets:
+            Fs, noise, signal = self.get_signal_data(struct)
+            with kernels("numpy"):
+                expected = pysnr.analyze(signal + noise, Fs, msd=3)
+            with kernels("numba"):
+                result = pysnr.analyze(signal + noise, Fs, msd=3)
+            for value, expected_value in zip(result, expected):
+                self.assertTrue(np.allclose(value, expected_value, rtol=0, atol=1e-9, equal_nan=True))
+
+        f = np.cumsum(np.abs(noise[:100]))
+        for band in (f, f - f[0], f[:1]):
+            with kernels("numpy"):
+                expected = pysnr.bandpower(signal[:len(band)] ** 2, band)
+            with kernels("numba"):
+                self.assertTrue(np.allclose(pysnr.bandpower(signal[:len(band)] ** 2, band), expected,
+                                            rtol=1e-12, equal_nan=True))
+
+
+class TestKernelSelection(unittest.TestCase):
+
+    def test_selection(self):
+        self.assertIn(pysnr.kernels.get_kernels(), pysnr.kernels.available_kernels())
+        with kernels("numpy"):
+            self.assertEqual(pysnr.kernels.get_kernels(), "numpy")
+        with self.assertRaises(ValueError):
+            pysnr.kernels.set_kernels("cython")
+
+
+if __name__ == '__main__':
+    unittest.main()
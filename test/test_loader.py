@@ -0,0 +1,66 @@
+import sys
+import os
+import tempfile
+import numpy as np
+import unittest
+import scipy.signal
+import scipy.io
+
+sys.path.append(os.path.join("../pysnr"))
+import pysnr
+
+
+class TestLoader(unittest.TestCase):
+
+    def setUp(self):
+        self.sine = scipy.io.loadmat("test/data/sine_data.mat")
+        self.cosine = scipy.io.loadmat("test/data/cosine_data.mat")
+
+    def get_signal_data(self, struct):
+        Fi = struct["Fi"].flatten()[0]
+        Fs = struct["Fs"].flatten()[0]
+        N = struct["N"].flatten()[0]
+        noise = struct["noise"].flatten()
+        x = struct["x"].flatten()
+
+        return Fi, Fs, N, noise, x
+
+    def test_load_raw(self):
+
+        Fi, Fs, N, noise, sine = self.get_signal_data(self.sine)
+        Fi, Fs, N, noise, cosine = self.get_signal_data(self.cosine)
+        scale = 1.0 / 2**14
+        codes = np.round(np.vstack((sine + noise, cosine + noise)) / scale).astype(np.int16)
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "capture.bin")
+            with open(path, "wb") as fh:
+                fh.write(b"header")
+                fh.write(codes.T.tobytes())
+
+            capture = pysnr.load_raw(path, np.int16, offset=6, channels=2, scale=scale)
+            self.assertEqual(capture.data.shape, (2, N))
+            self.assertEqual(capture.data.dtype, np.int16)
+            self.assertTrue(np.array_equal(capture.data, codes))
+            self.assertTrue(np.allclose(pysnr.snr_signal(capture.data, Fs)[0],
+                                        pysnr.snr_signal(codes * scale, Fs)[0]))
+
+            capture = pysnr.load_raw(path, np.int16, offset=6, channels=2, channel=1, scale=scale)
+            self.assertIsInstance(capture.data, np.memmap)
+            self.assertTrue(np.array_equal(capture.data, codes[1]))
+            self.assertTrue(np.isclose(pysnr.snr_signal(capture.data, Fs)[0], 57.7142, rtol=0.025))
+
+            f, pxx = pysnr.periodogram(capture.data, Fs, ('kaiser', 38), detrend=True, scale=capture.scale)
+            ref_f, ref_pxx = pysnr.periodogram(codes[1] * scale, Fs, ('kaiser', 38), detrend=True)
+            self.assertTrue(np.allclose(pxx, ref_pxx))
+            del capture, f, pxx
+
+    def test_load_mat(self):
+
+        Fi, Fs, N, noise, signal = self.get_signal_data(self.sine)
+        capture = pysnr.load_mat("test/data/sine_data.mat", "x")
+        self.assertEqual(capture.data.shape, (N,))
+        self.assertTrue(np.array_equal(capture.data, signal))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import sys
+import os
+import numpy as np
+import unittest
+import scipy.io
+
+sys.path.append(os.path.join("../pysnr"))
+import pysnr
+
+
+class TestMultiChannel(unittest.TestCase):
+
+    def setUp(self):
+        self.sine = scipy.io.loadmat("test/data/sine_data.mat")
+
+    def get_signal_data(self, struct):
+        Fs = struct["Fs"].flatten()[0]
+        noise = struct["noise"].flatten()
+        x = struct["x"].flatten()
+
+        return Fs, noise, x
+
+    def get_captures(self):
+        Fs, noise, signal = self.get_signal_data(self.sine)
+        captures = np.vstack([signal + noise * (1 + idx / 4) for idx in range(5)])
+        return Fs, captures
+
+    def test_deinterleave(self):
+        buffer = np.arange(4 * 10 + 3, dtype=np.int16)
+        view = pysnr.deinterleave(buffer, 3, stride=4, offset=1)
+        self.assertTrue(np.shares_memory(view, buffer))
+        self.assertEqual(view.shape, (3, 10))
+        self.assertTrue(np.array_equal(view[1], np.arange(2, 42, 4)))
+        self.assertEqual(pysnr.deinterleave(buffer[:12], 3).shape, (3, 4))
+        self.assertRaises(ValueError, pysnr.deinterleave, buffer, 5, stride=4)
+        self.assertRaises(TypeError, pysnr.deinterleave, buffer.reshape(1, -1), 3)
+
+    def test_analyze_channels(self):
+        Fs, captures = self.get_captures()
+        expected = pysnr.analyze(captures, Fs)
+
+        for workers in (1, 2):
+            result = pysnr.analyze_channels(captures, Fs, workers=workers)
+            for name in pysnr.AnalysisResult._fields:
+                self.assertTrue(np.allclose(getattr(result.channels, name), getattr(expected, name), equal_nan=True))
+
+        interleaved = np.empty((captures.shape[1], 6))
+        interleaved[:, :5] = captures.T
+        interleaved[:, 5] = 1e6
+        result = pysnr.analyze_channels(interleaved.ravel(), Fs, channels=5, stride=6)
+        self.assertTrue(np.allclose(result.channels.snr, expected.snr))
+        self.assertTrue(np.allclose(result.channels.sinad, expected.sinad))
+
+        self.assertEqual(result.worst_channel["snr"], int(np.argmin(expected.snr)))
+        self.assertEqual(result.worst_channel["thd"], int(np.argmax(expected.thd)))
+        self.assertAlmostEqual(result.worst["sinad"], np.min(expected.sinad))
+        self.assertAlmostEqual(result.spread["snr"], np.max(expected.snr) - np.min(expected.snr))
+
+    def test_analyze_channels_errors(self):
+        Fs, captures = self.get_captures()
+        self.assertRaises(TypeError, pysnr.analyze_channels, captures[0], Fs)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import sys
+import os
+import threading
+import numpy as np
+import unittest
+import scipy.signal
+import scipy.io
+
+sys.path.append(os.path.join("../pysnr"))
+import pysnr
+
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self.sine = scipy.io.loadmat("test/data/sine_data.mat")
+
+    def get_signal_data(self, struct):
+        Fs = struct["Fs"].flatten()[0]
+        noise = struct["noise"].flatten()
+        x = struct["x"].flatten()
+
+        return Fs, noise, x
+
+    def test_profile(self):
+        Fs, noise, signal = self.get_signal_data(self.sine)
+        with pysnr.Profile() as profile:
+            expected = pysnr.snr_signal(signal + noise, Fs)
+        stages = profile.as_dict()
+        for stage in ("window", "fft", "dc_removal", "harmonic_search", "tone_search", "noise_estimate", "bandpower"):
+            self.assertGreaterEqual(stages[stage]["calls"], 1)
+            self.assertGreaterEqual(stages[stage]["seconds"], 0)
+            self.assertIsNone(stages[stage]["allocated_bytes"])
+            self.assertIsNone(stages[stage]["allocations"])
+
+        # Nothing is recorded outside of the context
+        self.assertTrue(np.allclose(pysnr.snr_signal(signal + noise, Fs), expected))
+        self.assertEqual(profile.as_dict(), stages)
+        self.assertIs(pysnr.profiling._stage("fft"), pysnr.profiling._disabled)
+
+        text = profile.to_prometheus()
+        self.assertIn("# TYPE pysnr_stage_seconds_total counter", text)
+        self.assertIn('pysnr_stage_calls_total{stage="fft"} 1\n', text)
+        self.assertNotIn("allocated_bytes", text)
+
+    def test_profile_memory(self):
+        Fs, noise, signal = self.get_signal_data(self.sine)
+        with pysnr.Profile(memory=True) as profile:
+            pysnr.sfdr_signal(signal + noise, Fs)
+            pysnr.toi_signal(signal + noise, Fs)
+        stages = profile.as_dict()
+        self.assertIn("spur_search", stages)
+        self.assertIn("imod_search", stages)
+        if pysnr.profiling._can_trace_peaks:
+            # The windowed copy of the signal is allocated in the window stage, and the DC removal returns a copy
+            self.assertGreaterEqual(stages["window"]["allocated_bytes"], len(signal) * 8)
+            self.assertGreaterEqual(stages["dc_removal"]["allocations"], 1)
+            self.assertIn("pysnr_stage_allocated_bytes", profile.to_prometheus())
+            self.assertIn("pysnr_stage_allocations_total", profile.to_prometheus())
+
+    def test_concurrent_profiles(self):
+        Fs, noise, signal = self.get_signal_data(self.sine)
+        barrier = threading.Barrier(2)
+        profiles = {}
+
+        def run(name, func):
+            with pysnr.Profile() as profile:
+                barrier.wait()
+                for _ in range(5):
+                    func(signal + noise, Fs)
+                barrier.wait()
+            profiles[name] = profile.as_dict()
+
+        threads = [threading.Thread(target=run, args=("thd", pysnr.thd_signal)),
+                   threading.Thread(target=run, args=("sfdr", pysnr.sfdr_signal))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(profiles["thd"]["fft"]["calls"], 5)
+        self.assertEqual(profiles["sfdr"]["fft"]["calls"], 5)
+        self.assertNotIn("spur_search", profiles["thd"])
+        self.assertIn("spur_search", profiles["sfdr"])
+
+        # The thread pool of analyze_channels runs in the context of the caller
+        with pysnr.Profile() as profile:
+            pysnr.analyze_channels(np.vstack((signal, signal + noise)), Fs, workers=2)
+        self.assertEqual(profile.as_dict()["fft"]["calls"], 2)
+
+    def test_hooks(self):
+        Fs, noise, signal = self.get_signal_data(self.sine)
+        calls = []
+
+        def hook(stage, seconds, allocated):
+            calls.append(stage)
+
+        pysnr.add_hook(hook)
+        try:
+            pysnr.thd_signal(signal + noise, Fs)
+        finally:
+            pysnr.remove_hook(hook)
+        pysnr.thd_signal(signal + noise, Fs)
+        self.assertEqual(calls.count("fft"), 1)
+        self.assertIn("harmonic_search", calls)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -73,6 +73,17 @@ class TestSFDR(unittest.TestCase):
         output = pysnr.sfdr_power_spectrum(sxx, f, 10)
         self.assertTrue(np.isclose(output[0], 78.7762, rtol=0.025, equal_nan=True))
 
+    def test_sfdr_batched(self):
+
+        Fi, Fs, N, noise, sine = self.get_signal_data(self.sine)
+        Fi, Fs, N, noise, aliased = self.get_signal_data(self.aliased)
+        batch = np.vstack((sine + noise, aliased + noise))
+        sfdr_values, spur_powers = pysnr.sfdr_signal(batch, Fs, 100)
+        self.assertEqual(sfdr_values.shape, (2,))
+        self.assertTrue(np.allclose(sfdr_values, [pysnr.sfdr_signal(sine + noise, Fs, 100)[0],
+                                                  pysnr.sfdr_signal(aliased + noise, Fs, 100)[0]]))
+        self.assertTrue(np.allclose(pysnr.sfdr_signal(batch.T, Fs, 100, axis=0)[0], sfdr_values))
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
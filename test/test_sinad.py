@@ -70,6 +70,17 @@ class TestSINAD(unittest.TestCase):
         rbw = pysnr.utils.enbw(w, Fs)
         self.assertTrue(np.isclose(pysnr.sinad_power_spectrum(sxx, f, rbw)[0], 22.5389, rtol=0.025))
 
+    def test_sinad_batched(self):
+
+        Fi, Fs, N, noise, sine = self.get_signal_data(self.sine)
+        Fi, Fs, N, noise, cosine = self.get_signal_data(self.cosine)
+        batch = np.vstack((sine + noise, cosine + noise))
+        sinad_values, noise_powers = pysnr.sinad_signal(batch, Fs)
+        self.assertEqual(sinad_values.shape, (2,))
+        self.assertTrue(np.allclose(sinad_values, [pysnr.sinad_signal(sine + noise, Fs)[0],
+                                                   pysnr.sinad_signal(cosine + noise, Fs)[0]]))
+        self.assertTrue(np.allclose(pysnr.sinad_signal(batch.T, Fs, axis=0)[0], sinad_values))
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
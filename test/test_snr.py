@@ -71,6 +71,26 @@ class TestSNR(unittest.TestCase):
         self.assertTrue(np.isclose(pysnr.snr_signal(signal + noise, Fs, aliased=False)[0], 23.6189, rtol=0.025))
         self.assertTrue(np.isclose(pysnr.snr_signal(signal + noise, Fs, aliased=True)[0], 55.0423, rtol=0.025))
 
+    def test_snr_batched(self):
+
+        Fi, Fs, N, noise, sine = self.get_signal_data(self.sine)
+        Fi, Fs, N, noise, cosine = self.get_signal_data(self.cosine)
+        batch = np.vstack((sine + noise, cosine + noise))
+        snr_values, noise_powers = pysnr.snr_signal(batch, Fs)
+        self.assertEqual(snr_values.shape, (2,))
+        self.assertEqual(noise_powers.shape, (2,))
+        self.assertTrue(np.allclose(snr_values, [pysnr.snr_signal(sine + noise, Fs)[0],
+                                                 pysnr.snr_signal(cosine + noise, Fs)[0]]))
+        self.assertTrue(np.allclose(pysnr.snr_signal(batch.T, Fs, axis=0)[0], snr_values))
+
+    def test_snr_welch(self):
+
+        Fi, Fs, N, noise, signal = self.get_signal_data(self.sine)
+        self.assertTrue(np.isclose(pysnr.snr_signal(signal + noise, Fs, nperseg=2500)[0], 57.7103, rtol=0.025))
+        f, pxx = scipy.signal.welch(signal + noise, Fs, ('kaiser', 38), nperseg=2500, noverlap=500, average="median")
+        self.assertTrue(np.allclose(pysnr.snr_signal(signal + noise, Fs, nperseg=2500, noverlap=500, average="median"),
+                                    pysnr.snr_power_spectral_density(pxx, f)))
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,127 @@
+import sys
+import os
+import numpy as np
+import unittest
+import scipy.signal
+import scipy.io
+
+sys.path.append(os.path.join("../pysnr"))
+import pysnr
+
+
+class TestSpectrumIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.sine = scipy.io.loadmat("test/data/sine_data.mat")
+        self.toi = scipy.io.loadmat("test/data/toi_data.mat")
+
+    def get_signal_data(self, struct):
+        Fs = float(struct["Fs"].flatten()[0])
+        noise = struct["noise"].flatten()
+        x = struct["x"].flatten()
+
+        return Fs, noise, x
+
+    def test_lookups(self):
+        Fs, noise, signal = self.get_signal_data(self.sine)
+        f, pxx = pysnr.periodogram(signal + noise, Fs, ('kaiser', 38))
+        index = pysnr.SpectrumIndex(pxx, f)
+
+        ranges = [(0, 10), (3, 4), (100, 200), (0, len(f) - 1), (50, 50), (20, 10)]
+        for lo, hi in ranges:
+            expected = pysnr.bandpower(pxx[lo:hi + 1], f[lo:hi + 1])
+            self.assertTrue(np.allclose(index.range_power(lo, hi), expected, rtol=1e-9, atol=0, equal_nan=True))
+        # With the DC region zeroed, as the metric functions integrate the tones
+        pxx_no_dc = pysnr.utils._remove_dc_from_psd(pxx, f)
+        zeroed = np.flatnonzero(pxx_no_dc)[0] - 1
+        for lo, hi in ranges + [(0, zeroed + 5), (zeroed - 2, zeroed + 5), (zeroed + 1, zeroed + 5)]:
+            expected = pysnr.bandpower(pxx_no_dc[lo:hi + 1], f[lo:hi + 1])
+            power = index._range_power(lo, hi, zeroed)
+            self.assertTrue(np.allclose(power, expected, rtol=1e-9, atol=0, equal_nan=True))
+        self.assertTrue(np.allclose(index.band_power(f[100] - 1e-3, f[200]), pysnr.bandpower(pxx[100:201], f[100:201])))
+
+        tones = np.array([0, f[7], f[7] + 0.2 * (f[1] - f[0]), 0.5 * (f[40] + f[41]), Fs, -Fs])
+        expected = [np.argmin(np.abs(f - tone)) for tone in tones]
+        self.assertTrue(np.array_equal(index.nearest_bin(tones), expected))
+
+        harmonics = np.arange(1, 10) * 0.37 * Fs
+        expected = [pysnr.utils._alias_to_nyquist(h, f[-1] * 2) for h in harmonics]
+        self.assertTrue(np.allclose(index.alias(harmonics), expected))
+
+    def test_metrics(self):
+        for struct in (self.sine, self.toi):
+            Fs, noise, signal = self.get_signal_data(struct)
+            f, pxx = pysnr.periodogram(signal + noise, Fs, ('kaiser', 38), detrend=True)
+            index = pysnr.SpectrumIndex(pxx, f)
+            for func, args in ((pysnr.snr_power_spectral_density, ()), (pysnr.sinad_power_spectral_density, ()),
+                               (pysnr.thd_power_spectral_density, (4,)), (pysnr.sfdr_power_spectral_density, ())):
+                self.assertTrue(np.allclose(func(index, None, *args), func(pxx, f, *args)))
+            for a, b in zip(pysnr.toi_power_spectral_density(index), pysnr.toi_power_spectral_density(pxx, f)):
+                self.assertTrue(np.allclose(a, b, equal_nan=True))
+            self.assertFalse(index.pxx.flags.writeable)
+
+
+class TestSpectrum(unittest.TestCase):
+
+    def setUp(self):
+        self.sine = scipy.io.loadmat("test/data/sine_data.mat")
+        self.toi = scipy.io.loadmat("test/data/toi_data.mat")
+
+    def get_signal_data(self, struct):
+        Fs = struct["Fs"].flatten()[0]
+        noise = struct["noise"].flatten()
+        x = struct["x"].flatten()
+
+        return Fs, noise, x
+
+    def test_metrics(self):
+        for struct in (self.sine, self.toi):
+            Fs, noise, signal = self.get_signal_data(struct)
+            f, pxx = pysnr.periodogram(signal + noise, Fs, ('kaiser', 38), detrend=True)
+            spectrum = pysnr.Spectrum.from_periodogram((f, pxx))
+            for func, args in ((pysnr.snr_power_spectral_density, (6, True)), (pysnr.sinad_power_spectral_density, ()),
+                               (pysnr.thd_power_spectral_density, (4,)), (pysnr.sfdr_power_spectral_density, (2,))):
+                self.assertTrue(np.array_equal(func(spectrum, None, *args), func(pxx, f, *args)))
+                self.assertTrue(np.array_equal(func(spectrum, None, *args), func(pxx, f, *args)))
+            for a, b in zip(pysnr.toi_power_spectral_density(spectrum), pysnr.toi_power_spectral_density(pxx, f)):
+                self.assertTrue(np.array_equal(a, b, equal_nan=True))
+            for a, b in zip(pysnr.analyze_power_spectral_density(spectrum, None, 4),
+                            pysnr.analyze_power_spectral_density(pxx, f, 4)):
+                self.assertTrue(np.array_equal(a, b, equal_nan=True))
+            # The metrics modify a working copy, leaving the memoized analysis intact
+            self.assertTrue(np.array_equal(spectrum.pxx_no_dc, pysnr.utils._remove_dc_from_psd(pxx, f)))
+
+    def test_memoization(self):
+        Fs, noise, signal = self.get_signal_data(self.sine)
+        f, pxx = pysnr.periodogram(signal + noise, Fs, ('kaiser', 38), detrend=True)
+        spectrum = pysnr.Spectrum(pxx, f)
+        self.assertRaises(AttributeError, setattr, spectrum, "extra", 1)
+
+        pxx_no_dc = spectrum.pxx_no_dc
+        self.assertIs(spectrum.pxx_no_dc, pxx_no_dc)
+        self.assertFalse(pxx_no_dc.flags.writeable)
+        self.assertEqual(pxx_no_dc[0], 0)
+
+        indices = spectrum.harmonic_indices(4, False)
+        self.assertEqual(indices[0], spectrum.fundamental)
+        self.assertEqual(indices, pysnr.utils._get_harmonic_indices_from_psd(pysnr.utils._remove_dc_from_psd(pxx, f),
+                                                                             f, 4, False))
+        indices[0][0] = -1
+        self.assertNotEqual(spectrum.harmonic_indices(4, False)[0][0], -1)
+
+        noise_psd = spectrum.noise_psd(4, False)
+        self.assertIs(spectrum.noise_psd(4, False), noise_psd)
+        self.assertIsNot(spectrum.noise_psd(1, False), noise_psd)
+        self.assertEqual(spectrum.noise_power(4, False), pysnr.bandpower(noise_psd, f))
+        self.assertTrue(np.array_equal(spectrum.cumulative_power, pysnr.SpectrumIndex(pxx, f).cumulative_power))
+
+        pysnr.sfdr_power_spectral_density(spectrum)
+        pysnr.toi_power_spectral_density(spectrum)
+        self.assertTrue(np.array_equal(spectrum.pxx_no_dc, pysnr.utils._remove_dc_from_psd(pxx, f)))
+
+        self.assertRaises(TypeError, pysnr.Spectrum, pxx.reshape(1, -1), f)
+        self.assertRaises(AssertionError, pysnr.Spectrum, pxx[1:], f)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import sys
+import os
+import tempfile
+import numpy as np
+import unittest
+import scipy.signal
+import scipy.io
+
+sys.path.append(os.path.join("../pysnr"))
+import pysnr
+
+
+class TestStream(unittest.TestCase):
+
+    def setUp(self):
+        self.sine = scipy.io.loadmat("test/data/sine_data.mat")
+
+    def get_signal_data(self, struct):
+        Fi = struct["Fi"].flatten()[0]
+        Fs = struct["Fs"].flatten()[0]
+        N = struct["N"].flatten()[0]
+        noise = struct["noise"].flatten()
+        x = struct["x"].flatten()
+
+        return Fi, Fs, N, noise, x
+
+    def test_welch_stream(self):
+
+        Fi, Fs, N, noise, signal = self.get_signal_data(self.sine)
+        chunks = np.array_split(signal + noise, 7)
+        f, pxx = pysnr.welch_stream(chunks, Fs, nperseg=2048, noverlap=1000)
+        ref_f, ref_pxx = scipy.signal.welch(signal + noise, Fs, ('kaiser', 38), nperseg=2048, noverlap=1000)
+        self.assertTrue(np.allclose(f, ref_f))
+        self.assertTrue(np.allclose(pxx, ref_pxx))
+
+        f, sxx = pysnr.welch_stream(chunks, Fs, nperseg=2047, scaling="spectrum")
+        ref_f, ref_sxx = scipy.signal.welch(signal + noise, Fs, ('kaiser', 38), nperseg=2047, scaling="spectrum")
+        self.assertTrue(np.allclose(sxx, ref_sxx))
+
+        with self.assertRaises(ValueError):
+            pysnr.welch_stream(chunks[:1], Fs, nperseg=4096)
+
+    def test_welch_stream_file(self):
+
+        Fi, Fs, N, noise, signal = self.get_signal_data(self.sine)
+        ref_f, ref_pxx = scipy.signal.welch(signal + noise, Fs, ('kaiser', 38), nperseg=2048)
+        with tempfile.TemporaryDirectory() as folder:
+            np.save(os.path.join(folder, "capture.npy"), signal + noise)
+            f, pxx = pysnr.welch_stream(os.path.join(folder, "capture.npy"), Fs, nperseg=2048, chunk_size=1500)
+            self.assertTrue(np.allclose(pxx, ref_pxx))
+
+            (signal + noise).astype(np.float32).tofile(os.path.join(folder, "capture.bin"))
+            f, pxx = pysnr.welch_stream(os.path.join(folder, "capture.bin"), Fs, nperseg=2048, dtype=np.float32)
+            self.assertTrue(np.allclose(pxx, ref_pxx, rtol=1e-3))
+
+    def test_snr_stream(self):
+
+        Fi, Fs, N, noise, signal = self.get_signal_data(self.sine)
+        output = pysnr.snr_stream(np.array_split(signal + noise, 5), Fs, nperseg=4096)
+        self.assertTrue(np.isclose(output[0], 57.7103, rtol=0.025))
+        self.assertTrue(np.isclose(output[0], pysnr.snr_signal(signal + noise, Fs)[0], rtol=0.01))
+
+    def test_streaming_analyzer(self):
+
+        Fi, Fs, N, noise, signal = self.get_signal_data(self.sine)
+        x = signal + noise
+        emitted = []
+        analyzer = pysnr.StreamingAnalyzer(Fs, window_length=4096, hop=1000, callback=emitted.append)
+        results = []
+        for chunk in np.array_split(x, 13):
+            results += analyzer.push(chunk)
+        self.assertEqual([result.sample for result in results], list(range(4096, N + 1, 1000)))
+        self.assertEqual(results, emitted)
+        for result in results:
+            window = x[result.sample - 4096:result.sample]
+            self.assertTrue(np.allclose(result[1:3], pysnr.snr_signal(window, Fs)))
+            self.assertTrue(np.allclose(result[3:5], pysnr.sinad_signal(window, Fs)))
+        self.assertTrue(np.isclose(analyzer.latest.snr, 57.7103, rtol=0.025))
+
+        analyzer = pysnr.StreamingAnalyzer(Fs, window_length=4096, hop=1000, averaging=4)
+        results = analyzer.push(x)
+        self.assertTrue(np.allclose(results[0][1:3], pysnr.snr_signal(x[:4096], Fs)))
+        # Each update moves the average by a quarter of its difference to the new periodogram
+        average = None
+        for result in results:
+            f, pxx = pysnr.periodogram(x[result.sample - 4096:result.sample], Fs, ('kaiser', 38), detrend=True)
+            average = pxx if average is None else average + (pxx - average) / 4
+            self.assertTrue(np.allclose(result[1:3], pysnr.snr_power_spectral_density(average, f)))
+            self.assertTrue(np.allclose(result[3:5], pysnr.sinad_power_spectral_density(average, f)))
+        f, pxx = analyzer.spectrum()
+        self.assertTrue(np.allclose(pxx, average, rtol=1e-9, atol=0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import sys
+import os
+import numpy as np
+import unittest
+import scipy.io
+
+sys.path.append(os.path.join("../pysnr"))
+import pysnr
+
+
+class TestSweep(unittest.TestCase):
+
+    def setUp(self):
+        self.signals = []
+        for name in ("sine_data", "alias_data", "cosine_data", "toi_data"):
+            data = scipy.io.loadmat(os.path.join(os.path.dirname(__file__), "data", name + ".mat"))
+            self.signals.append((data["x"].flatten() + data["noise"].flatten(), data["Fs"].flatten()[0]))
+
+    def test_sweep(self):
+        for x, Fs in self.signals:
+            for aliased in (False, True):
+                sweep = pysnr.harmonic_sweep_signal(x, Fs, 12, aliased)
+                np.testing.assert_array_equal(sweep.n, np.arange(2, 13))
+                for k, n in enumerate(sweep.n):
+                    snr, noise_power = pysnr.snr_signal(x, Fs, n, aliased)
+                    thd, harmonic_power = pysnr.thd_signal(x, Fs, n, aliased)
+                    np.testing.assert_allclose([sweep.snr[k], sweep.noise_power[k], sweep.thd[k],
+                                                sweep.harmonic_power[k]], [snr, noise_power, thd, harmonic_power],
+                                               rtol=1e-12, atol=1e-12)
+
+    def test_batch(self):
+        x, Fs = self.signals[0]
+        batch = np.vstack((x, x[::-1]))
+        sweep = pysnr.harmonic_sweep_signal(batch, Fs, 8)
+        for row, signal in enumerate(batch):
+            expected = pysnr.harmonic_sweep_signal(signal, Fs, 8)
+            np.testing.assert_allclose(sweep.snr[row], expected.snr)
+            np.testing.assert_allclose(sweep.thd[row], expected.thd)
+
+    def test_n_max(self):
+        x, Fs = self.signals[0]
+        self.assertRaises(ValueError, pysnr.harmonic_sweep_signal, x, Fs, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
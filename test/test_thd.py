@@ -62,6 +62,17 @@ class TestTHD(unittest.TestCase):
         self.assertTrue(np.isclose(pysnr.thd_signal(signal + noise, Fs, aliased=False)[0], -29.1114, rtol=0.025))
         self.assertTrue(np.isclose(pysnr.thd_signal(signal + noise, Fs, aliased=True)[0], -22.5413, rtol=0.025))
 
+    def test_thd_batched(self):
+
+        Fi, Fs, N, noise, sine = self.get_signal_data(self.sine)
+        Fi, Fs, N, noise, aliased = self.get_signal_data(self.aliased)
+        batch = np.vstack((sine + noise, aliased + noise))
+        thd_values, harmonic_powers = pysnr.thd_signal(batch, Fs, aliased=True)
+        self.assertEqual(thd_values.shape, (2,))
+        self.assertTrue(np.allclose(thd_values, [pysnr.thd_signal(sine + noise, Fs, aliased=True)[0],
+                                                 pysnr.thd_signal(aliased + noise, Fs, aliased=True)[0]]))
+        self.assertTrue(np.allclose(pysnr.thd_signal(batch.T, Fs, aliased=True, axis=0)[0], thd_values))
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -97,6 +97,20 @@ class TestTOI(unittest.TestCase):
         self.assertTrue(np.isclose(output[1], np.array([-22.9133, -22.9132]), rtol=0.025, equal_nan=True).any())
         self.assertTrue(np.isclose(output[2], np.array([-71.4868, -71.5299]), rtol=0.025, equal_nan=True).any())
 
+    def test_toi_batched(self):
+
+        Fi, Fs, N, noise, signal = self.get_signal_data(self.toi)
+        batch = np.vstack((signal + noise, signal + noise[::-1]))
+        oip3, fund_power, imod_power = pysnr.toi_signal(batch, Fs)
+        self.assertEqual(oip3.shape, (2,))
+        self.assertEqual(fund_power.shape, (2, 2))
+        self.assertEqual(imod_power.shape, (2, 2))
+        for idx, row in enumerate(batch):
+            output = pysnr.toi_signal(row, Fs)
+            self.assertTrue(np.isclose(oip3[idx], output[0], equal_nan=True))
+            self.assertTrue(np.allclose(fund_power[idx], output[1], equal_nan=True))
+            self.assertTrue(np.allclose(imod_power[idx], output[2], equal_nan=True))
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
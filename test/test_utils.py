@@ -34,6 +34,177 @@ class TestUtils(unittest.TestCase):
         self.assertTrue(np.round(pysnr.utils.enbw(flattop), 4), 3.7740)
         self.assertTrue(np.round(pysnr.utils.enbw(flattop, 44100), 4), 16.6285)
 
+    def test_tone_indices(self):
+        pxx = np.array([5, 3, 1, 2, 6, 9, 4, 4, 1, 3, 8, 2, 1, 1, 0.5])
+        f = np.arange(len(pxx)) * 10.0
+        self.assertEqual(tuple(pysnr.utils._get_tone_indices_from_psd(pxx, f, 0)), (0, 0, 2))
+        self.assertEqual(tuple(pysnr.utils._get_tone_indices_from_psd(pxx, f, 52)), (5, 2, 8))
+        self.assertEqual(tuple(pysnr.utils._get_tone_indices_from_psd(pxx, f, 98)), (10, 8, 14))
+        self.assertTrue(np.isnan(pysnr.utils._get_tone_indices_from_psd(pxx, f, 140)[0]))
+
+        tones = [0, 52, 98, 140]
+        batched = pysnr.utils._get_tones_indices_from_psd(pxx, f, tones)
+        for tone, indices in zip(tones, batched):
+            single = pysnr.utils._get_tone_indices_from_psd(pxx, f, tone)
+            self.assertTrue(np.array_equal(indices, single, equal_nan=True))
+
+    def test_window_cache(self):
+        pysnr.window_cache_clear()
+        signal = np.sin(2 * np.pi * 0.1 * np.arange(1000))
+        f, pxx = pysnr.periodogram(signal, 1.0, ('kaiser', 38))
+        f, pxx_repeated = pysnr.periodogram(signal, 1.0, ('kaiser', 38))
+        self.assertTrue(np.array_equal(pxx, pxx_repeated))
+        info = pysnr.window_cache_info()
+        self.assertEqual((info["hits"], info["misses"], info["size"]), (1, 1, 1))
+        self.assertEqual(info["keys"][0][:2], (('kaiser', 38), 1000))
+
+        cached = pysnr.get_window(('kaiser', 38), 1000)
+        self.assertFalse(cached.window.flags.writeable)
+        self.assertTrue(np.allclose(cached.window, scipy.signal.get_window(('kaiser', 38), 1000)))
+        self.assertTrue(np.isclose(cached.enbw, pysnr.utils.enbw(scipy.signal.get_window(('kaiser', 38), 1000))))
+
+        pysnr.window_cache_clear(maxsize=2)
+        for N in (100, 200, 300):
+            pysnr.get_window("hann", N)
+        self.assertEqual([key[1] for key in pysnr.window_cache_info()["keys"]], [200, 300])
+        pysnr.window_cache_clear(maxsize=16, maxbytes=2500 * 8)
+        for N in (1000, 1000, 2000, 3000):
+            pysnr.get_window("hann", N)
+        info = pysnr.window_cache_info()
+        self.assertEqual(([key[1] for key in info["keys"]], info["bytes"], info["hits"]), ([2000], 2000 * 8, 1))
+        pysnr.window_cache_clear(maxsize=16, maxbytes=1 << 28)
+        self.assertEqual(pysnr.window_cache_info()["size"], 0)
+
+        # The scale of the samples scales the power by its square, for both methods
+        for method in ("welch", "fft"):
+            f, pxx = pysnr.periodogram(signal, 1.0, ('kaiser', 38), method=method)
+            f, scaled = pysnr.periodogram(signal, 1.0, ('kaiser', 38), method=method, scale=0.5)
+            self.assertTrue(np.allclose(scaled, pxx / 4, rtol=1e-12, atol=0))
+
+    def test_bandpower(self):
+        def reference(pxx, f):
+            widths = np.diff(f)
+            missing_width = (f[-1] - f[0]) / (len(f) - 1)
+            widths = np.hstack((missing_width, widths)) if f[0] == 0 else np.hstack((widths, missing_width))
+            return np.sum(pxx * widths)
+
+        rng = np.random.default_rng(0)
+        pxx = rng.random(1000)
+        uniform = np.fft.rfftfreq(1998, d=1e-3)
+        irregular = np.cumsum(rng.random(1000))
+        for f in (uniform, uniform[1:], irregular, irregular - irregular[0]):
+            self.assertTrue(np.isclose(pysnr.bandpower(pxx[:len(f)], f), reference(pxx[:len(f)], f), rtol=1e-12))
+        self.assertTrue(np.isnan(pysnr.bandpower([], [])))
+
+        for f in (uniform, irregular, irregular - irregular[0]):
+            ranges = [[0, 10], [5, 6], [3, 999], [0, 999], [40, 60], [7, 7], [0, -1], [20, 10]]
+            powers = pysnr.bandpower_ranges(pxx, f, ranges)
+            for (lo, hi), power in zip(ranges, powers):
+                if hi <= lo:
+                    self.assertTrue(np.isnan(power))
+                else:
+                    self.assertTrue(np.isclose(power, reference(pxx[lo:hi + 1], f[lo:hi + 1]), rtol=1e-12))
+
+        # A warped grid sharing its length and end points with a cached uniform grid gets its own widths
+        uniform = np.linspace(0, 1000, 4097)
+        k = np.arange(4097)
+        warped = uniform + 0.1 * np.sin(np.pi * k / 2048) ** 2 * (k > 1)
+        pxx = rng.random(4097)
+        for f in (uniform, warped):
+            self.assertTrue(np.isclose(pysnr.bandpower(pxx, f), reference(pxx, f), rtol=1e-12))
+
+    def test_estimate_noise_psd(self):
+        rng = np.random.default_rng(1)
+        for N in (1000, 1001):
+            pxx = rng.random(N)
+            pxx[[100, 500]] = 50
+            f = np.arange(N) * 0.5
+            pxx_no_dc = pysnr.utils._remove_dc_from_psd(pxx, f)
+            freq_indices = pysnr.utils._get_harmonic_indices_from_psd(pxx_no_dc, f, 3, False)
+
+            # Fill the removed tones with the median noise density, then keep the lowest of both
+            expected = np.copy(pxx_no_dc)
+            for low, harmid, up in freq_indices:
+                expected[low:up + 1] = 0
+            estimated_noise_density = np.median(expected[expected > 0])
+            for idx in np.where(expected == 0)[0]:
+                expected[idx] = estimated_noise_density
+            expected = np.min(np.vstack((expected, pxx)), 0)
+
+            noise = pysnr.utils._estimate_noise_psd(pxx, pxx_no_dc, freq_indices)
+            self.assertTrue(np.array_equal(noise, expected))
+            # Without building the noise PSD, the median being selected in pxx_no_dc itself
+            power = pysnr.utils._estimate_noise_power(pxx, f, pxx_no_dc, freq_indices, work=pxx_no_dc)
+            self.assertTrue(np.isclose(power, pysnr.bandpower(expected, f), rtol=1e-12))
+
+    def test_welch_periodogram(self):
+        rng = np.random.default_rng(2)
+        signal = np.sin(2 * np.pi * 0.1234 * np.arange(20000)) + rng.normal(0, 1e-3, 20000)
+        for nperseg, noverlap, average in ((4096, None, "mean"), (3001, 1000, "median"), (5000, 0, "mean")):
+            f, pxx = pysnr.periodogram(signal, 10.0, ('kaiser', 38), detrend=True, nperseg=nperseg, noverlap=noverlap,
+                                       average=average)
+            expected_f, expected_pxx = scipy.signal.welch(signal, 10.0, ('kaiser', 38), nperseg=nperseg,
+                                                          noverlap=noverlap, average=average)
+            self.assertTrue(np.allclose(f, expected_f))
+            self.assertTrue(np.allclose(pxx, expected_pxx, rtol=1e-9, atol=0))
+
+        batch = np.vstack((signal, 2 * signal)).T
+        f, pxx = pysnr.periodogram(batch, 10.0, "hann", scaling="spectrum", axis=0, nperseg=1024, average="median")
+        expected_f, expected_pxx = scipy.signal.welch(batch, 10.0, "hann", nperseg=1024, scaling="spectrum", axis=0,
+                                                      detrend=False, average="median")
+        self.assertTrue(np.allclose(pxx, expected_pxx, rtol=1e-9, atol=0))
+        with self.assertRaises(ValueError):
+            pysnr.periodogram(signal, 10.0, "hann", nperseg=1024, noverlap=1024)
+
+        # Both averages keep single precision
+        for average in ("mean", "median"):
+            f, pxx32 = pysnr.periodogram(signal, 10.0, "hann", nperseg=1024, average=average, dtype=np.float32)
+            f, pxx = pysnr.periodogram(signal, 10.0, "hann", nperseg=1024, average=average)
+            self.assertEqual(pxx32.dtype, np.float32)
+            self.assertTrue(np.allclose(pxx32, pxx, rtol=1e-3, atol=1e-6 * np.max(pxx)))
+
+    def test_nearest_bins(self):
+        rng = np.random.default_rng(3)
+        uniform = np.fft.rfftfreq(10000, d=1e-4)
+        irregular = np.cumsum(rng.random(1000))
+        shuffled = rng.permutation(irregular)
+        for f in (uniform, uniform[:100], irregular, shuffled):
+            tones = np.hstack((rng.uniform(f.min() - 5, f.max() + 5, 200), f[:20], (f[1:21] + f[:20]) / 2))
+            expected = [np.argmin(np.abs(f - tone)) for tone in tones]
+            self.assertTrue(np.array_equal(pysnr.utils._get_nearest_bins(f, tones), expected))
+
+        # A warped grid sharing its length and end points with a queried uniform grid
+        uniform = np.linspace(0, 1000, 4097)
+        k = np.arange(4097)
+        warped = uniform + 20 * np.sin(np.pi * k / 2048) ** 2 * (k > 1)
+        for f in (uniform, warped):
+            tones = f[[3, 1500, 3000]]
+            expected = [np.argmin(np.abs(f - tone)) for tone in tones]
+            self.assertTrue(np.array_equal(pysnr.utils._get_nearest_bins(f, tones), expected))
+
+    def test_metrics_read_only(self):
+        # The metric functions must neither write into nor depend on a writable periodogram
+        for name, data, args in (("snr", "sine_data", ()), ("sinad", "sine_data", ()), ("thd", "sine_data", ()),
+                                 ("sfdr", "alias_data", (100,)), ("toi", "toi_data", ())):
+            with self.subTest(metric=name):
+                struct = scipy.io.loadmat("test/data/{}.mat".format(data))
+                Fs = struct["Fs"].flatten()[0]
+                signal = struct["x"].flatten() + struct["noise"].flatten()
+                f, pxx = pysnr.periodogram(signal, Fs, window=('kaiser', 38))
+                f, sxx = pysnr.periodogram(signal, Fs, window=('kaiser', 38), scaling="spectrum")
+                rbw = pysnr.utils.enbw(scipy.signal.windows.kaiser(len(signal), 38, False), Fs)
+                original_pxx, original_sxx = np.copy(pxx), np.copy(sxx)
+                pxx.setflags(write=False)
+                sxx.setflags(write=False)
+
+                psd_func = getattr(pysnr, name + "_power_spectral_density")
+                first = psd_func(pxx, f, *args)
+                for value, repeated in zip(first, psd_func(pxx, f, *args)):
+                    self.assertTrue(np.allclose(value, repeated, equal_nan=True))
+                getattr(pysnr, name + "_power_spectrum")(sxx, f, *(args if args else (rbw,)))
+                self.assertTrue(np.array_equal(pxx, original_pxx))
+                self.assertTrue(np.array_equal(sxx, original_sxx))
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
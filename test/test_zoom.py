@@ -0,0 +1,58 @@
+import sys
+import os
+import numpy as np
+import unittest
+import scipy.io
+
+sys.path.append(os.path.join("../pysnr"))
+import pysnr
+
+
+class TestZoom(unittest.TestCase):
+
+    def setUp(self):
+        self.sine = scipy.io.loadmat("test/data/sine_data.mat")
+        self.alias = scipy.io.loadmat("test/data/alias_data.mat")
+
+    def get_signal_data(self, struct):
+        Fs = struct["Fs"].flatten()[0]
+        noise = struct["noise"].flatten()
+        x = struct["x"].flatten()
+
+        return Fs, noise, x
+
+    def test_zoom_periodogram(self):
+        Fs, noise, signal = self.get_signal_data(self.sine)
+        f, pxx = pysnr.periodogram(signal + noise, Fs, ('kaiser', 38), detrend=True)
+
+        fz, pz = pysnr.zoom_periodogram(signal + noise, Fs, chunk_size=999)
+        self.assertTrue(np.allclose(fz, f))
+        self.assertTrue(np.allclose(pz, pxx, rtol=0, atol=1e-10 * np.max(pxx)))
+
+        fz, pz = pysnr.zoom_periodogram(signal + noise, Fs, 100.5, 200, chunk_size=4096)
+        band = (f >= 100.5) & (f <= 200)
+        self.assertTrue(np.allclose(fz, f[band]))
+        self.assertTrue(np.allclose(pz, pxx[band], rtol=0, atol=1e-10 * np.max(pxx)))
+        self.assertRaises(ValueError, pysnr.zoom_periodogram, signal, Fs, 100.01, 100.02)
+
+        # 10000 samples split evenly in chunks: the bands are accumulated in the frequency domain
+        x = (signal + noise)[:10000]
+        f, pxx = pysnr.periodogram(x, Fs, ('kaiser', 38), detrend=True)
+        for chunk_size in (999, 4096, 1 << 16):
+            fz, pz = pysnr.zoom_periodogram(x, Fs, chunk_size=chunk_size)
+            self.assertTrue(np.allclose(fz, f))
+            self.assertTrue(np.allclose(pz, pxx, rtol=0, atol=1e-10 * np.max(pxx)))
+
+    def test_analyze_zoom(self):
+        for data, aliased in ((self.sine, False), (self.alias, False), (self.alias, True)):
+            Fs, noise, signal = self.get_signal_data(data)
+            x = signal + noise
+            result = pysnr.analyze_zoom(x, Fs, aliased=aliased, nperseg=1024, chunk_size=2048)
+            self.assertAlmostEqual(result.snr, pysnr.snr_signal(x, Fs, aliased=aliased)[0], delta=0.25)
+            self.assertAlmostEqual(result.sinad, pysnr.sinad_signal(x, Fs)[0], delta=0.25)
+            self.assertAlmostEqual(result.thd, pysnr.thd_signal(x, Fs, aliased=aliased)[0], places=6)
+            self.assertAlmostEqual(result.harmonic_power, pysnr.thd_signal(x, Fs, aliased=aliased)[1], places=6)
+
+
+if __name__ == "__main__":
+    unittest.main()